@@ -5,29 +5,76 @@ This module provides FastAPI endpoints to validate student courses against major
 and return detailed results for frontend visualization.
 """
 
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, HTTPException, Depends, Header, Request, Response
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
-from typing import List, Dict, Any, Optional
-import os
-import json
-from motor.motor_asyncio import AsyncIOMotorClient
+from typing import List, Dict, Any, Optional, Literal, AsyncIterator
+import asyncio
 from contextlib import asynccontextmanager
+import logging
+import time
 
-from major_validation import MajorRequirementsValidator
+from major_requirements.evaluation_executor import EvaluationExecutor, evaluate_job, evaluate_response_job, plan_job
+from major_requirements.evaluation_state import EvaluationState, apply_course_delta, course_key, node_summary
+from major_requirements.evaluation_store import EvaluationStore
+from major_requirements.filter_cache import enable_filter_cache, get_filter_cache
+from major_requirements.load_major import MajorPlan
+from major_requirements.major_registry import MajorRegistry
+from major_requirements.profiler import disable_profiler, enable_profiler, get_profiler
+from major_requirements.response_cache import CachedResponse, ResponseCache, etag_matches, response_key, validation_key
+from major_requirements.reverse_index import get_requirements_for_course
+from config import Settings
+from utils.course_catalog import CourseCatalog
+from utils.course_repository import CourseRepository, InMemoryCourseRepository, MotorCourseRepository
+from utils.get_mongodb_collection import close_mongodb_client, get_database
+from utils.metrics import (
+    COURSES_EVALUATED, FILTER_CHECKS, MONGODB_SECONDS, PROMETHEUS_CONTENT_TYPE, REGISTRY, REQUEST_SECONDS, STAGE_SECONDS
+)
+from utils.serialization import JSON_MEDIA_TYPE, encode, encode_json, negotiate_media_type
+
+logger = logging.getLogger(__name__)
 
-# Database connection
-MONGODB_URL = "mongodb://localhost:27017"
-DB_NAME = "uwmatch"
 COURSES_COLLECTION = "courses"
 
-# MongoDB connection context manager
-@asynccontextmanager
-async def get_mongodb():
-    client = AsyncIOMotorClient(MONGODB_URL)
-    try:
-        yield client[DB_NAME]
-    finally:
-        client.close()
+def create_course_repository() -> CourseRepository:
+    """The courses collection of MongoDB, or the courses of Settings.COURSES_FILE with a simulated round trip"""
+    if Settings.COURSES_FILE:
+        return InMemoryCourseRepository.from_json_file(
+            Settings.COURSES_FILE, latency=Settings.COURSES_LATENCY_MS / 1000, jitter=Settings.COURSES_JITTER_MS / 1000
+        )
+    return MotorCourseRepository(lambda: get_database()[COURSES_COLLECTION])
+
+# where the courses come from
+course_repository = create_course_repository()
+
+# the courses collection, held in memory and refreshed every CATALOG_REFRESH_INTERVAL seconds
+course_catalog = CourseCatalog(course_repository)
+
+# every major, compiled once at startup and reloaded when its file changes
+major_registry = MajorRegistry(Settings.MAJOR_REQUIREMENTS_DIR)
+
+# evaluation states kept for /validate/delta
+evaluation_store = EvaluationStore(Settings.EVALUATION_STORE_SIZE)
+
+# serialized responses of repeated /validate and /requirements requests, by the inputs they depend on
+response_cache = ResponseCache(Settings.RESPONSE_CACHE_SIZE)
+
+# memoized filter outcomes, shared by every request (off unless FILTER_CACHE_SIZE is set)
+if Settings.FILTER_CACHE_SIZE > 0:
+    enable_filter_cache(Settings.FILTER_CACHE_SIZE)
+
+# per-node, per-filter and per-criterion timings of every evaluation (off unless EVALUATION_PROFILING is set)
+if Settings.EVALUATION_PROFILING:
+    enable_profiler()
+
+# runs the CPU-bound evaluation inline, in threads or in warm worker processes (Settings.EVALUATION_MODE)
+evaluation_executor = EvaluationExecutor(
+    Settings.EVALUATION_MODE, Settings.EVALUATION_WORKERS or None, Settings.MAJOR_REQUIREMENTS_DIR
+)
+
+def get_db():
+    """The database of the shared, application-lifetime MongoDB client (inject with Depends)"""
+    return get_database()
 
 class Course(BaseModel):
     """Model for a single course"""
@@ -44,9 +91,140 @@ class StudentCoursesRequest(BaseModel):
     student_id: Optional[str] = None
     major_code: str
     course_ids: List[str]
+    # assign every course to at most one top-level requirement (see major_requirements/allocation.py)
+    allocate: bool = False
+    # "full": the course table and the annotated requirement tree
+    # "nodes": pass/fail and credit/course totals of every requirement, "summary": the same for the top-level ones
+    detail: Literal["summary", "nodes", "full"] = "full"
+
+class BatchValidationItem(BaseModel):
+    """One student of a batch validation"""
+    student_id: Optional[str] = None
+    major_code: str
+    course_ids: List[str]
+
+class BatchValidationRequest(BaseModel):
+    """Request model for validating many students at once"""
+    items: List[BatchValidationItem]
+    allocate: bool = False
+    detail: Literal["summary", "nodes", "full"] = "full"
+
+class PlanRequest(BaseModel):
+    """Request model for planning the remaining courses of a major"""
+    major_code: str
+    course_ids: List[str]
+    # seconds the planner may search for cheaper plans after its greedy plan
+    time_budget: float = 0.5
+    max_plans: int = 3
+
+class CourseDeltaRequest(BaseModel):
+    """Request model for adding or dropping one course of a previous evaluation"""
+    state_id: str
+    course_id: str
+    action: Literal["add", "remove"]
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Load every major and the course catalog before the first request, warm up the MongoDB connection pool,
+    and keep both up to date while the API runs
+    """
+    await asyncio.to_thread(major_registry.refresh)
+    if not await course_repository.ping():
+        # the API still starts, requests that need the database fail until it can be reached
+        logger.warning("The courses could not be reached at startup")
+    else:
+        try:
+            await course_catalog.refresh()
+        except Exception:
+            # lookups read through to MongoDB until a refresh succeeds
+            logger.exception("Loading the course catalog failed")
+    # the worker processes start with the majors and the catalog snapshot already loaded
+    hand_catalog_to_executor()
+    evaluation_executor.start()
+    await evaluation_executor.warm_up()
+    tasks = []
+    if Settings.MAJOR_RELOAD_INTERVAL > 0:
+        tasks.append(asyncio.create_task(major_registry.watch(Settings.MAJOR_RELOAD_INTERVAL)))
+    if Settings.CATALOG_REFRESH_INTERVAL > 0:
+        tasks.append(asyncio.create_task(
+            course_catalog.run_periodic_refresh(Settings.CATALOG_REFRESH_INTERVAL, on_refresh=invalidate_changed_courses)
+        ))
+    try:
+        yield
+    finally:
+        for task in tasks:
+            task.cancel()
+        evaluation_executor.shutdown()
+        close_mongodb_client()
+
+def hand_catalog_to_executor():
+    """Give the planner (and the worker processes) the current catalog snapshot"""
+    snapshot = course_catalog.snapshot
+    if snapshot.epoch > 0:
+        evaluation_executor.set_catalog(list(snapshot.by_id.values()), snapshot.epoch)
+
+def invalidate_changed_courses(summary: Dict[str, Any]):
+    """Drop the cached filter outcomes of the courses that changed in a catalog refresh"""
+    cache = get_filter_cache()
+    if cache is not None:
+        for course_id in summary["changed_course_ids"]:
+            cache.invalidate_course(course_id)
+    if summary["changed_course_ids"]:
+        hand_catalog_to_executor()
+
+def get_major_plan(major_code: str) -> MajorPlan:
+    """The compiled major, or a 404 if no major file defines the code"""
+    plan = major_registry.get(major_code)
+    if plan is None:
+        raise HTTPException(status_code=404, detail=f"Major code '{major_code}' not found")
+    return plan
 
 # FastAPI app with database dependency
-app = FastAPI(title="UW Major Requirements Validation API")
+app = FastAPI(title="UW Major Requirements Validation API", lifespan=lifespan)
+
+@app.middleware("http")
+async def time_requests(request: Request, call_next):
+    """Time every request by its route template (not the raw path, so /requirements/EE and /requirements/CS share one series)"""
+    started = time.perf_counter()
+    response = await call_next(request)
+    route = request.scope.get("route")
+    REQUEST_SECONDS.labels(request.method, route.path if route is not None else "unmatched", response.status_code).observe(
+        time.perf_counter() - started
+    )
+    return response
+
+def collect_runtime_metrics():
+    """The numbers the caches, the executor, the catalog and the registry keep themselves, read at scrape time"""
+    metrics = []
+    cache = get_filter_cache()
+    if cache is not None:
+        stats = cache.stats()
+        metrics += [
+            ("uwmatch_filter_cache_hits", "counter", "Filter outcomes answered from the filter cache", [({}, stats["hits"])]),
+            ("uwmatch_filter_cache_misses", "counter", "Filter outcomes computed and stored in the filter cache", [({}, stats["misses"])]),
+            ("uwmatch_filter_cache_size", "gauge", "Filter outcomes in the filter cache", [({}, stats["size"])])
+        ]
+    stats = response_cache.stats()
+    metrics += [
+        ("uwmatch_response_cache_hits", "counter", "Responses found in the response cache", [({}, stats["hits"])]),
+        ("uwmatch_response_cache_misses", "counter", "Responses not found in the response cache", [({}, stats["misses"])])
+    ]
+    stats = evaluation_executor.stats()
+    metrics += [
+        ("uwmatch_executor_queue_depth", "gauge", "Evaluation jobs waiting for a free worker", [({"mode": stats["mode"]}, stats["queue_depth"])]),
+        ("uwmatch_executor_in_flight", "gauge", "Evaluation jobs submitted and not finished", [({"mode": stats["mode"]}, stats["in_flight"])]),
+        ("uwmatch_executor_jobs_failed", "counter", "Evaluation jobs that raised", [({"mode": stats["mode"]}, stats["failed"])])
+    ]
+    snapshot = course_catalog.snapshot
+    metrics += [
+        ("uwmatch_catalog_epoch", "gauge", "The epoch of the in-memory course catalog", [({}, snapshot.epoch)]),
+        ("uwmatch_catalog_courses", "gauge", "Courses in the in-memory course catalog", [({}, len(snapshot.by_id))]),
+        ("uwmatch_majors_loaded", "gauge", "Majors in the major registry", [({}, len(major_registry.snapshot()))])
+    ]
+    return metrics
+
+REGISTRY.register_collector(collect_runtime_metrics)
 
 @app.get("/")
 def read_root():
@@ -55,121 +233,331 @@ def read_root():
 
 @app.get("/majors")
 async def get_available_majors():
-    """Get list of available majors for validation"""
-    # Scan for all JSON files in the directory that might be major requirements
-    major_files = []
-    for file in os.listdir():
-        if file.endswith("_major_requirements.json"):
-            try:
-                with open(file, "r") as f:
-                    data = json.load(f)
-                    major_files.append({
-                        "code": data.get("major_code", file.replace("_major_requirements.json", "")),
-                        "name": data.get("major_name", "Unknown Major"),
-                        "file": file
-                    })
-            except (json.JSONDecodeError, FileNotFoundError):
-                continue
-    
-    return {"majors": major_files}
-
-async def fetch_courses_from_mongodb(db, course_ids: List[str]) -> List[Dict[str, Any]]:
-    """
-    Fetch course data from MongoDB based on course IDs
-    
-    Args:
-        db: MongoDB database connection
-        course_ids: List of course IDs to fetch
-        
+    """Get list of available majors for validation (served from the major registry, no files are read)"""
+    return {"majors": major_registry.majors()}
+
+async def validate_courses_against_major(plan: MajorPlan, student_courses: List[Dict[str, Any]],
+                                         allocate: bool = False, store_state: bool = True,
+                                         detail: str = "full") -> Dict[str, Any]:
+    """
+    Evaluate a transcript against a compiled major
+    
     Returns:
-        List of course dictionaries with all necessary information
-    """
-    # Fetch courses
-    cursor = db[COURSES_COLLECTION].find({"course_code": {"$in": course_ids}})
-    courses = await cursor.to_list(length=None)
-    
-    # Transform to the format needed by the validator
-    formatted_courses = []
-    for course in courses:
-        formatted_course = {
-            "course_code": course.get("course_code", ""),
-            "credits": course.get("credits", 0),
-        }
-        
-        # Add optional fields if they exist
-        if "attributes" in course:
-            formatted_course["attributes"] = course["attributes"]
-        if "breadth" in course:
-            formatted_course["breadth"] = course["breadth"]
-        if "has_lab" in course:
-            formatted_course["has_lab"] = course["has_lab"]
-        if "category" in course:
-            formatted_course["category"] = course["category"]
-        
-        formatted_courses.append(formatted_course)
+        {"courses": {course id: course}, "requirements": the annotated requirement tree}
+        Every course is listed once in "courses", the requirement nodes only reference it by id.
+        With detail "nodes" or "summary": {"passed": bool, "requirements": [node results without courses]}
+        With allocate, "allocation" holds the courses each top-level requirement gets to keep.
+        With store_state, "state_id" can be passed to /validate/delta to add or drop single courses later.
+    """
+    with STAGE_SECONDS.labels("evaluation", plan.code).time():
+        if store_state:
+            response, state = await evaluation_executor.run(evaluate_job, plan, student_courses, allocate, detail)
+        else:
+            # the state would be dropped right away, so it isn't sent back from a worker process at all
+            response = await evaluation_executor.run(evaluate_response_job, plan, student_courses, allocate, detail)
+    COURSES_EVALUATED.labels(plan.code).inc(len(student_courses))
+    # the single-pass evaluation checks every course against every requirement with a filter
+    FILTER_CHECKS.labels(plan.code).inc(len(student_courses) * len(plan.tree.matcher_indices))
+    if store_state:
+        # a state that comes back from a worker process has no tree, it is the same version of the same major
+        if state.tree is None:
+            state.tree = plan.tree
+        response["state_id"] = evaluation_store.put(state)
+    return response
+
+def apply_delta_to_stored_state(state: EvaluationState, course: Dict[str, Any], added: bool) -> Dict[str, Any]:
+    """
+    Add or drop one course on a copy of a stored evaluation
     
-    return formatted_courses
+    Returns:
+        {"state_id": the id of the new state, "changed": the nodes whose results changed}
+    """
+    new_state = state.copy()
+    changed = apply_course_delta(new_state, course, added)
+    return {
+        "state_id": evaluation_store.put(new_state),
+        "changed": [node_summary(new_state, index) for index in changed]
+    }
 
 @app.post("/validate")
-async def validate_student_courses(request: StudentCoursesRequest):
+async def validate_student_courses(request: StudentCoursesRequest, if_none_match: Optional[str] = Header(None),
+                                   accept: Optional[str] = Header(None)):
     """
     Validate a student's courses against major requirements
     
     This endpoint accepts a list of course IDs and major code,
-    fetches course data from MongoDB, and returns detailed validation results.
-    """
-    # Map of major codes to requirement files
-    major_file_mapping = {
-        "EE": "ee_major_requirements.json",
-        # Add other majors as needed
-    }
+    looks the courses up in the in-memory course catalog, and returns detailed validation results.
     
-    if request.major_code not in major_file_mapping:
-        raise HTTPException(status_code=404, detail=f"Major code '{request.major_code}' not found")
+    The response has an ETag. The same major version, catalog epoch and set of course IDs (in any order)
+    is answered from the response cache, or with 304 Not Modified if the If-None-Match header has the ETag.
+    With "Accept: application/msgpack" the response is MessagePack instead of JSON.
+    """
+    # the plan is taken once, so a reload during this request doesn't change the major under it
+    plan = get_major_plan(request.major_code)
+    media_type = negotiate_media_type(accept)
+    key = validation_key(plan.code, plan.version, course_catalog.epoch, request.course_ids,
+                         f"{request.allocate}|{request.detail}|{media_type}")
+    cached = response_cache.get(key)
+    # a response is only reused while its state_id still works for /validate/delta
+    if cached is not None and evaluation_store.get(cached.state_id) is not None:
+        headers = {"ETag": cached.etag, "Vary": "Accept"}
+        if etag_matches(if_none_match, cached.etag):
+            return Response(status_code=304, headers=headers)
+        return Response(cached.body, media_type=media_type, headers=headers)
     
     try:
-        # Get MongoDB connection
-        async with get_mongodb() as db:
-            # Fetch course data from MongoDB
-            student_courses = await fetch_courses_from_mongodb(db, request.course_ids)
-            
-            if not student_courses:
-                raise HTTPException(status_code=404, detail="No courses found with the provided IDs")
-            
-            # Initialize validator with requirements file
-            validator = MajorRequirementsValidator(major_file_mapping[request.major_code])
-            
-            # Validate courses against major requirements
-            result = validator.validate_student_courses(student_courses)
-            
-            return result
+        # Look the courses up in the catalog (MongoDB is only asked for courses it hasn't seen)
+        with STAGE_SECONDS.labels("course_lookup", plan.code).time():
+            student_courses = await course_catalog.get_by_codes(request.course_ids)
+        
+        if not student_courses:
+            raise HTTPException(status_code=404, detail="No courses found with the provided IDs")
+        
+        # Validate courses against major requirements
+        result = await validate_courses_against_major(plan, student_courses, request.allocate, True, request.detail)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Validation error: {str(e)}")
+    
+    etag = f'"{key[:24]}-{result["state_id"]}"'
+    # encoded once, to the bytes that are both sent and cached
+    with STAGE_SECONDS.labels("serialization", plan.code).time():
+        body = encode(result, media_type)
+    response_cache.put(key, CachedResponse(etag, body, result["state_id"]))
+    return Response(body, media_type=media_type, headers={"ETag": etag, "Vary": "Accept"})
+
+async def validate_batch_item(position: int, item: BatchValidationItem, allocate: bool, detail: str) -> Dict[str, Any]:
+    """The NDJSON line of one batch item, a failing item gets an "error" instead of failing the batch"""
+    line = {"index": position, "student_id": item.student_id, "major_code": item.major_code}
+    plan = major_registry.get(item.major_code)
+    if plan is None:
+        line["error"] = {"status": 404, "detail": f"Major code '{item.major_code}' not found"}
+        return line
+    try:
+        # the batch already read every course through, so this lookup stays in memory
+        student_courses = await course_catalog.get_by_codes(item.course_ids)
+        if not student_courses:
+            line["error"] = {"status": 404, "detail": "No courses found with the provided IDs"}
+            return line
+        # batch states aren't stored, hundreds of them would push the interactive users' states out of the store
+        line["result"] = await validate_courses_against_major(plan, student_courses, allocate, False, detail)
+    except Exception as e:
+        logger.exception("Batch item %s failed", position)
+        line["error"] = {"status": 500, "detail": f"Validation error: {str(e)}"}
+    return line
+
+async def stream_batch_results(request: BatchValidationRequest) -> AsyncIterator[bytes]:
+    """
+    Evaluate the items with at most VALIDATE_BATCH_CONCURRENCY in flight and yield
+    every result as one NDJSON line as soon as it is done (so in completion order, not request order)
+    """
+    items = iter(enumerate(request.items))
+    pending = set()
+    try:
+        while True:
+            # only a bounded number of items is started, so finished results never pile up in memory
+            while len(pending) < max(1, Settings.VALIDATE_BATCH_CONCURRENCY):
+                next_item = next(items, None)
+                if next_item is None:
+                    break
+                pending.add(asyncio.ensure_future(validate_batch_item(*next_item, request.allocate, request.detail)))
+            if not pending:
+                return
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                yield encode_json(task.result()) + b"\n"
+    finally:
+        # the client went away, don't keep evaluating for nobody
+        for task in pending:
+            task.cancel()
+
+@app.post("/validate/batch")
+async def validate_batch(request: BatchValidationRequest):
+    """
+    Validate many students' courses in one request
+    
+    The courses of all items are looked up with a single catalog read-through (at most one MongoDB query).
+    The response is NDJSON: one {"index", "student_id", "major_code", "result" or "error"} line per item,
+    streamed in completion order. The results carry no state_id.
+    """
+    if len(request.items) > Settings.VALIDATE_BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"A batch can have at most {Settings.VALIDATE_BATCH_MAX_ITEMS} items")
+    
+    # one lookup for the union of every item's courses, the items then find them in memory
+    try:
+        await course_catalog.get_by_codes({course_id: None for item in request.items for course_id in item.course_ids})
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"Course lookup failed: {str(e)}")
+    
+    return StreamingResponse(stream_batch_results(request), media_type="application/x-ndjson")
+
+@app.post("/validate/delta")
+async def validate_course_delta(request: CourseDeltaRequest):
+    """
+    Add or drop a single course on a previous /validate result
+    
+    Only the requirements that match the course and their ancestors are re-evaluated,
+    and only the requirements whose results changed are returned.
+    That is cheap enough to run on the event loop in every evaluation mode.
+    The previous state_id stays valid, the result gets a new state_id.
+    """
+    state = evaluation_store.get(request.state_id)
+    if state is None:
+        raise HTTPException(status_code=404, detail=f"Evaluation state '{request.state_id}' not found, validate the transcript again")
+    
+    if request.action == "add":
+        courses = await course_catalog.get_by_codes([request.course_id])
+        if not courses:
+            raise HTTPException(status_code=404, detail=f"Course '{request.course_id}' not found")
+        course = courses[0]
+    else:
+        # a dropped course is already in the state's course pool, no need to fetch it again
+        course = next((course for course in state.courses if course.get("course_code") == request.course_id), None)
+        if course is None:
+            raise HTTPException(status_code=404, detail=f"Course '{request.course_id}' is not part of this evaluation")
+    
+    result = apply_delta_to_stored_state(state, course, request.action == "add")
+    if request.action == "add":
+        result["courses"] = {course_key(course): course}
+    return result
+
+@app.post("/plan")
+async def plan_remaining_requirements(request: PlanRequest):
+    """
+    Find small sets of additional catalog courses that would complete every requirement of a major
+    
+    Plans are ranked by total credits. The search stops after time_budget seconds (at most 5)
+    and returns the cheapest plans found until then.
+    """
+    plan = get_major_plan(request.major_code)
+    
+    if course_catalog.epoch == 0:
+        raise HTTPException(status_code=503, detail="The course catalog hasn't been loaded yet")
+    with STAGE_SECONDS.labels("course_lookup", plan.code).time():
+        student_courses = await course_catalog.get_by_codes(request.course_ids)
+    
+    with STAGE_SECONDS.labels("planning", plan.code).time():
+        return await evaluation_executor.run(
+            plan_job, plan, student_courses, min(request.time_budget, 5.0), request.max_plans
+        )
+
+@app.post("/catalog/refresh")
+async def refresh_course_catalog():
+    """
+    Reload the in-memory course catalog from MongoDB now (e.g. right after the post-processing scripts ran)
+    
+    Returns the new epoch, the number of courses and how many of them changed.
+    """
+    try:
+        summary = await course_catalog.refresh()
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"Catalog refresh failed: {str(e)}")
+    invalidate_changed_courses(summary)
+    return {"epoch": summary["epoch"], "courses": summary["courses"], "changed": len(summary["changed_course_ids"])}
+
+@app.get("/catalog")
+def get_course_catalog_info():
+    """The epoch and size of the in-memory course catalog"""
+    snapshot = course_catalog.snapshot
+    return {"epoch": snapshot.epoch, "courses": len(snapshot.by_id), "loaded_at": snapshot.loaded_at}
+
+@app.get("/executor/stats")
+def get_executor_stats():
+    """The evaluation mode, queue depth, jobs in flight and job latency percentiles"""
+    return evaluation_executor.stats()
+
+@app.get("/metrics")
+def get_metrics():
+    """Stage latencies, throughput counters and cache/executor numbers in the Prometheus text format"""
+    return PlainTextResponse(REGISTRY.render(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+@app.get("/debug/profile")
+def get_evaluation_profile(by: Literal["nodes", "filters", "criteria"] = "filters", limit: int = 50):
+    """
+    The evaluation profile, the most time-consuming requirement nodes, filters or criterion types first
+    
+    Only evaluations that ran in the API process are profiled (not those of "process" mode workers).
+    """
+    profiler = get_profiler()
+    if profiler is None:
+        return {"enabled": False}
+    return {"enabled": True, "since": profiler.started_at, "by": by, "rows": profiler.report(by, limit)}
+
+@app.post("/debug/profile")
+def set_evaluation_profiling(action: Literal["start", "stop", "reset"]):
+    """Start or stop profiling the evaluations, or reset the collected profile"""
+    if action == "start":
+        enable_profiler()
+    elif action == "stop":
+        disable_profiler()
+    elif get_profiler() is not None:
+        get_profiler().reset()
+    return {"enabled": get_profiler() is not None}
+
+@app.get("/cache/stats")
+def get_filter_cache_stats():
+    """Hit/miss counters and the size of the filter outcome cache"""
+    cache = get_filter_cache()
+    if cache is None:
+        return {"enabled": False}
+    return cache.stats()
+
+@app.get("/cache/responses/stats")
+def get_response_cache_stats():
+    """Hit/miss counters and the size of the response cache"""
+    return response_cache.stats()
+
+@app.post("/cache/invalidate")
+def invalidate_filter_cache(course_id: Optional[str] = None):
+    """
+    Drop cached filter outcomes after the course documents changed
+    
+    With course_id only that course's outcomes are dropped, otherwise the whole cache is cleared.
+    """
+    cache = get_filter_cache()
+    if cache is None:
+        return {"enabled": False, "invalidated": 0}
+    if course_id is not None:
+        return {"enabled": True, "invalidated": cache.invalidate_course(course_id)}
+    invalidated = cache.stats()["size"]
+    cache.clear()
+    return {"enabled": True, "invalidated": invalidated}
 
 @app.get("/requirements/{major_code}")
-def get_major_requirements(major_code: str):
+def get_major_requirements(major_code: str, if_none_match: Optional[str] = Header(None)):
     """
     Get the raw requirements for a specific major
     
-    This endpoint returns the full JSON schema for a major's requirements.
+    This endpoint returns the full JSON schema for a major's requirements, as it was when the registry loaded it.
+    The ETag is the major version, so the response is 304 Not Modified until the major file changes.
     """
-    # Map of major codes to requirement files
-    major_file_mapping = {
-        "EE": "ee_major_requirements.json",
-        # Add other majors as needed
-    }
+    plan = get_major_plan(major_code)
+    etag = f'"{plan.version[:32]}"'
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    key = response_key("requirements", plan.code, plan.version)
+    cached = response_cache.get(key)
+    if cached is None:
+        cached = CachedResponse(etag, encode_json(dict(plan.source)))
+        response_cache.put(key, cached)
+    return Response(cached.body, media_type=JSON_MEDIA_TYPE, headers={"ETag": etag})
+
+@app.get("/courses/{course_id}/requirements")
+async def get_course_requirements(course_id: str, db=Depends(get_db)):
+    """
+    Get every (major, requirement, filter) entry that a course satisfies
     
-    if major_code not in major_file_mapping:
-        raise HTTPException(status_code=404, detail=f"Major code '{major_code}' not found")
+    This endpoint reads the precomputed reverse index built by major_requirements/reverse_index.py,
+    so no filters are evaluated while answering it.
+    """
+    with MONGODB_SECONDS.labels("requirements_index").time():
+        entries = await get_requirements_for_course(db, course_id)
     
-    try:
-        with open(major_file_mapping[major_code], "r") as f:
-            requirements = json.load(f)
-        return requirements
-    except FileNotFoundError:
-        raise HTTPException(status_code=404, detail=f"Requirements file for major '{major_code}' not found")
-    except json.JSONDecodeError:
-        raise HTTPException(status_code=500, detail=f"Invalid JSON in requirements file for major '{major_code}'")
+    if entries is None:
+        raise HTTPException(status_code=404, detail=f"Course '{course_id}' is not in the requirement index")
+    
+    return {"course_id": course_id, "requirements": entries}
 
 if __name__ == "__main__":
     import uvicorn
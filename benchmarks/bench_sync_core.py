@@ -0,0 +1,139 @@
+"""
+Measures the per-call overhead of the async wrappers compared to the synchronous evaluation core.
+
+None of the evaluation functions wait on I/O, so awaiting them only adds the cost of creating and
+driving a coroutine for every course x filter x criterion check. Run from the repository root:
+
+    python benchmarks/bench_sync_core.py
+"""
+
+import asyncio
+import copy
+import sys
+import time
+from pathlib import Path
+
+# Add the parent directory to sys.path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from major_requirements.handle_criterion import (
+    course_passes_department_criterion,
+    course_passes_department_criterion_sync
+)
+from major_requirements.handle_filter import course_passes_filter, course_passes_filter_sync
+from major_requirements.handle_filters import course_passes_filters, course_passes_filters_sync
+from major_requirements.handle_nested_requirement import (
+    process_nested_requirement_with_course,
+    process_nested_requirement_with_course_sync
+)
+from major_requirements.compile_filter import compile_filter, compile_filters
+from major_requirements.evaluation_state import evaluate_transcript
+from major_requirements.requirement_tree import build_requirement_tree
+
+ITERATIONS = 20000
+
+example_course = {'_id': '67577f7e7fd66ec727393650',
+                  'credits': 3,
+                  'course_number': '449',
+                  'departments': ['PHYSICS'],
+                  'course_code': 'PHYSICS 449',
+                  'formatted_designations':
+                      ['Level - Advanced', 'Breadth - Physical Science',
+                       'L&S Credit - Counts as Liberal Arts and Science credit in L&S'],
+                  'school-or-college': ['letters-science']}
+
+example_filters = [
+    {'course_codes': ['MATH/COMP SCI  240', 'E C E 204', 'E C E 320', 'E C E 331', 'E C E 332', 'E C E 334', 'E C E 335', 'E C E 342', 'E C E 353', 'E C E/COMP SCI  354', 'E C E 355', 'E C E 356', 'E C E 356']},
+    {'departments': 'E C E', 'course_number_range': {'$gte': 399}},
+    {'departments': ['COMP SCI', 'MATH', 'STAT'], 'course_number_range': {'$gte': 400}},
+    {'course_codes': ['MATH 319', 'MATH 320', 'MATH 321', 'MATH 322', 'MATH 340']},
+    {'categories': 'Biological Science', 'levels': ['Intermediate', 'Advanced']},
+    {'categories': 'Physical Science', 'levels': ['Intermediate', 'Advanced'], 'not_course_codes': 'PHYSICS 241'},
+    {'categories': 'Natural Science', 'levels': 'Advanced', 'not_departments': ['MATH', 'STAT', 'COMP SCI']},
+    {'schools_or_colleges': 'engineering', 'course_number_range': {'$gte': 300}, 'not_departments': 'E C E'},
+    {'course_codes': ['DS 501', 'DANCE 560']}
+]
+
+example_nested_requirement = {
+    "description": "Laboratory courses requirement",
+    "validation": {"min_credits": 2},
+    "requirements": [
+        {"description": "Select at least one course from E C E 301 to E C E 317",
+         "validation": {"min_courses": 1},
+         "filter": compile_filter({"department": "E C E", "course_number_range": {"$gte": 301, "$lte": 317}})},
+        {"description": "An additional laboratory course",
+         "validation": {"min_courses": 1},
+         "filter": compile_filter({"course_codes": ["E C E 453", "E C E 554"]})}
+    ]
+}
+
+
+def time_sync(func, *args) -> float:
+    start_time = time.perf_counter()
+    for _ in range(ITERATIONS):
+        func(*args)
+    return (time.perf_counter() - start_time) / ITERATIONS
+
+
+def time_async(func, *args) -> float:
+    async def run():
+        start_time = time.perf_counter()
+        for _ in range(ITERATIONS):
+            await func(*args)
+        return (time.perf_counter() - start_time) / ITERATIONS
+    return asyncio.run(run())
+
+
+def main():
+    compiled_filter = compile_filter(example_filters[5])
+    compiled_filters = compile_filters(example_filters)
+
+    cases = [
+        ("department criterion", course_passes_department_criterion_sync, course_passes_department_criterion,
+         (example_course, ["PHYSICS"])),
+        ("single filter", course_passes_filter_sync, course_passes_filter,
+         (example_course, compiled_filter)),
+        ("9 filters", course_passes_filters_sync, course_passes_filters,
+         (example_course, compiled_filters)),
+    ]
+
+    print(f"{'case':<22}{'sync (us)':>12}{'async (us)':>12}{'overhead (us)':>16}")
+    for name, sync_func, async_func, args in cases:
+        sync_time = time_sync(sync_func, *args) * 1e6
+        async_time = time_async(async_func, *args) * 1e6
+        print(f"{name:<22}{sync_time:>12.3f}{async_time:>12.3f}{async_time - sync_time:>16.3f}")
+
+    # the nested case mutates the requirement, so every call gets a fresh copy of the tree
+    requirements = [copy.deepcopy(example_nested_requirement) for _ in range(ITERATIONS)]
+    start_time = time.perf_counter()
+    for requirement in requirements:
+        process_nested_requirement_with_course_sync(example_course, requirement)
+    sync_time = (time.perf_counter() - start_time) / ITERATIONS * 1e6
+
+    requirements = [copy.deepcopy(example_nested_requirement) for _ in range(ITERATIONS)]
+    async def run_nested():
+        start_time = time.perf_counter()
+        for requirement in requirements:
+            await process_nested_requirement_with_course(example_course, requirement)
+        return (time.perf_counter() - start_time) / ITERATIONS * 1e6
+    async_time = asyncio.run(run_nested())
+    print(f"{'nested requirement':<22}{sync_time:>12.3f}{async_time:>12.3f}{async_time - sync_time:>16.3f}")
+
+    # a whole 40-course transcript: one course at a time through the nested dictionary,
+    # compared to a single evaluate_transcript pass over the precompiled tree
+    transcript = [dict(example_course, _id=str(index), course_code=f"PHYSICS {400 + index}") for index in range(40)]
+    transcript_iterations = ITERATIONS // 100
+    start_time = time.perf_counter()
+    for _ in range(transcript_iterations):
+        requirement = copy.deepcopy(example_nested_requirement)
+        for course in transcript:
+            requirement = process_nested_requirement_with_course_sync(course, requirement)
+    one_by_one_time = (time.perf_counter() - start_time) / transcript_iterations * 1e6
+
+    tree = build_requirement_tree(example_nested_requirement)
+    single_pass_time = time_sync(evaluate_transcript, tree, transcript) * 1e6
+    print(f"\n{'40-course transcript':<22}{'one by one (us)':>18}{'single pass (us)':>18}")
+    print(f"{'':<22}{one_by_one_time:>18.3f}{single_pass_time:>18.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,353 @@
+"""
+The benchmark suite: criteria, filters, nested evaluation, the vectorized catalog and end-to-end API calls,
+all on synthetic data (see benchmarks/synthetic.py). Results are written as JSON, and a previous result
+file can be passed with --compare to flag the cases that got slower. Run from the repository root:
+
+    python benchmarks/run_benchmarks.py --output results.json
+    python benchmarks/run_benchmarks.py --compare results.json --threshold 0.1
+    python benchmarks/run_benchmarks.py --catalog-sizes 1000,100000,1000000 --only catalog
+
+The exit code is 1 if --compare found a regression, or if a case of REQUIRED_SPEEDUPS is slower
+than its reference (e.g. the legacy engine on the filters of a compiled tree against the baseline interpreter).
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add the parent directory to sys.path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from benchmarks.synthetic import generate_catalog, generate_filter, generate_major, generate_transcript
+from major_requirements.catalog_bitmap import CourseCatalogColumns
+from major_requirements.compile_filter import compile_filter, compile_filters
+from major_requirements.evaluation_state import evaluate_transcript, state_to_response
+from major_requirements.handle_criterion import (
+    course_passes_category_criterion_sync,
+    course_passes_course_code_criterion_sync,
+    course_passes_course_number_range_criterion_sync,
+    course_passes_department_criterion_sync,
+    course_passes_level_criterion_sync,
+    course_passes_school_or_college_criterion_sync
+)
+from major_requirements.handle_filters import course_passes_filters_sync
+from major_requirements.handle_nested_requirement import process_nested_requirement_with_course_sync
+from major_requirements.load_major import compile_major
+from major_requirements.requirement_tree import build_requirement_tree
+from utils.course_catalog import CourseCatalog
+from utils.course_repository import InMemoryCourseRepository
+
+SUITES = ("criteria", "filters", "nested", "catalog", "api")
+
+# (case, reference case): the case must not be slower than its reference, whatever --compare says
+REQUIRED_SPEEDUPS = [
+    ("filter/9 filters, legacy path x200", "filter/9 raw dicts, baseline interpreter x200")
+]
+
+BASELINE_CRITERION_HANDLERS = {
+    "course_codes": course_passes_course_code_criterion_sync,
+    "course_code": course_passes_course_code_criterion_sync,
+    "categories": course_passes_category_criterion_sync,
+    "category": course_passes_category_criterion_sync,
+    "levels": course_passes_level_criterion_sync,
+    "level": course_passes_level_criterion_sync,
+    "departments": course_passes_department_criterion_sync,
+    "department": course_passes_department_criterion_sync,
+    "course_number_range": course_passes_course_number_range_criterion_sync,
+    "schools_or_colleges": course_passes_school_or_college_criterion_sync,
+    "school_or_college": course_passes_school_or_college_criterion_sync
+}
+
+
+def baseline_filters_first_match(course: dict, filters: list[dict]) -> dict | None:
+    """course_passes_filters as it was before filters were compiled: every filter dict is walked on every check"""
+    for filter in filters:
+        for criterion_key, criterion in filter.items():
+            negate = criterion_key.startswith("not_")
+            passed = BASELINE_CRITERION_HANDLERS[criterion_key[4:] if negate else criterion_key](course, criterion)
+            if passed == negate:
+                break
+        else:
+            return filter
+    return None
+
+
+def measure(func, *args, rounds: int = 7, min_round_seconds: float = 0.05) -> dict:
+    """Times func(*args): the iterations per round are calibrated so a round takes at least min_round_seconds,
+    then the per-call time of every round is recorded. The median is the number to compare.
+    """
+    iterations = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(iterations):
+            func(*args)
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_round_seconds or iterations >= 1 << 20:
+            break
+        iterations *= 2 if elapsed == 0 else max(2, min(10, int(min_round_seconds / elapsed) + 1))
+
+    per_call = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            func(*args)
+        per_call.append((time.perf_counter() - started) / iterations)
+    per_call.sort()
+    median = statistics.median(per_call)
+    return {
+        "iterations": iterations,
+        "rounds": rounds,
+        "median_us": round(median * 1e6, 4),
+        "min_us": round(per_call[0] * 1e6, 4),
+        "max_us": round(per_call[-1] * 1e6, 4),
+        "stdev_us": round(statistics.stdev(per_call) * 1e6, 4) if rounds > 1 else 0.0,
+        "ops_per_second": round(1 / median, 1) if median else None
+    }
+
+
+def measure_once(func, *args) -> dict:
+    """For cases that are too slow to repeat (building a 1M course catalog)"""
+    started = time.perf_counter()
+    func(*args)
+    elapsed = time.perf_counter() - started
+    return {"iterations": 1, "rounds": 1, "median_us": round(elapsed * 1e6, 4), "min_us": round(elapsed * 1e6, 4),
+            "max_us": round(elapsed * 1e6, 4), "stdev_us": 0.0, "ops_per_second": round(1 / elapsed, 3)}
+
+
+def bench_criteria(catalog: list[dict], rng: random.Random) -> dict:
+    """Every criterion type against a fixed sample of courses"""
+    courses = rng.sample(catalog, min(200, len(catalog)))
+    filters = {
+        "course_code": {"course_codes": [course["course_code"] for course in rng.sample(catalog, 10)]},
+        "department": {"departments": ["E C E", "COMP SCI", "MATH"]},
+        "course_number_range": {"course_number_range": {"$gte": 300, "$lte": 699}},
+        "category (flags)": {"category": "Biological Science"},
+        "category (substring)": {"category": "Communication Part B"},
+        "level": {"levels": ["Intermediate", "Advanced"]},
+        "school_or_college": {"school_or_college": "engineering"}
+    }
+    results = {}
+    for name, filter in filters.items():
+        criterion = compile_filter(filter).criteria[0]
+
+        def check_all(criterion=criterion):
+            for course in courses:
+                criterion.check(course)
+        results[f"criterion/{name} x{len(courses)}"] = measure(check_all)
+    return results
+
+
+def bench_filters(catalog: list[dict], rng: random.Random) -> dict:
+    courses = rng.sample(catalog, min(200, len(catalog)))
+    single = compile_filter(generate_filter(rng, catalog))
+    raw_filters = [generate_filter(rng, catalog) for _ in range(9)]
+    many = compile_filters(raw_filters)
+
+    def single_filter():
+        for course in courses:
+            single.matches(course)
+
+    def nine_filters():
+        for course in courses:
+            many.matches(course)
+
+    # the legacy engine gets the filters of a requirement dictionary from the compiled tree
+    tree_filters = build_requirement_tree({"filters": raw_filters}).requirement_dict()["filters"]
+
+    def legacy_path():
+        for course in courses:
+            course_passes_filters_sync(course, tree_filters)
+
+    def baseline_interpreter():
+        for course in courses:
+            baseline_filters_first_match(course, raw_filters)
+    return {f"filter/single x{len(courses)}": measure(single_filter),
+            f"filter/9 filters x{len(courses)}": measure(nine_filters),
+            f"filter/9 filters, legacy path x{len(courses)}": measure(legacy_path),
+            f"filter/9 raw dicts, baseline interpreter x{len(courses)}": measure(baseline_interpreter)}
+
+
+def bench_nested(catalog: list[dict], shapes: list[tuple[int, int]], transcript_size: int) -> dict:
+    results = {}
+    for depth, width in shapes:
+        major = generate_major(catalog, depth=depth, width=width)
+        plan = compile_major(major, "SYN")
+        transcript = generate_transcript(catalog, transcript_size)
+        name = f"{depth}x{width} ({len(plan.tree.nodes)} nodes), {len(transcript)} courses"
+        results[f"nested/compile {name}"] = measure(compile_major, major, "SYN", rounds=3)
+        results[f"nested/evaluate {name}"] = measure(evaluate_transcript, plan.tree, transcript)
+        state = evaluate_transcript(plan.tree, transcript)
+        results[f"nested/response {name}"] = measure(state_to_response, state)
+        if len(plan.tree.nodes) <= 100:
+            # the dictionary-walking evaluation, one course at a time (it modifies the requirement it is given)
+            def one_by_one():
+                requirement = plan.tree.requirement_dict()
+                for course in transcript:
+                    requirement = process_nested_requirement_with_course_sync(course, requirement)
+            results[f"nested/one by one {name}"] = measure(one_by_one, rounds=3)
+    return results
+
+
+def bench_catalog(catalog_sizes: list[int], rng: random.Random) -> dict:
+    results = {}
+    for size in catalog_sizes:
+        catalog = generate_catalog(size, seed=size)
+        columns = CourseCatalogColumns(catalog)
+        filter = compile_filter(generate_filter(rng, catalog))
+        if size <= 100_000:
+            results[f"catalog/build columns {size}"] = measure(CourseCatalogColumns, catalog, rounds=3)
+        else:
+            results[f"catalog/build columns {size}"] = measure_once(CourseCatalogColumns, catalog)
+        results[f"catalog/filter mask {size}"] = measure(columns.filter_mask, filter, rounds=5)
+    return results
+
+
+def bench_api(catalog: list[dict], transcript_size: int, latency: float, jitter: float) -> dict:
+    """/validate through the whole FastAPI stack in-process, the courses served by an in-memory repository
+    that answers after latency (+ jitter) seconds like MongoDB would
+    """
+    from fastapi.testclient import TestClient
+
+    import api
+
+    major = generate_major(catalog, depth=3, width=4)
+    transcript = generate_transcript(catalog, transcript_size)
+    course_codes = [course["course_code"] for course in transcript]
+    with tempfile.TemporaryDirectory() as directory:
+        with open(Path(directory) / "syn_major_requirements.json", "w") as file:
+            json.dump(major, file)
+        api.major_registry.directory = directory
+        api.major_registry.refresh()
+        repository = InMemoryCourseRepository(catalog, latency=latency, jitter=jitter, seed=0)
+        api.course_catalog = CourseCatalog(repository)
+        asyncio.run(api.course_catalog.refresh())
+        client = TestClient(api.app)
+
+        def validate(detail: str, cached: bool):
+            if not cached:
+                api.response_cache.clear()
+            response = client.post("/validate", json={"major_code": "SYN", "course_ids": course_codes, "detail": detail})
+            assert response.status_code == 200, response.text
+
+        results = {}
+        for detail in ("full", "summary"):
+            results[f"api/validate {detail}, {len(course_codes)} courses"] = measure(validate, detail, False, rounds=5)
+        results[f"api/validate cached, {len(course_codes)} courses"] = measure(validate, "full", True, rounds=5)
+        results["api/majors"] = measure(client.get, "/majors", rounds=5)
+
+    # the course lookup of a cold catalog: one read-through round trip per request
+    def read_through():
+        asyncio.run(CourseCatalog(repository).get_by_codes(course_codes))
+    results[f"api/read-through lookup, {len(course_codes)} courses"] = measure(read_through, rounds=5)
+    return results
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=Path(__file__).parent.parent, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[dict]:
+    """The cases whose median got slower than the baseline's by more than threshold (0.1 is 10%)"""
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get("results", {}).get(name)
+        if previous is None or not previous["median_us"]:
+            continue
+        change = result["median_us"] / previous["median_us"] - 1
+        result["change"] = round(change, 4)
+        if change > threshold:
+            regressions.append({"case": name, "baseline_us": previous["median_us"],
+                                "median_us": result["median_us"], "change": round(change, 4)})
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the benchmark suite on synthetic data")
+    parser.add_argument("--only", default=",".join(SUITES), help=f"comma separated suites of {SUITES}")
+    parser.add_argument("--catalog-size", type=int, default=10_000, help="the catalog of the non-catalog suites")
+    parser.add_argument("--catalog-sizes", default="1000,10000,100000", help="the catalogs of the catalog suite")
+    parser.add_argument("--shapes", default="2x3,3x4,4x5", help="depth x width of the generated majors")
+    parser.add_argument("--transcript-size", type=int, default=40)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--latency-ms", type=float, default=1.0, help="the simulated database round trip of the api suite")
+    parser.add_argument("--jitter-ms", type=float, default=0.5, help="up to this much more per round trip")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="a previous JSON result file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="the slowdown that counts as a regression")
+    args = parser.parse_args()
+
+    suites = [suite.strip() for suite in args.only.split(",") if suite.strip()]
+    unknown = set(suites) - set(SUITES)
+    if unknown:
+        parser.error(f"unknown suites {sorted(unknown)}, use {SUITES}")
+
+    rng = random.Random(args.seed)
+    catalog = generate_catalog(args.catalog_size, seed=args.seed)
+    shapes = [tuple(int(part) for part in shape.split("x")) for shape in args.shapes.split(",")]
+
+    results = {}
+    if "criteria" in suites:
+        results.update(bench_criteria(catalog, rng))
+    if "filters" in suites:
+        results.update(bench_filters(catalog, rng))
+    if "nested" in suites:
+        results.update(bench_nested(catalog, shapes, args.transcript_size))
+    if "catalog" in suites:
+        results.update(bench_catalog([int(size) for size in args.catalog_sizes.split(",")], rng))
+    if "api" in suites:
+        results.update(bench_api(catalog, args.transcript_size, args.latency_ms / 1000, args.jitter_ms / 1000))
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "arguments": vars(args)
+        },
+        "results": results
+    }
+    regressions = []
+    if args.compare:
+        with open(args.compare, "r") as file:
+            baseline = json.load(file)
+        regressions = compare(results, baseline, args.threshold)
+        report["meta"]["baseline_commit"] = baseline.get("meta", {}).get("commit")
+        report["regressions"] = regressions
+
+    slower = [(case, reference) for case, reference in REQUIRED_SPEEDUPS
+              if case in results and reference in results
+              and results[case]["median_us"] > results[reference]["median_us"]]
+    report["slower_than_reference"] = [{"case": case, "reference": reference} for case, reference in slower]
+
+    print(f"{'case':<60}{'median (us)':>14}{'change':>10}")
+    for name, result in results.items():
+        change = f"{result['change']:+.1%}" if "change" in result else ""
+        print(f"{name:<60}{result['median_us']:>14.3f}{change:>10}")
+    for regression in regressions:
+        print(f"REGRESSION {regression['case']}: {regression['baseline_us']:.3f} -> "
+              f"{regression['median_us']:.3f} us ({regression['change']:+.1%})")
+
+    for case, reference in slower:
+        print(f"SLOWER THAN REFERENCE {case}: {results[case]['median_us']:.3f} us, "
+              f"{reference}: {results[reference]['median_us']:.3f} us")
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+    sys.exit(1 if regressions or slower else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Synthetic catalogs, majors and transcripts for the benchmarks.
+
+Everything is generated from a seed, so two runs with the same arguments measure the same data.
+The departments and their schools come from data/departments.json; course numbers, credits,
+cross-listings and designations follow the shapes of the real course documents (see COURSE_FIELDS).
+"""
+
+import json
+import random
+from pathlib import Path
+
+from utils.designation_flags import designation_flags
+
+DEPARTMENTS_FILE = Path(__file__).parent.parent / "data" / "departments.json"
+
+BREADTHS = ["Humanities", "Social Science", "Natural Science", "Biological Science", "Physical Science", "Literature"]
+LEVELS = ["Elementary", "Intermediate", "Advanced"]
+LS_CREDIT = "L&S Credit - Counts as Liberal Arts and Science credit in L&S"
+
+
+def load_departments(path: Path = DEPARTMENTS_FILE) -> dict[str, list[str]]:
+    """school -> the department abbreviations of the school"""
+    with open(path, "r") as file:
+        return json.load(file)["departments"]
+
+
+def course_level(course_number: int) -> str:
+    if course_number < 300:
+        return "Elementary"
+    if course_number < 500:
+        return "Intermediate"
+    return "Advanced"
+
+
+def generate_catalog(size: int, seed: int = 0, cross_list_rate: float = 0.05) -> list[dict]:
+    """Course documents with the projected COURSE_FIELDS
+
+    Args:
+        size (int): the number of courses, 1k to 1M are realistic sizes
+        cross_list_rate (float): the share of courses listed under two departments ("E C E/COMP SCI 354")
+    """
+    rng = random.Random(seed)
+    departments = load_departments()
+    # (department, school) pairs, a department is drawn with the same chance no matter the size of its school
+    department_schools = [(department, school) for school, names in departments.items() for department in names]
+    courses = []
+    for position in range(size):
+        department, school = rng.choice(department_schools)
+        course_number = rng.randint(100, 999)
+        course_departments = [department]
+        schools = [school]
+        if rng.random() < cross_list_rate:
+            other_department, other_school = rng.choice(department_schools)
+            if other_department != department:
+                course_departments.append(other_department)
+                if other_school != school:
+                    schools.append(other_school)
+
+        designations = [f"Level - {course_level(course_number)}"]
+        if rng.random() < 0.6:
+            designations.append(f"Breadth - {rng.choice(BREADTHS)}")
+        if school == "letters-science" or rng.random() < 0.2:
+            designations.append(LS_CREDIT)
+
+        courses.append({
+            # a 24 hex digit string like a stringified ObjectId, unique and in catalog order
+            "_id": f"{seed:08x}{position:016x}",
+            "course_code": f"{'/'.join(course_departments)} {course_number}",
+            "credits": rng.choice((1, 2, 3, 3, 3, 4, 4, 5)),
+            "departments": course_departments,
+            "course_number": str(course_number),
+            "formatted_designations": designations,
+            "designation_flags": designation_flags(designations),
+            "school-or-college": schools
+        })
+    return courses
+
+
+def generate_filter(rng: random.Random, catalog: list[dict]) -> dict:
+    """One filter, in one of the shapes the real major files use"""
+    course = rng.choice(catalog)
+    department = course["departments"][0]
+    shape = rng.random()
+    if shape < 0.35:
+        return {"department": department, "course_number_range": {"$gte": rng.choice((300, 400, 500))}}
+    if shape < 0.6:
+        return {"course_codes": [sample["course_code"] for sample in rng.sample(catalog, min(len(catalog), rng.randint(2, 12)))]}
+    if shape < 0.8:
+        return {"category": rng.choice(BREADTHS), "level": rng.sample(LEVELS[1:], rng.randint(1, 2))}
+    if shape < 0.9:
+        return {"school_or_college": course["school-or-college"][0], "course_number_range": {"$gte": 300},
+                "not_department": department}
+    return {"departments": sorted({rng.choice(catalog)["departments"][0] for _ in range(3)}),
+            "not_course_codes": [course["course_code"]]}
+
+
+def generate_requirement(rng: random.Random, catalog: list[dict], depth: int, width: int, name: str) -> dict:
+    if depth == 0:
+        requirement = {"name": name}
+        if rng.random() < 0.3:
+            requirement["filters"] = [generate_filter(rng, catalog) for _ in range(rng.randint(2, 4))]
+        else:
+            requirement["filter"] = generate_filter(rng, catalog)
+        if rng.random() < 0.5:
+            requirement["validation"] = {"min_credits": rng.choice((3, 6, 9))}
+        else:
+            requirement["validation"] = {"min_courses": rng.randint(1, 3)}
+        return requirement
+
+    requirement = {
+        "name": name,
+        "requirements": [generate_requirement(rng, catalog, depth - 1, width, f"{name}.{position}")
+                         for position in range(width)]
+    }
+    if rng.random() < 0.5:
+        requirement["validation"] = {"min_credits": rng.choice((6, 12, 18))}
+    if rng.random() < 0.2:
+        requirement["credits_constraints"] = [{"max_credits": 6, "filter": generate_filter(rng, catalog)}]
+    return requirement
+
+
+def generate_major(catalog: list[dict], depth: int = 3, width: int = 4, seed: int = 0, code: str = "SYN") -> dict:
+    """A major file (as a dict) with width sub-requirements per level and depth levels below the major"""
+    rng = random.Random(seed)
+    major = generate_requirement(rng, catalog, depth, width, code)
+    return {"major_code": code, "major_name": f"Synthetic {depth}x{width}", **major}
+
+
+def generate_transcript(catalog: list[dict], size: int = 40, seed: int = 0) -> list[dict]:
+    """size distinct courses of the catalog"""
+    return random.Random(seed).sample(catalog, min(size, len(catalog)))
@@ -14,5 +14,40 @@ class Settings:
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30 * 24 * 60 # 30 days
     # importing the MongoDB connection string from the .env file
     MONGODB_URI: str = os.getenv("MONGODB_URI")
+    MONGODB_DB_NAME: str = os.getenv("MONGODB_DB_NAME", "uwmatch")
+    # the connection pool of the shared MongoDB client (see utils/get_mongodb_collection.py)
+    MONGODB_MAX_POOL_SIZE: int = int(os.getenv("MONGODB_MAX_POOL_SIZE", "100"))
+    MONGODB_MIN_POOL_SIZE: int = int(os.getenv("MONGODB_MIN_POOL_SIZE", "0"))
+    MONGODB_SERVER_SELECTION_TIMEOUT_MS: int = int(os.getenv("MONGODB_SERVER_SELECTION_TIMEOUT_MS", "5000"))
+    MONGODB_CONNECT_TIMEOUT_MS: int = int(os.getenv("MONGODB_CONNECT_TIMEOUT_MS", "5000"))
+    # 0 means no timeout on socket reads
+    MONGODB_SOCKET_TIMEOUT_MS: int | None = int(os.getenv("MONGODB_SOCKET_TIMEOUT_MS", "0")) or None
     # get the "ENV" variable from the .env, if it's not defined, default to "development" 
-    ENV: str = os.getenv("ENV", "development")
\ No newline at end of file
+    ENV: str = os.getenv("ENV", "development")
+    # how the API runs the synchronous requirement evaluation: "inline" on the event loop, "thread" in a thread pool
+    # so large transcripts don't block other requests, or "process" in warm worker processes that run in parallel
+    EVALUATION_MODE: str = os.getenv("EVALUATION_MODE", "inline")
+    # the size of the thread or process pool, 0 means one worker per CPU
+    EVALUATION_WORKERS: int = int(os.getenv("EVALUATION_WORKERS", "0"))
+    # the directory that contains the "*_major_requirements.json" files
+    MAJOR_REQUIREMENTS_DIR: str = os.getenv("MAJOR_REQUIREMENTS_DIR", ".")
+    # how many evaluation states the API keeps for /validate/delta (least recently used ones are dropped)
+    EVALUATION_STORE_SIZE: int = int(os.getenv("EVALUATION_STORE_SIZE", "1000"))
+    # serve the courses from this JSON file (a list of course documents) instead of MongoDB, for offline tests
+    # and benchmarks; every read then waits COURSES_LATENCY_MS plus up to COURSES_JITTER_MS like a round trip
+    COURSES_FILE: str | None = os.getenv("COURSES_FILE")
+    COURSES_LATENCY_MS: float = float(os.getenv("COURSES_LATENCY_MS", "0"))
+    COURSES_JITTER_MS: float = float(os.getenv("COURSES_JITTER_MS", "0"))
+    # how many (course, filter) outcomes the filter cache keeps, 0 turns the cache off
+    FILTER_CACHE_SIZE: int = int(os.getenv("FILTER_CACHE_SIZE", "0"))
+    # how often (in seconds) the API checks the major files for changes, 0 turns the reload off
+    MAJOR_RELOAD_INTERVAL: float = float(os.getenv("MAJOR_RELOAD_INTERVAL", "5"))
+    # how often (in seconds) the API reloads its in-memory copy of the courses collection, 0 turns the refresh off
+    CATALOG_REFRESH_INTERVAL: float = float(os.getenv("CATALOG_REFRESH_INTERVAL", "3600"))
+    # how many items one /validate/batch request may contain, and how many of them are evaluated at the same time
+    VALIDATE_BATCH_MAX_ITEMS: int = int(os.getenv("VALIDATE_BATCH_MAX_ITEMS", "1000"))
+    VALIDATE_BATCH_CONCURRENCY: int = int(os.getenv("VALIDATE_BATCH_CONCURRENCY", "4"))
+    # how many serialized /validate and /requirements responses the API keeps for repeat requests, 0 turns it off
+    RESPONSE_CACHE_SIZE: int = int(os.getenv("RESPONSE_CACHE_SIZE", "1000"))
+    # profile every evaluation from startup (see major_requirements/profiler.py and /debug/profile)
+    EVALUATION_PROFILING: bool = os.getenv("EVALUATION_PROFILING", "false").lower() == "true"
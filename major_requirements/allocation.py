@@ -0,0 +1,382 @@
+# ASSIGNING EVERY COURSE TO AT MOST ONE REQUIREMENT
+# evaluate_transcript lets a course count toward every requirement whose filter it passes, so the same
+# E C E course can fill "Advanced Electives" and "Professional Electives" at the same time. Some majors
+# don't allow that ("...if the courses are not used to meet any other degree requirements").
+#
+# Here every course is assigned to at most one allocation unit (by default the top-level requirements
+# of the major), using max-flow on a small network built from the eligibility results:
+#
+#   source --1--> course --1--> [credits constraint] --> unit --demand--> sink
+#
+# - every course carries one unit of flow, so it can only be assigned once, and always as a whole course
+# - a credits_constraints entry of a unit becomes its own node, capped at the most courses that can fit
+#   under its max_credits (a bound in courses, not in credits)
+# - a unit's edge to the sink is its demand in courses: the min_courses target, or the fewest eligible
+#   courses that reach the min_credits target
+# A flow of whole courses can't follow credits exactly: a course that matches several constraints only goes
+# through the first one, and the courses behind a constraint node can have more credits than the smallest ones
+# its capacity was counted with. A unit can end up over the max_credits of a constraint, and the credits over it
+# don't count (like in evaluate_transcript). So after every flow, a unit gives back any course whose credits
+# don't count at all, the network is told the course can't go to that unit, and the flow is completed again
+# (the unit asks for another course, and the given back course can fill another unit).
+# A course that only counts in part (e.g. a 4 credit course under a 3 credit cap) stays.
+# Augmenting paths never take flow away from an edge into the sink, so a unit that got its courses keeps
+# that many courses while the search reroutes which course goes where (this is what makes it better than
+# a greedy first-come assignment). Every step is a BFS over the network, so the whole allocation stays
+# polynomial in the number of courses instead of trying every assignment.
+#
+# After the flow, the assigned courses are evaluated again (with the whole sub-requirement tree of each
+# unit), because a unit with enough courses can still fail one of its sub-requirements. Units that are
+# still short ask for more courses, and units that can't be completed give theirs back to the others.
+
+from collections import deque
+from dataclasses import dataclass
+
+from major_requirements.evaluation_state import EvaluationState, recompute
+
+SOURCE = 0
+SINK = 1
+
+
+class FlowNetwork:
+    """An integer flow network with residual capacities, for Edmonds-Karp style augmentation"""
+
+    def __init__(self):
+        self.capacity: dict[tuple[int, int], int] = {}
+        self.flow: dict[tuple[int, int], int] = {}
+        self.adjacent: dict[int, list[int]] = {}
+
+    def add_edge(self, start: int, end: int, capacity: int):
+        if (start, end) not in self.capacity:
+            self.adjacent.setdefault(start, []).append(end)
+            self.adjacent.setdefault(end, []).append(start)
+            self.capacity.setdefault((end, start), 0)
+            self.capacity[(start, end)] = 0
+        self.capacity[(start, end)] += capacity
+
+    def residual(self, start: int, end: int) -> int:
+        return self.capacity.get((start, end), 0) - self.flow.get((start, end), 0)
+
+    def add_flow(self, start: int, end: int, amount: int):
+        self.flow[(start, end)] = self.flow.get((start, end), 0) + amount
+        self.flow[(end, start)] = self.flow.get((end, start), 0) - amount
+
+    def augment(self, source: int = SOURCE, sink: int = SINK, through: int | None = None) -> bool:
+        """Finds the shortest path with residual capacity (BFS) and pushes one unit of flow along it
+
+        Args:
+            through (int | None): only accept paths that reach the sink from this node
+
+        Returns:
+            bool: False if there is no augmenting path
+        """
+        previous = {source: None}
+        queue = deque([source])
+        while queue and sink not in previous:
+            node = queue.popleft()
+            for next_node in self.adjacent.get(node, []):
+                if next_node in previous or self.residual(node, next_node) <= 0:
+                    continue
+                if next_node == sink and through is not None and node != through:
+                    continue
+                previous[next_node] = node
+                queue.append(next_node)
+        if sink not in previous:
+            return False
+
+        node = sink
+        while previous[node] is not None:
+            self.add_flow(previous[node], node, 1)
+            node = previous[node]
+        return True
+
+
+@dataclass
+class Allocation:
+    """The chosen assignment of courses to allocation units"""
+
+    # the node indices of the allocation units
+    units: list[int]
+    # unit node index -> the integer course ids (of the evaluation's course pool) assigned to it
+    assigned: dict[int, set[int]]
+    # the evaluation with every unit only counting its assigned courses
+    state: EvaluationState
+
+    @property
+    def completed_units(self) -> list[int]:
+        return [unit for unit in self.units if self.state.passed[unit]]
+
+    def course_assignments(self) -> dict[str, str]:
+        """course key -> the path of the unit the course is assigned to"""
+        nodes = self.state.tree.nodes
+        course_keys = list(self.state.course_ids)
+        return {course_keys[course_id]: nodes[unit].path
+                for unit, course_ids in self.assigned.items() for course_id in sorted(course_ids)}
+
+    def to_dict(self) -> dict:
+        nodes = self.state.tree.nodes
+        course_keys = list(self.state.course_ids)
+        assigned_ids = set().union(*self.assigned.values()) if self.assigned else set()
+        return {
+            "units": [
+                {
+                    "requirement_path": nodes[unit].path,
+                    "name": nodes[unit].info.get("name", nodes[unit].info.get("description", "")),
+                    "courses": [course_keys[course_id] for course_id in sorted(self.assigned[unit])],
+                    "current_credits": self.state.current_credits[unit],
+                    "passed": self.state.passed[unit]
+                }
+                for unit in self.units
+            ],
+            "unassigned_courses": [course_keys[course_id] for course_id in sorted(self.state.transcript)
+                                   if course_id not in assigned_ids],
+            "completed_count": len(self.completed_units)
+        }
+
+
+def default_units(state: EvaluationState) -> list[int]:
+    """The top-level requirements of the major, or the root itself if it has no sub-requirements"""
+    root = state.tree.root
+    return list(root.children) if root.children else [root.index]
+
+
+def unit_demand(state: EvaluationState, unit: int, eligible: list[int]) -> int:
+    """How many courses a unit asks for before its sub-requirements are checked"""
+    node = state.tree.nodes[unit]
+    if node.validation_type == "min_courses":
+        return min(int(node.validation_target), len(eligible))
+    if node.validation_type == "min_credits":
+        # the fewest courses that can reach the target: the ones with the most credits
+        credits = 0
+        for count, course_id in enumerate(sorted(eligible, key=lambda course_id: -state.course_credits[course_id])):
+            if credits >= node.validation_target:
+                return count
+            credits += state.course_credits[course_id]
+        return len(eligible)
+    # without a validation block the unit only needs what its sub-requirements need
+    return 0
+
+
+def constraint_capacity(state: EvaluationState, course_ids: list[int], max_credits: float) -> int:
+    """The most courses (smallest credits first) that fit under a credits constraint.
+    Only a bound for the flow, the credits are checked by wasted_course afterwards
+    """
+    credits = 0
+    count = 0
+    for course_id in sorted(course_ids, key=lambda course_id: state.course_credits[course_id]):
+        credits += state.course_credits[course_id]
+        if credits > max_credits:
+            break
+        count += 1
+    return count
+
+
+def capped_credits(state: EvaluationState, unit: int, course_ids: set[int]) -> float:
+    """The credits a unit counts for some courses, without the credits over the max_credits of its constraints
+    (the same way evaluate_transcript counts them)
+    """
+    credits = sum(state.course_credits[course_id] for course_id in course_ids)
+    for constraint_filter, max_credits in state.tree.nodes[unit].credits_constraints:
+        matching_credits = sum(state.course_credits[course_id] for course_id in course_ids
+                               if constraint_filter.matches(state.courses[course_id]))
+        credits -= max(matching_credits - max_credits, 0)
+    return credits
+
+
+def wasted_course(state: EvaluationState, unit: int, course_ids: set[int]) -> int | None:
+    """A course of a min_credits unit that is over one of its credits constraints whose credits don't count at all
+    (the unit counts as many credits without it), the smallest first. None if there isn't one.
+    Courses that a sub-requirement of the unit accepts are never wasted, and neither are the courses
+    of a min_courses unit (every course counts toward the number of courses)
+    """
+    node = state.tree.nodes[unit]
+    if node.validation_type != "min_credits":
+        return None
+    credits = capped_credits(state, unit, course_ids)
+    for constraint_filter, max_credits in node.credits_constraints:
+        matching = sorted((course_id for course_id in course_ids if constraint_filter.matches(state.courses[course_id])),
+                          key=lambda course_id: (state.course_credits[course_id], course_id))
+        if sum(state.course_credits[course_id] for course_id in matching) <= max_credits:
+            continue
+        for course_id in matching:
+            if any(course_id in state.courses_passed[child] for child in node.children):
+                continue
+            if capped_credits(state, unit, course_ids - {course_id}) >= credits:
+                return course_id
+    return None
+
+
+def allocate_courses(state: EvaluationState, units: list[int] | None = None, max_rounds: int = 50) -> Allocation:
+    """Assigns every course of an evaluation to at most one allocation unit, maximizing the completed units
+
+    Args:
+        state (EvaluationState): the evaluation with the eligibility of every course (e.g. from evaluate_transcript)
+        units (list[int] | None): the node indices that can't share courses, default_units(state) by default
+        max_rounds (int): the most repair rounds for units that are still short after the max-flow
+
+    Returns:
+        Allocation: the assignment and the evaluation with every unit only counting its own courses
+
+    Raises:
+        ValueError: if one unit is inside the sub-requirement tree of another
+    """
+    nodes = state.tree.nodes
+    units = list(units) if units is not None else default_units(state)
+    unit_set = set(units)
+    for unit in units:
+        parent = nodes[unit].parent
+        while parent is not None:
+            if parent in unit_set:
+                raise ValueError(f"Allocation unit '{nodes[unit].path}' is inside unit '{nodes[parent].path}'")
+            parent = nodes[parent].parent
+
+    # STEP 1: build the network, course i is network node 2 + i, units and constraints come after the courses
+    network = FlowNetwork()
+    course_count = len(state.courses)
+    next_node = 2 + course_count
+    unit_nodes = {}
+    # network node -> the unit it belongs to, for the unit nodes and the constraint nodes
+    node_units = {}
+    for course_id in range(course_count):
+        network.add_edge(SOURCE, 2 + course_id, 1)
+
+    # the courses with the most credits first, so BFS prefers them when several courses fit
+    by_credits = sorted(range(course_count), key=lambda course_id: -state.course_credits[course_id])
+    for unit in units:
+        unit_node = next_node
+        next_node += 1
+        unit_nodes[unit] = unit_node
+        node_units[unit_node] = unit
+        eligible = [course_id for course_id in by_credits if course_id in state.courses_passed[unit]]
+
+        constraint_nodes = []
+        for constraint_filter, max_credits in nodes[unit].credits_constraints:
+            matching = [course_id for course_id in eligible if constraint_filter.matches(state.courses[course_id])]
+            constraint_nodes.append((next_node, constraint_filter))
+            node_units[next_node] = unit
+            network.add_edge(next_node, unit_node, constraint_capacity(state, matching, max_credits))
+            next_node += 1
+
+        for course_id in eligible:
+            # a course that matches a constraint goes through the (first) constraint node it matches
+            target = next((constraint_node for constraint_node, constraint_filter in constraint_nodes
+                           if constraint_filter.matches(state.courses[course_id])), unit_node)
+            network.add_edge(2 + course_id, target, 1)
+        network.add_edge(unit_node, SINK, unit_demand(state, unit, eligible))
+
+    def assigned_courses() -> dict[int, set[int]]:
+        assigned = {unit: set() for unit in units}
+        for (start, end), flow in network.flow.items():
+            # the edge goes from a course to the unit or to one of its constraint nodes
+            if flow > 0 and 2 <= start < 2 + course_count:
+                assigned[node_units[end]].add(start - 2)
+        return assigned
+
+    def release(course_id: int, unit: int):
+        """Takes a course's flow back out of a unit (the unit's demand stays)"""
+        course_node = 2 + course_id
+        for next_node in network.adjacent[course_node]:
+            if network.flow.get((course_node, next_node), 0) > 0:
+                network.add_flow(course_node, next_node, -1)
+                # from the constraint node (if there is one) to the unit
+                if next_node != unit_nodes[unit]:
+                    network.add_flow(next_node, unit_nodes[unit], -1)
+                network.add_flow(SOURCE, course_node, -1)
+                network.add_flow(unit_nodes[unit], SINK, -1)
+                return next_node
+
+    def settle() -> dict[int, set[int]]:
+        """The assigned courses, after every unit gave back the courses its credits constraints waste
+        (and got other courses for them where the network has some)
+        """
+        while True:
+            assigned = assigned_courses()
+            for unit in units:
+                course_id = wasted_course(state, unit, assigned[unit])
+                if course_id is not None:
+                    # the course can go to the other units, but not to this one anymore
+                    network.capacity[(2 + course_id, release(course_id, unit))] = 0
+                    while network.augment(through=unit_nodes[unit]):
+                        pass
+                    break
+            else:
+                return assigned
+
+    def evaluate(assigned: dict[int, set[int]]) -> EvaluationState:
+        allocated = EvaluationState(state.tree)
+        allocated.courses = state.courses
+        allocated.course_ids = state.course_ids
+        allocated.course_credits = state.course_credits
+        allocated.transcript = state.transcript
+        for index, unit in enumerate(owning_unit):
+            own_courses = state.own_courses[index]
+            allocated.own_courses[index] = set(own_courses) if unit is None else own_courses & assigned[unit]
+        return recompute(allocated)
+
+    def raise_demand(unit: int) -> bool:
+        network.add_edge(unit_nodes[unit], SINK, 1)
+        if network.augment(through=unit_nodes[unit]):
+            return True
+        network.add_edge(unit_nodes[unit], SINK, -1)
+        return False
+
+    owning_unit = []
+    for node in nodes:
+        unit = node.index
+        while unit is not None and unit not in unit_set:
+            unit = nodes[unit].parent
+        owning_unit.append(unit)
+
+    # STEP 2: max-flow for the initial demands
+    while network.augment():
+        pass
+    assigned = settle()
+    allocated = evaluate(assigned)
+
+    # STEP 3: units that have their courses but still fail (e.g. a sub-requirement isn't covered)
+    # ask for one more course at a time, as long as the network can find one for them
+    for _ in range(max_rounds):
+        progress = False
+        for unit in units:
+            if not allocated.passed[unit] and raise_demand(unit):
+                progress = True
+        if not progress:
+            break
+        assigned = settle()
+        allocated = evaluate(assigned)
+
+    # STEP 4: a unit that can't be completed gives its courses back if that completes more of the other units
+    for unit in sorted(units, key=lambda unit: len(assigned[unit])):
+        if allocated.passed[unit] or not assigned[unit]:
+            continue
+        completed_before = sum(allocated.passed[unit] for unit in units)
+        saved_flow = dict(network.flow)
+        saved_capacity = dict(network.capacity)
+
+        for course_id in assigned[unit]:
+            release(course_id, unit)
+        network.capacity[(unit_nodes[unit], SINK)] = 0
+
+        for _ in range(max_rounds):
+            progress = False
+            for other in units:
+                if other != unit and not allocated.passed[other] and raise_demand(other):
+                    progress = True
+            if not progress:
+                break
+            allocated = evaluate(settle())
+
+        candidate = settle()
+        candidate_state = evaluate(candidate)
+        if sum(candidate_state.passed[unit] for unit in units) > completed_before:
+            assigned, allocated = candidate, candidate_state
+        else:
+            network.flow, network.capacity = saved_flow, saved_capacity
+            allocated = evaluate(assigned)
+
+    return Allocation(units=units, assigned=assigned, state=allocated)
+
+
+def allocation_response(state: EvaluationState, units: list[int] | None = None) -> dict:
+    """allocate_courses, as the "allocation" part of a validation response"""
+    return allocate_courses(state, units).to_dict()
@@ -0,0 +1,203 @@
+# CATALOG-LEVEL EVALUATION OF FILTERS
+# Instead of asking "does this course pass this filter?" one course at a time,
+# we load every course of the catalog into column arrays once, and evaluate a compiled filter
+# as one vectorized boolean mask over ALL courses ("which courses satisfy this filter?").
+#
+# Multi-valued fields (departments, formatted_designations, school-or-college) are stored as
+# "entries": one row per (course, value) pair, with the value replaced by an integer id.
+# A criterion is first evaluated on the small vocabulary of distinct values, then scattered
+# back onto the courses through the entries.
+
+import numpy as np
+
+from major_requirements.compile_filter import (
+    CompiledFilter,
+    CompiledFilters,
+    RANGE_OPERATORS,
+    compile_filter,
+    compile_filters
+)
+from utils.parse_course_code import course_code_keys, course_number_value
+
+
+class MultiValueColumn:
+    """One multi-valued course field, stored as (course index, value id) entries plus a vocabulary"""
+
+    def __init__(self, values_per_course: list[list[str]]):
+        self.vocabulary: dict[str, int] = {}
+        course_indices = []
+        value_ids = []
+        for course_index, values in enumerate(values_per_course):
+            for value in values:
+                value_id = self.vocabulary.setdefault(value, len(self.vocabulary))
+                course_indices.append(course_index)
+                value_ids.append(value_id)
+        self.course_indices = np.asarray(course_indices, dtype=np.int64)
+        self.value_ids = np.asarray(value_ids, dtype=np.int64)
+        self.values = list(self.vocabulary)
+
+    def courses_with_value_ids(self, selected_value_ids: np.ndarray, course_count: int) -> np.ndarray:
+        """Returns a mask of the courses that have at least one of the selected value ids"""
+        mask = np.zeros(course_count, dtype=bool)
+        entries = np.isin(self.value_ids, selected_value_ids)
+        mask[self.course_indices[entries]] = True
+        return mask
+
+    def courses_with_values(self, values, course_count: int) -> np.ndarray:
+        selected = [self.vocabulary[value] for value in values if value in self.vocabulary]
+        return self.courses_with_value_ids(np.asarray(selected, dtype=np.int64), course_count)
+
+    def courses_with_substring(self, substrings, course_count: int) -> np.ndarray:
+        # the substring test runs once per DISTINCT value (e.g. "Breadth - Biological Science"),
+        # not once per course
+        selected = [value_id for value, value_id in self.vocabulary.items()
+                    if any(substring in value for substring in substrings)]
+        return self.courses_with_value_ids(np.asarray(selected, dtype=np.int64), course_count)
+
+
+class CourseCatalogColumns:
+    """Every course of the catalog as column arrays, indexed by position"""
+
+    def __init__(self, courses: list[dict]):
+        # the course documents themselves, for callers that need whole courses back (e.g. the planner)
+        self.courses = courses
+        self.course_ids = [str(course["_id"]) for course in courses]
+        self.index_by_id = {course_id: index for index, course_id in enumerate(self.course_ids)}
+        self.course_count = len(courses)
+
+        self.credits = np.asarray([course.get("credits", 0) or 0 for course in courses], dtype=np.float64)
+
+        # course numbers are strings like "453", a few have suffixes ("101A") and are compared by their
+        # leading digits (see course_number_value). Those without any get NaN and pass no range criterion
+        self.course_number_strings = [course.get("course_number", "") for course in courses]
+        self.course_numbers = np.asarray(
+            [np.nan if value is None else float(value)
+             for value in map(course_number_value, self.course_number_strings)],
+            dtype=np.float64
+        )
+
+        self.departments = MultiValueColumn([course.get("departments", []) for course in courses])
+        self.designations = MultiValueColumn([course.get("formatted_designations", []) for course in courses])
+        self.schools = MultiValueColumn([course.get("school-or-college", []) for course in courses])
+
+        # a course code key combines a department id and a course number id,
+        # one key per department entry, so cross-listed courses have several keys
+        self.number_vocabulary: dict[str, int] = {}
+        number_ids = np.asarray(
+            [self.number_vocabulary.setdefault(number, len(self.number_vocabulary))
+             for number in self.course_number_strings],
+            dtype=np.int64
+        )
+        self.department_entry_code_keys = (
+            self.departments.value_ids * max(len(self.number_vocabulary), 1)
+            + number_ids[self.departments.course_indices]
+        )
+
+    def _course_code_mask(self, course_codes) -> np.ndarray:
+        number_count = max(len(self.number_vocabulary), 1)
+        wanted_keys = []
+        for course_code in course_codes:
+            for dept, number in course_code_keys(course_code):
+                if dept in self.departments.vocabulary and number in self.number_vocabulary:
+                    wanted_keys.append(self.departments.vocabulary[dept] * number_count + self.number_vocabulary[number])
+        mask = np.zeros(self.course_count, dtype=bool)
+        entries = np.isin(self.department_entry_code_keys, np.asarray(wanted_keys, dtype=np.int64))
+        mask[self.departments.course_indices[entries]] = True
+        return mask
+
+    def _course_number_range_mask(self, criterion: dict) -> np.ndarray:
+        # courses without a numeric course number never pass a range criterion
+        mask = ~np.isnan(self.course_numbers)
+        for op, value in criterion.items():
+            if op in RANGE_OPERATORS:
+                mask &= RANGE_OPERATORS[op](self.course_numbers, value)
+        return mask
+
+    def criterion_mask(self, criterion_type: str, criterion) -> np.ndarray:
+        """Evaluates one (non-negated) criterion over the whole catalog"""
+        if criterion_type == 'course_code':
+            return self._course_code_mask(criterion)
+        if criterion_type == 'department':
+            return self.departments.courses_with_values(criterion, self.course_count)
+        if criterion_type == 'school_or_college':
+            return self.schools.courses_with_values(criterion, self.course_count)
+        if criterion_type in ('category', 'level'):
+            return self.designations.courses_with_substring(criterion, self.course_count)
+        if criterion_type == 'course_number_range':
+            return self._course_number_range_mask(criterion)
+        raise KeyError(criterion_type)
+
+    def filter_mask(self, filter: dict | CompiledFilter) -> np.ndarray:
+        """Returns the boolean mask of all catalog courses that pass a filter (criteria are AND-ed)"""
+        mask = np.ones(self.course_count, dtype=bool)
+        for criterion in compile_filter(filter).criteria:
+            criterion_mask = self.criterion_mask(criterion.criterion_type, criterion.criterion)
+            if criterion.negate:
+                mask &= ~criterion_mask
+            else:
+                mask &= criterion_mask
+        return mask
+
+    def filters_mask(self, filters: list[dict] | CompiledFilters) -> np.ndarray:
+        """Returns the boolean mask of all catalog courses that pass at least one of the filters"""
+        mask = np.zeros(self.course_count, dtype=bool)
+        for compiled_filter in compile_filters(filters).filters:
+            mask |= self.filter_mask(compiled_filter)
+        return mask
+
+    def requirement_mask(self, requirement: dict) -> np.ndarray:
+        """Returns the eligible set of a requirement as a bitmap over the catalog.
+        A parent requirement is eligible for every course that its own filters or any of its
+        sub-requirements accept, the same way process_nested_requirement_with_course aggregates courses.
+        """
+        mask = np.zeros(self.course_count, dtype=bool)
+        if "filter" in requirement:
+            mask |= self.filter_mask(requirement["filter"])
+        elif "filters" in requirement:
+            mask |= self.filters_mask(requirement["filters"])
+        for sub_requirement in requirement.get("requirements", []):
+            mask |= self.requirement_mask(sub_requirement)
+        return mask
+
+    def eligible_course_ids(self, mask: np.ndarray) -> list[str]:
+        """Converts a bitmap back into course ids"""
+        return [self.course_ids[index] for index in np.flatnonzero(mask)]
+
+    def transcript_indices(self, course_ids: list[str]) -> np.ndarray:
+        """Positions of a transcript's courses in the catalog, course ids that aren't in the catalog are skipped"""
+        return np.asarray(
+            [self.index_by_id[course_id] for course_id in dict.fromkeys(course_ids) if course_id in self.index_by_id],
+            dtype=np.int64
+        )
+
+    def transcript_totals(self, mask: np.ndarray, course_ids: list[str]) -> dict:
+        """Checks a transcript against an eligible set: an index gather plus a sum over credits
+
+        Returns:
+            dict: {"course_ids": [...], "courses_count": int, "credits": float} for the transcript courses in the mask
+        """
+        indices = self.transcript_indices(course_ids)
+        matched = indices[mask[indices]]
+        return {
+            "course_ids": [self.course_ids[index] for index in matched],
+            "courses_count": int(matched.size),
+            "credits": float(self.credits[matched].sum())
+        }
+
+
+async def load_catalog_columns(course_collection, fields: list[str] | None = None) -> CourseCatalogColumns:
+    """Loads every course document of the collection (only the projected fields) into column arrays
+
+    Args:
+        course_collection: the MongoDB "courses" collection
+        fields (list[str] | None): the fields to project, COURSE_FIELDS by default
+
+    Returns:
+        CourseCatalogColumns: the catalog, ready for vectorized filter evaluation
+    """
+    if fields is None:
+        # imported here, so the vectorized evaluation itself doesn't need a database client
+        from utils.id_retrieve_course_info import COURSE_FIELDS
+        fields = COURSE_FIELDS
+    courses = await course_collection.find({}, {field: 1 for field in fields}).to_list(length=None)
+    return CourseCatalogColumns(courses)
@@ -0,0 +1,287 @@
+# A COMPILED FILTER IS A FILTER DICTIONARY THAT HAS BEEN INTERPRETED ONCE, AHEAD OF TIME
+# course_passes_filter used to walk the filter dict, check every key for a 'not_' prefix,
+# look up the handler and re-normalize str -> list criteria for EVERY course it checked.
+# Here we do all of that work once (e.g. when a major is loaded) and keep a small predicate
+# object around that only has to look at the course.
+
+import hashlib
+import operator
+
+from utils.designation_flags import UNFLAGGED_DESIGNATION, designation_criterion_mask
+from utils.parse_course_code import course_code_keys, course_number_value
+
+# the keys in a filter dictionary may be singular or plural ('department' or 'departments')
+# we map all of them to one canonical criterion type
+CRITERION_TYPES = {
+    'course_codes': 'course_code',
+    'course_code': 'course_code',
+    'categories': 'category',
+    'category': 'category',
+    'levels': 'level',
+    'level': 'level',
+    'departments': 'department',
+    'department': 'department',
+    'course_number_range': 'course_number_range',
+    'schools_or_colleges': 'school_or_college',
+    'school_or_college': 'school_or_college'
+}
+
+# keys that describe a filter for humans, they are not criteria and are skipped by the compiler
+# e.g. {"description": "E C E courses numbered 300...", "department": "E C E", ...}
+FILTER_METADATA_KEYS = {'description'}
+
+# cheap hash/number checks run before the substring scans over formatted_designations,
+# so a course that fails on its department never reaches the expensive criteria
+CRITERION_COST = {
+    'department': 0,
+    'course_code': 0,
+    'course_number_range': 1,
+    'school_or_college': 1,
+    'category': 2,
+    'level': 2
+}
+
+# the MongoDB-style comparison operators supported by the course_number_range criterion
+RANGE_OPERATORS = {
+    '$gt': operator.gt,
+    '$gte': operator.ge,
+    '$lt': operator.lt,
+    '$lte': operator.le,
+    '$eq': operator.eq,
+    '$ne': operator.ne
+}
+
+
+def normalize_criterion(criterion: str | list[str]) -> tuple:
+    """Turns a criterion into a tuple of unique values, keeping the original order.
+    A single string becomes a one-element tuple, and duplicates such as a course list that
+    contains 'E C E 356' twice are only kept once.
+    """
+    if isinstance(criterion, str):
+        criterion = [criterion]
+    return tuple(dict.fromkeys(criterion))
+
+
+def compile_course_code_criterion(criterion: str | list[str]):
+    codes = normalize_criterion(criterion)
+    # every course code is expanded once into (department, course_number) keys,
+    # a cross-listing like 'KINES/NURSING  523' fans out to ('KINES', '523') and ('NURSING', '523')
+    # checking a course is then one hash probe per department of the course
+    keys = set()
+    for code in codes:
+        code_keys = course_code_keys(code)
+        if not code_keys:
+            raise ValueError(f"Invalid course code in course_codes criterion: {code!r}")
+        keys.update(code_keys)
+    keys = frozenset(keys)
+
+    def check(course: dict) -> bool:
+        course_number = course.get("course_number", "")
+        return any((dept, course_number) in keys for dept in course.get("departments", []))
+
+    return codes, check
+
+
+def compile_designation_criterion(criterion: str | list[str]):
+    # both 'category' and 'level' criteria are substring checks against formatted_designations
+    # e.g. the category "Biological Science" is found in "Breadth - Biological Science"
+    # (the same rule CourseCatalogColumns applies, the flags below only answer it faster)
+    values = normalize_criterion(criterion)
+    # for courses that already have the "designation_flags" field, the whole criterion
+    # becomes one bitwise AND (mask is None if some value isn't one of the flagged designations)
+    mask = designation_criterion_mask(values)
+
+    def check(course: dict) -> bool:
+        if mask is not None:
+            flags = course.get("designation_flags")
+            # a course with a designation outside the flagged vocabulary may still contain a value as a substring
+            if flags is not None and not flags & UNFLAGGED_DESIGNATION:
+                return flags & mask != 0
+        # fallback for documents that haven't been migrated yet
+        formatted_designations = course.get("formatted_designations", [])
+        return any(value in designation for designation in formatted_designations for value in values)
+
+    return values, check
+
+
+def compile_department_criterion(criterion: str | list[str]):
+    values = normalize_criterion(criterion)
+    value_set = frozenset(values)
+
+    def check(course: dict) -> bool:
+        return any(dept in value_set for dept in course.get("departments", []))
+
+    return values, check
+
+
+def compile_course_number_range_criterion(criterion: dict):
+    # unknown operators are ignored, the same way course_passes_course_number_range_criterion does
+    comparisons = tuple(
+        (RANGE_OPERATORS[op], value) for op, value in criterion.items() if op in RANGE_OPERATORS
+    )
+
+    def check(course: dict) -> bool:
+        course_number = course_number_value(course.get("course_number", ""))
+        if course_number is None:
+            return False
+        return all(compare(course_number, value) for compare, value in comparisons)
+
+    return dict(criterion), check
+
+
+def compile_school_or_college_criterion(criterion: str | list[str]):
+    values = normalize_criterion(criterion)
+
+    def check(course: dict) -> bool:
+        course_school_or_college = course["school-or-college"]
+        return any(school in course_school_or_college for school in values)
+
+    return values, check
+
+
+criterion_compilers = {
+    'course_code': compile_course_code_criterion,
+    'category': compile_designation_criterion,
+    'level': compile_designation_criterion,
+    'department': compile_department_criterion,
+    'course_number_range': compile_course_number_range_criterion,
+    'school_or_college': compile_school_or_college_criterion
+}
+
+
+class CompiledCriterion:
+    """A single criterion of a filter, with its 'not_' prefix and aliases already resolved"""
+
+    __slots__ = ("criterion_type", "criterion", "negate", "check", "key")
+
+    def __init__(self, criterion_type: str, criterion, negate: bool, check):
+        self.criterion_type = criterion_type
+        self.criterion = criterion
+        self.negate = negate
+        self.check = check
+        # a hashable, order-insensitive description of the criterion
+        # two criteria with the same key always give the same answer for the same course
+        if isinstance(criterion, dict):
+            value_key = tuple(sorted(criterion.items()))
+        else:
+            value_key = tuple(sorted(criterion))
+        self.key = (criterion_type, negate, value_key)
+
+    def matches(self, course: dict) -> bool:
+        return self.check(course) != self.negate
+
+    def __repr__(self):
+        prefix = "not_" if self.negate else ""
+        return f"CompiledCriterion({prefix}{self.criterion_type}={self.criterion!r})"
+
+
+class CompiledFilter:
+    """A filter dictionary compiled into a predicate. All criteria have an AND relationship."""
+
+    __slots__ = ("source", "criteria", "key", "_fingerprint")
+
+    def __init__(self, source: dict, criteria: tuple[CompiledCriterion, ...]):
+        # we keep the original dictionary, course_passes_filters returns it to its callers
+        self.source = source
+        self.criteria = criteria
+        self.key = tuple(sorted(criterion.key for criterion in criteria))
+        self._fingerprint = None
+
+    @property
+    def fingerprint(self) -> str:
+        """A short, canonical hash of the key (the same for the same filter in every major and process).
+        Strings cache their hash, so this is also cheaper to look up than the nested key tuple.
+        Computed on first use, only the filter cache, the profiler and the registry need it
+        """
+        fingerprint = self._fingerprint
+        if fingerprint is None:
+            fingerprint = self._fingerprint = hashlib.sha1(repr(self.key).encode()).hexdigest()[:16]
+        return fingerprint
+
+    def matches(self, course: dict) -> bool:
+        for criterion in self.criteria:
+            # a criterion fails when its check result equals its negation flag
+            if criterion.check(course) == criterion.negate:
+                return False
+        return True
+
+    __call__ = matches
+
+    def __repr__(self):
+        return f"CompiledFilter({list(self.criteria)!r})"
+
+
+class CompiledFilters:
+    """A list of filters compiled into a predicate. The filters have an OR relationship."""
+
+    __slots__ = ("filters",)
+
+    def __init__(self, filters: tuple[CompiledFilter, ...]):
+        self.filters = filters
+
+    def first_match(self, course: dict) -> CompiledFilter | None:
+        for compiled_filter in self.filters:
+            if compiled_filter.matches(course):
+                return compiled_filter
+        return None
+
+    def matches(self, course: dict) -> bool:
+        return self.first_match(course) is not None
+
+    __call__ = matches
+
+    def __repr__(self):
+        return f"CompiledFilters({list(self.filters)!r})"
+
+
+def compile_filter(filter: dict | CompiledFilter) -> CompiledFilter:
+    """Compiles a filter dictionary into a CompiledFilter.
+
+    Args:
+        filter (dict | CompiledFilter): A filter is a dictionary of criteria. Keys may be singular or
+                                        plural, and a 'not_' prefix inverts the criterion.
+                                        An already compiled filter is returned as it is.
+
+    Raises:
+        KeyError: if the filter contains an unknown criterion type
+
+    Returns:
+        CompiledFilter: the precompiled predicate for this filter
+    """
+    if isinstance(filter, CompiledFilter):
+        return filter
+
+    criteria = []
+    for criterion_key, criterion in filter.items():
+        if criterion_key in FILTER_METADATA_KEYS:
+            continue
+        negate = criterion_key.startswith('not_')
+        actual_key = criterion_key[4:] if negate else criterion_key
+        criterion_type = CRITERION_TYPES[actual_key]
+        normalized, check = criterion_compilers[criterion_type](criterion)
+        criteria.append(CompiledCriterion(criterion_type, normalized, negate, check))
+
+    # sorted() is stable, so criteria with the same cost keep the order they were written in
+    criteria.sort(key=lambda compiled: CRITERION_COST[compiled.criterion_type])
+    return CompiledFilter(filter, tuple(criteria))
+
+
+def compile_filters(filters: list[dict] | CompiledFilters) -> CompiledFilters:
+    """Compiles a list of filters into a CompiledFilters object.
+    Filters that are identical after normalization are only kept once (the first one wins).
+
+    Args:
+        filters (list[dict] | CompiledFilters): A list of filter dictionaries, or already compiled filters
+
+    Returns:
+        CompiledFilters: the precompiled predicate for the list of filters
+    """
+    if isinstance(filters, CompiledFilters):
+        return filters
+
+    compiled_filters = {}
+    for filter in filters:
+        compiled = compile_filter(filter)
+        compiled_filters.setdefault(compiled.key, compiled)
+    return CompiledFilters(tuple(compiled_filters.values()))
+
@@ -0,0 +1,256 @@
+# WHERE THE CPU-BOUND EVALUATION RUNS
+# Requirement evaluation never awaits I/O, so an evaluation that runs on the event loop blocks every
+# other request until it is done. The EvaluationExecutor runs evaluation jobs in one of three modes:
+#   "inline"   on the event loop (no overhead, fine for small majors and transcripts)
+#   "thread"   in a thread pool (the event loop stays responsive, but the GIL still serializes the work)
+#   "process"  in a pool of warm worker processes (real parallelism)
+#
+# A job is a module-level function job(plan, *args). Only the major code and version are sent to a worker
+# process, never the compiled tree: every worker loads the majors itself when it starts (and reloads its
+# registry when a job asks for a version it doesn't have yet), and it gets the catalog snapshot for the planner.
+# Everything a job returns is pickled back to the API process, an EvaluationState without its tree
+# (jobs whose state isn't kept, like batch items, return the response alone).
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable
+
+from major_requirements.allocation import allocation_response
+from major_requirements.catalog_bitmap import CourseCatalogColumns
+from major_requirements.evaluation_state import (
+    EvaluationState, evaluate_transcript, state_to_node_results, state_to_response
+)
+from major_requirements.load_major import MajorPlan
+from major_requirements.major_registry import MajorRegistry
+from major_requirements.planner import PlannerIndex, plan_remaining_courses
+
+logger = logging.getLogger(__name__)
+
+EXECUTION_MODES = ("inline", "thread", "process")
+
+# the node depth each compact response detail goes down to ("full" is the whole annotated requirement tree)
+DETAIL_DEPTHS = {"summary": 1, "nodes": None}
+
+# the catalog snapshot handed to this process, and the columns and planner indices built on it (lazily)
+_catalog_source: tuple[list[dict], int] | None = None
+_catalog_columns: CourseCatalogColumns | None = None
+_catalog_epoch: int | None = None
+_planner_indices: dict[tuple[str, str], PlannerIndex] = {}
+# in "thread" mode several jobs build and look up the columns and indices at the same time
+_catalog_lock = threading.RLock()
+
+# the majors of a worker process, loaded by _init_worker
+_worker_registry: MajorRegistry | None = None
+
+
+class StalePlanError(LookupError):
+    """A worker process doesn't have the requested version of a major (its file changed again in between)"""
+
+
+def set_catalog(courses: list[dict], epoch: int):
+    """Hands the courses of a catalog epoch to the planner, the columns are built on the next catalog_columns call"""
+    global _catalog_source
+    with _catalog_lock:
+        _catalog_source = (courses, epoch)
+
+
+def catalog_columns() -> CourseCatalogColumns:
+    """The catalog columns of the latest catalog epoch, built once per epoch"""
+    global _catalog_columns, _catalog_epoch
+    with _catalog_lock:
+        if _catalog_source is None:
+            raise RuntimeError("The course catalog hasn't been loaded yet")
+        courses, epoch = _catalog_source
+        if _catalog_columns is None or _catalog_epoch != epoch:
+            _catalog_columns = CourseCatalogColumns(courses)
+            _catalog_epoch = epoch
+            # the eligibility sets point into the old columns
+            _planner_indices.clear()
+        return _catalog_columns
+
+
+def get_planner_index(plan: MajorPlan) -> PlannerIndex:
+    """The planner index of a major on the current catalog columns, computed once per major version"""
+    with _catalog_lock:
+        columns = catalog_columns()
+        key = (plan.code, plan.version)
+        index = _planner_indices.get(key)
+        if index is None:
+            # an index of an older version of the major is never used again
+            for stale_key in [stale_key for stale_key in _planner_indices if stale_key[0] == plan.code]:
+                del _planner_indices[stale_key]
+            index = _planner_indices[key] = PlannerIndex(plan.tree, columns)
+        return index
+
+
+def evaluate_job(plan: MajorPlan, student_courses: list[dict], allocate: bool = False,
+                 detail: str = "full") -> tuple[dict, EvaluationState]:
+    """Evaluates a transcript. Returns the response (without a state_id) and the state
+
+    Args:
+        detail (str): "full" for the course table and the annotated requirement tree, "nodes" for the
+                      pass/fail and totals of every node, "summary" for the major and its top-level requirements.
+                      The compact details never build the per-node course lists.
+    """
+    state = evaluate_transcript(plan.tree, student_courses)
+    if detail == "full":
+        response = state_to_response(state)
+    else:
+        response = state_to_node_results(state, max_depth=DETAIL_DEPTHS[detail])
+    if allocate:
+        response["allocation"] = allocation_response(state)
+    return response, state
+
+
+def evaluate_response_job(plan: MajorPlan, student_courses: list[dict], allocate: bool = False,
+                          detail: str = "full") -> dict:
+    """evaluate_job for callers that don't keep the state (e.g. batch items): only the response is returned,
+    so a worker process doesn't pickle the whole state back
+    """
+    response, _ = evaluate_job(plan, student_courses, allocate, detail)
+    return response
+
+
+def plan_job(plan: MajorPlan, student_courses: list[dict], time_budget: float, max_plans: int) -> dict:
+    """Evaluates a transcript and plans the additional courses that complete the major"""
+    index = get_planner_index(plan)
+    state = evaluate_transcript(index.tree, student_courses)
+    plans = plan_remaining_courses(state, index, time_budget=time_budget, max_plans=max_plans)
+    return {"passed": state.passed[0], "plans": [plan.to_dict(index.catalog) for plan in plans]}
+
+
+def _init_worker(major_directory: str | None, catalog_courses: list[dict] | None, catalog_epoch: int | None):
+    """Runs once in every worker process: compiles the majors and builds the catalog columns"""
+    global _worker_registry
+    _worker_registry = MajorRegistry(major_directory)
+    _worker_registry.refresh()
+    if catalog_courses:
+        set_catalog(catalog_courses, catalog_epoch)
+        catalog_columns()
+
+
+def _warm_up() -> int:
+    return os.getpid()
+
+
+def _run_in_worker(job: Callable, major_code: str, major_version: str, args: tuple):
+    """Looks up the major in the worker's own registry and runs the job on it"""
+    plan = _worker_registry.get(major_code)
+    if plan is None or plan.version != major_version:
+        _worker_registry.refresh()
+        plan = _worker_registry.get(major_code)
+        if plan is None or plan.version != major_version:
+            raise StalePlanError(f"Major '{major_code}' version {major_version} isn't available in worker {os.getpid()}")
+    return job(plan, *args)
+
+
+class EvaluationExecutor:
+    """Runs evaluation jobs inline, in a thread pool or in a process pool, and keeps queue and latency numbers"""
+
+    def __init__(self, mode: str = "inline", workers: int | None = None,
+                 major_directory: str | None = None, latency_window: int = 1000):
+        """
+        Args:
+            mode (str): "inline", "thread" or "process"
+            workers (int | None): the pool size, the number of CPUs by default
+            major_directory (str | None): where the worker processes load the majors from
+            latency_window (int): how many recent job latencies the percentiles are computed over
+        """
+        if mode not in EXECUTION_MODES:
+            raise ValueError(f"Unknown evaluation mode '{mode}', use one of {EXECUTION_MODES}")
+        self.mode = mode
+        self.workers = workers or os.cpu_count() or 1
+        self.major_directory = major_directory
+        self._pool = None
+        self._catalog: tuple[list[dict], int] | None = None
+        self.in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        self._latencies: deque[float] = deque(maxlen=latency_window)
+
+    def start(self):
+        if self.mode == "thread":
+            self._pool = ThreadPoolExecutor(self.workers, thread_name_prefix="evaluation")
+        elif self.mode == "process":
+            self._pool = self._new_process_pool()
+
+    def _new_process_pool(self) -> ProcessPoolExecutor:
+        courses, epoch = self._catalog or (None, None)
+        return ProcessPoolExecutor(self.workers, initializer=_init_worker,
+                                   initargs=(self.major_directory, courses, epoch))
+
+    async def warm_up(self):
+        """Starts every worker process now, so the first requests don't pay for loading the majors"""
+        if self.mode == "process":
+            loop = asyncio.get_running_loop()
+            await asyncio.gather(*(loop.run_in_executor(self._pool, _warm_up) for _ in range(self.workers)))
+
+    def set_catalog(self, courses: list[dict], epoch: int):
+        """Hands a new catalog snapshot to the planner. Worker processes get it with a new pool
+        (the jobs already submitted finish on the old one)
+        """
+        set_catalog(courses, epoch)
+        if self.mode != "process":
+            return
+        self._catalog = (courses, epoch)
+        if self._pool is not None:
+            old_pool, self._pool = self._pool, self._new_process_pool()
+            old_pool.shutdown(wait=False)
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    async def run(self, job: Callable, plan: MajorPlan, *args):
+        """Runs job(plan, *args) according to the mode and returns its result"""
+        self.in_flight += 1
+        started = time.perf_counter()
+        try:
+            if self.mode == "inline" or self._pool is None:
+                result = job(plan, *args)
+            elif self.mode == "thread":
+                result = await asyncio.get_running_loop().run_in_executor(self._pool, job, plan, *args)
+            else:
+                try:
+                    result = await asyncio.get_running_loop().run_in_executor(
+                        self._pool, _run_in_worker, job, plan.code, plan.version, args
+                    )
+                except StalePlanError:
+                    # the major changed again while the job was on its way, run it here on the plan we have
+                    logger.warning("Worker had a different version of major %s, running the job in a thread", plan.code)
+                    result = await asyncio.to_thread(job, plan, *args)
+        except BaseException:
+            self.failed += 1
+            raise
+        finally:
+            self.in_flight -= 1
+            self._latencies.append(time.perf_counter() - started)
+        self.completed += 1
+        return result
+
+    def stats(self) -> dict:
+        """Queue depth (jobs waiting for a free worker), jobs in flight and latency percentiles in milliseconds"""
+        latencies = sorted(self._latencies)
+
+        def percentile(fraction: float) -> float:
+            if not latencies:
+                return 0.0
+            return round(latencies[min(len(latencies) - 1, int(fraction * len(latencies)))] * 1000, 3)
+
+        parallel = 1 if self.mode == "inline" else self.workers
+        return {
+            "mode": self.mode,
+            "workers": 0 if self.mode == "inline" else self.workers,
+            "in_flight": self.in_flight,
+            "queue_depth": max(0, self.in_flight - parallel),
+            "completed": self.completed,
+            "failed": self.failed,
+            "latency_ms": {"p50": percentile(0.5), "p95": percentile(0.95), "p99": percentile(0.99),
+                           "max": round(latencies[-1] * 1000, 3) if latencies else 0.0}
+        }
@@ -0,0 +1,405 @@
+# PER-EVALUATION STATE FOR AN IMMUTABLE REQUIREMENT TREE
+# Every student evaluation gets its own EvaluationState: plain lists indexed by node index,
+# so the shared RequirementTree is never written to and never has to be deep-copied.
+#
+# Courses are stored ONCE in a course pool, and every node only keeps a set of integer course ids
+# with running totals, instead of its own list of course dictionaries.
+#
+# The numbers follow process_nested_requirement_with_course:
+# - a node's courses_passed holds the courses that match its own filter(s) plus the courses passed by
+#   any of its sub-requirements (without duplicates)
+# - "min_credits" counts the credits of courses_passed, "min_courses" counts the courses in it
+# - credits_constraints are applied right away (credit_constraints_update_requirement was a separate step)
+# - a node passes when its own validation passes AND all of its sub-requirements pass,
+#   a node without a validation block passes when all of its sub-requirements pass
+
+import copy
+
+from major_requirements.filter_cache import matcher_matches
+from major_requirements.profiler import get_profiler
+from major_requirements.requirement_tree import RequirementTree
+
+
+def course_key(course: dict) -> str:
+    """The key a course is pooled under: its _id, or its course_code for courses without one"""
+    return str(course["_id"]) if "_id" in course else course.get("course_code", "")
+
+
+class EvaluationState:
+    """The evaluation results of one transcript against one RequirementTree"""
+
+    __slots__ = ("tree", "courses", "course_ids", "course_credits", "transcript", "own_courses", "courses_passed",
+                 "raw_credits", "constraint_credits", "current_credits", "passed")
+
+    def __init__(self, tree: RequirementTree):
+        node_count = len(tree.nodes)
+        self.tree = tree
+        # the course pool: course dictionaries, their keys and credits, all indexed by course id (an int)
+        self.courses: list[dict] = []
+        self.course_ids: dict[str, int] = {}
+        self.course_credits: list[float] = []
+        # the course ids currently on the transcript (a removed course keeps its id in the pool)
+        self.transcript: set[int] = set()
+        # courses matched by the node's own filter(s)
+        self.own_courses: list[set[int]] = [set() for _ in range(node_count)]
+        # own courses plus the courses passed by the sub-requirements
+        self.courses_passed: list[set[int]] = [set() for _ in range(node_count)]
+        # running totals: credits before and after the credits_constraints of the node
+        self.raw_credits = [0] * node_count
+        self.constraint_credits = [[0] * len(node.credits_constraints) for node in tree.nodes]
+        self.current_credits = [0] * node_count
+        self.passed = [False] * node_count
+        for index in range(node_count - 1, -1, -1):
+            self._update_passed(index)
+
+    @property
+    def current_courses_count(self) -> list[int]:
+        return [len(courses) for courses in self.courses_passed]
+
+    def copy(self) -> "EvaluationState":
+        """A copy that can be changed without affecting this state. The tree and the course dictionaries are shared"""
+        state = EvaluationState.__new__(EvaluationState)
+        state.tree = self.tree
+        state.courses = list(self.courses)
+        state.course_ids = dict(self.course_ids)
+        state.course_credits = list(self.course_credits)
+        state.transcript = set(self.transcript)
+        state.own_courses = [set(courses) for courses in self.own_courses]
+        state.courses_passed = [set(courses) for courses in self.courses_passed]
+        state.raw_credits = list(self.raw_credits)
+        state.constraint_credits = [list(credits) for credits in self.constraint_credits]
+        state.current_credits = list(self.current_credits)
+        state.passed = list(self.passed)
+        return state
+
+    def __getstate__(self) -> dict:
+        """A state is pickled without its tree (e.g. to send it between processes), the tree is shared and large.
+        Whoever unpickles the state sets .tree to the RequirementTree of the same major version again.
+        """
+        return {name: getattr(self, name) for name in self.__slots__ if name != "tree"}
+
+    def __setstate__(self, values: dict):
+        self.tree = None
+        for name, value in values.items():
+            setattr(self, name, value)
+
+    def pool_course(self, course: dict) -> int:
+        """Adds a course to the pool (once) and returns its integer id"""
+        key = course_key(course)
+        course_id = self.course_ids.get(key)
+        if course_id is None:
+            course_id = len(self.courses)
+            self.course_ids[key] = course_id
+            self.courses.append(course)
+            self.course_credits.append(course.get("credits", 0))
+        return course_id
+
+    def _add_passed_course(self, index: int, course_id: int) -> bool:
+        """Adds a course to a node's courses_passed and updates the running totals.
+        Returns False if the node already had the course.
+        """
+        courses_passed = self.courses_passed[index]
+        if course_id in courses_passed:
+            return False
+        courses_passed.add(course_id)
+
+        node = self.tree.nodes[index]
+        credits = self.course_credits[course_id]
+        self.raw_credits[index] += credits
+        excess_credits = 0
+        if node.credits_constraints:
+            course = self.courses[course_id]
+            constraint_credits = self.constraint_credits[index]
+            for position, (constraint_filter, max_credits) in enumerate(node.credits_constraints):
+                if constraint_filter.matches(course):
+                    constraint_credits[position] += credits
+                excess_credits += max(constraint_credits[position] - max_credits, 0)
+        self.current_credits[index] = self.raw_credits[index] - excess_credits
+        return True
+
+    def _remove_passed_course(self, index: int, course_id: int) -> bool:
+        """Removes a course from a node's courses_passed, unless the node still gets it from its own filter(s)
+        or from one of its sub-requirements. Returns False if the node keeps the course.
+        """
+        node = self.tree.nodes[index]
+        courses_passed = self.courses_passed[index]
+        if (course_id not in courses_passed or course_id in self.own_courses[index]
+                or any(course_id in self.courses_passed[child] for child in node.children)):
+            return False
+        courses_passed.discard(course_id)
+
+        credits = self.course_credits[course_id]
+        self.raw_credits[index] -= credits
+        excess_credits = 0
+        if node.credits_constraints:
+            course = self.courses[course_id]
+            constraint_credits = self.constraint_credits[index]
+            for position, (constraint_filter, max_credits) in enumerate(node.credits_constraints):
+                if constraint_filter.matches(course):
+                    constraint_credits[position] -= credits
+                excess_credits += max(constraint_credits[position] - max_credits, 0)
+        self.current_credits[index] = self.raw_credits[index] - excess_credits
+        return True
+
+    def _aggregate_node(self, index: int):
+        """Computes a node's courses_passed and totals from its own courses and its children (which must be done)"""
+        node = self.tree.nodes[index]
+        courses_passed = self.own_courses[index].union(*(self.courses_passed[child] for child in node.children))
+        self.courses_passed[index] = courses_passed
+
+        course_credits = self.course_credits
+        self.raw_credits[index] = sum(course_credits[course_id] for course_id in courses_passed)
+        excess_credits = 0
+        if node.credits_constraints:
+            constraint_credits = self.constraint_credits[index]
+            for position, (constraint_filter, max_credits) in enumerate(node.credits_constraints):
+                constraint_credits[position] = sum(
+                    course_credits[course_id] for course_id in courses_passed
+                    if constraint_filter.matches(self.courses[course_id])
+                )
+                excess_credits += max(constraint_credits[position] - max_credits, 0)
+        self.current_credits[index] = self.raw_credits[index] - excess_credits
+        self._update_passed(index)
+
+    def _update_passed(self, index: int):
+        node = self.tree.nodes[index]
+        if node.validation_type == "min_credits":
+            own_passed = self.current_credits[index] >= node.validation_target
+        elif node.validation_type == "min_courses":
+            own_passed = len(self.courses_passed[index]) >= node.validation_target
+        else:
+            own_passed = True
+        self.passed[index] = own_passed and all(self.passed[child] for child in node.children)
+
+
+def process_course(state: EvaluationState, course: dict) -> EvaluationState:
+    """Adds a single course to an evaluation, the state version of process_nested_requirement_with_course.
+    Only the nodes that match the course and their ancestors are updated.
+
+    Args:
+        state (EvaluationState): the evaluation to update
+        course (dict): the course to evaluate
+
+    Returns:
+        EvaluationState: the same state object, updated
+    """
+    _add_course(state, course)
+    return state
+
+
+def _add_course(state: EvaluationState, course: dict) -> set[int]:
+    """Adds a course to the matching nodes and their ancestors, returns the indices of the nodes it touched"""
+    course_id = state.pool_course(course)
+    state.transcript.add(course_id)
+    nodes = state.tree.nodes
+    touched = set()
+    profiler = get_profiler()
+    for index in state.tree.matcher_indices:
+        if (matcher_matches(nodes[index].matcher, course) if profiler is None
+                else profiler.node_matches(nodes[index], course)):
+            state.own_courses[index].add(course_id)
+            # the course is passed by this node and by all of its ancestors
+            while index is not None and state._add_passed_course(index, course_id):
+                touched.add(index)
+                index = nodes[index].parent
+            # ancestors that already had the course still have to re-check their children
+            while index is not None:
+                touched.add(index)
+                index = nodes[index].parent
+
+    # children have higher indices than their parents, so this updates children first
+    for index in sorted(touched, reverse=True):
+        state._update_passed(index)
+    return touched
+
+
+def _remove_course(state: EvaluationState, course: dict) -> set[int]:
+    """Removes a course from every node that has it, returns the indices of the nodes it touched"""
+    course_id = state.course_ids.get(course_key(course))
+    if course_id is None or course_id not in state.transcript:
+        return set()
+    state.transcript.discard(course_id)
+    nodes = state.tree.nodes
+    touched = set()
+    for index in state.tree.matcher_indices:
+        if course_id in state.own_courses[index]:
+            state.own_courses[index].discard(course_id)
+            while index is not None:
+                touched.add(index)
+                index = nodes[index].parent
+
+    # children first, so a parent only drops the course once none of its sub-requirements has it
+    for index in sorted(touched, reverse=True):
+        state._remove_passed_course(index, course_id)
+        state._update_passed(index)
+    return touched
+
+
+def apply_course_delta(state: EvaluationState, course: dict, added: bool) -> list[int]:
+    """Adds or removes one course, only updating the nodes that match it and their ancestors
+
+    Args:
+        state (EvaluationState): the evaluation to update (use state.copy() to keep the previous one)
+        course (dict): the course that was added to or dropped from the transcript
+        added (bool): True if the course was added, False if it was removed
+
+    Returns:
+        list[int]: the indices of the nodes whose courses, totals or passed flag changed, in pre-order
+    """
+    before = {}
+
+    def snapshot(index: int) -> tuple:
+        return len(state.courses_passed[index]), state.current_credits[index], state.passed[index]
+
+    # the nodes that can change are known before the update: the matching nodes and their ancestors
+    course_id = state.course_ids.get(course_key(course))
+    nodes = state.tree.nodes
+    for index in state.tree.matcher_indices:
+        if (added and matcher_matches(nodes[index].matcher, course)) or (
+                not added and course_id is not None and course_id in state.own_courses[index]):
+            while index is not None and index not in before:
+                before[index] = snapshot(index)
+                index = nodes[index].parent
+
+    touched = _add_course(state, course) if added else _remove_course(state, course)
+    return sorted(index for index in touched if before.get(index) != snapshot(index))
+
+
+def process_courses(state: EvaluationState, courses: list[dict]) -> EvaluationState:
+    for course in courses:
+        process_course(state, course)
+    return state
+
+
+def evaluate_transcript(tree: RequirementTree, courses: list[dict]) -> EvaluationState:
+    """Evaluates a whole transcript in one pass, instead of feeding the courses in one at a time.
+
+    STEP 1: every course is matched once against every node that has its own filter(s)
+    STEP 2: one post-order walk builds courses_passed and the credit/course totals of every node
+            from its own courses and its children, so every parent is summed exactly once
+
+    Args:
+        tree (RequirementTree): the requirement tree to evaluate against
+        courses (list[dict]): the student's courses
+
+    Returns:
+        EvaluationState: a new state, the same as process_courses on an empty state would return
+    """
+    state = EvaluationState(tree)
+    nodes = tree.nodes
+    matcher_indices = tree.matcher_indices
+    # looked up once, the loop only pays one branch per check while profiling is off
+    profiler = get_profiler()
+    for course in courses:
+        course_id = state.pool_course(course)
+        state.transcript.add(course_id)
+        for index in matcher_indices:
+            if (matcher_matches(nodes[index].matcher, course) if profiler is None
+                    else profiler.node_matches(nodes[index], course)):
+                state.own_courses[index].add(course_id)
+
+    return recompute(state)
+
+
+def recompute(state: EvaluationState) -> EvaluationState:
+    """Rebuilds courses_passed, the totals and the passed flags of every node from own_courses.
+    Used after own_courses was filled (or restricted) directly instead of through process_course.
+    """
+    # walking the pre-order nodes backwards visits every child before its parent
+    for index in range(len(state.tree.nodes) - 1, -1, -1):
+        state._aggregate_node(index)
+    return state
+
+
+def passed_course_ids(state: EvaluationState, index: int) -> list[int]:
+    """The integer course ids passed by a node, in the order the courses were added"""
+    return sorted(state.courses_passed[index])
+
+
+def state_to_response(state: EvaluationState) -> dict:
+    """Builds the validation response: one top-level course table, and a requirement tree whose
+    nodes reference courses by their key instead of repeating the course dictionaries.
+
+    Returns:
+        dict: {"courses": {course key: course}, "requirements": {... "courses_passed": [course key, ...]}}
+    """
+    course_keys = list(state.course_ids)
+    return {
+        "courses": {course_keys[course_id]: state.courses[course_id] for course_id in sorted(state.transcript)},
+        "requirements": _node_to_dict(state, 0, lambda course_id: course_keys[course_id])
+    }
+
+
+def node_summary(state: EvaluationState, index: int) -> dict:
+    """The evaluation results of one node, without its sub-requirements, for delta responses"""
+    node = state.tree.nodes[index]
+    course_keys = list(state.course_ids)
+    return {
+        "requirement_path": node.path,
+        "courses_passed": [course_keys[course_id] for course_id in passed_course_ids(state, index)],
+        "current_credits": state.current_credits[index],
+        "current_courses_count": len(state.courses_passed[index]),
+        "passed": state.passed[index]
+    }
+
+
+def node_result(state: EvaluationState, index: int) -> dict:
+    """The pass/fail and totals of one node, without its courses (no course lists are built)"""
+    node = state.tree.nodes[index]
+    result = {
+        "id": node.node_id,
+        "parent": state.tree.nodes[node.parent].node_id if node.parent is not None else None,
+        "passed": state.passed[index],
+        "current_credits": state.current_credits[index],
+        "current_courses_count": len(state.courses_passed[index])
+    }
+    if "name" in node.info:
+        result["name"] = node.info["name"]
+    if node.validation_type is not None:
+        result[node.validation_type] = node.validation_target
+    return result
+
+
+def state_to_node_results(state: EvaluationState, max_depth: int | None = None) -> dict:
+    """Builds the compact validation response: a flat pre-order list of node results, down to max_depth
+    (0 is only the major itself, 1 adds the top-level requirements, None lists every node).
+
+    Returns:
+        dict: {"passed": bool, "requirements": [node_result, ...]}
+    """
+    depths = [0] * len(state.tree.nodes)
+    results = []
+    for node in state.tree.nodes:
+        if node.parent is not None:
+            depths[node.index] = depths[node.parent] + 1
+        if max_depth is None or depths[node.index] <= max_depth:
+            results.append(node_result(state, node.index))
+    return {"passed": state.passed[0], "requirements": results}
+
+
+def state_to_requirement_dict(state: EvaluationState, index: int = 0) -> dict:
+    """Builds the annotated requirement dictionary (the shape process_nested_requirement_with_course returns),
+    with full course dictionaries in every node's courses_passed.
+    The tree itself is not modified, every call returns new dictionaries.
+    """
+    return _node_to_dict(state, index, lambda course_id: state.courses[course_id])
+
+
+def _node_to_dict(state: EvaluationState, index: int, course_reference) -> dict:
+    node = state.tree.nodes[index]
+    requirement = copy.deepcopy(dict(node.info))
+    requirement["courses_passed"] = [course_reference(course_id) for course_id in passed_course_ids(state, index)]
+
+    if node.validation_type is not None:
+        validation = requirement["validation"]
+        if node.validation_type == "min_credits":
+            validation["current_credits"] = state.current_credits[index]
+        elif node.validation_type == "min_courses":
+            validation["current_courses_count"] = len(state.courses_passed[index])
+        validation["passed"] = state.passed[index]
+    else:
+        requirement["passed"] = state.passed[index]
+
+    if node.children:
+        requirement["requirements"] = [_node_to_dict(state, child, course_reference) for child in node.children]
+    return requirement
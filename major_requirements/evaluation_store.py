@@ -0,0 +1,39 @@
+# SERVER-SIDE EVALUATION STATES FOR DELTA VALIDATION
+# /validate stores the EvaluationState it computed and returns its id, so /validate/delta can add or drop
+# one course without fetching and re-evaluating the whole transcript.
+# States are never changed once they are stored: a delta works on state.copy() and is stored under a new id
+# (copy-on-write), so a client that goes back to an older state id still gets the old results.
+
+import threading
+import uuid
+from collections import OrderedDict
+
+from major_requirements.evaluation_state import EvaluationState
+
+
+class EvaluationStore:
+    """A bounded LRU of evaluation states, safe to use from the evaluation worker threads"""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._states: OrderedDict[str, EvaluationState] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, state: EvaluationState) -> str:
+        """Stores a state and returns its new id, evicting the least recently used state if the store is full"""
+        state_id = uuid.uuid4().hex
+        with self._lock:
+            self._states[state_id] = state
+            while len(self._states) > self.max_size:
+                self._states.popitem(last=False)
+        return state_id
+
+    def get(self, state_id: str) -> EvaluationState | None:
+        with self._lock:
+            state = self._states.get(state_id)
+            if state is not None:
+                self._states.move_to_end(state_id)
+            return state
+
+    def __len__(self):
+        return len(self._states)
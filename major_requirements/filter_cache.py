@@ -0,0 +1,141 @@
+# A MEMO OF FILTER OUTCOMES: (course _id, filter fingerprint) -> passed?
+# The same course is checked against the same filter many times: by sibling requirements, by repeated
+# requests for the same student, and by majors that share sub-requirements (e.g. Communication Skills).
+# A filter's fingerprint only depends on what the filter checks (see CompiledFilter.fingerprint),
+# so the outcomes can be shared across all of them.
+#
+# The cache is opt-in: nothing is cached until enable_filter_cache is called, and while it is disabled
+# the evaluation functions only pay one "is None" check.
+# Outcomes are only stored for courses that have an "_id".
+
+import threading
+from collections import OrderedDict
+
+from major_requirements.compile_filter import CompiledFilter, CompiledFilters
+
+
+class FilterOutcomeCache:
+    """A bounded LRU of filter outcomes with hit/miss counters, safe to use from several threads"""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._outcomes: OrderedDict[tuple[str, str], bool] = OrderedDict()
+        # course _id -> the filter fingerprints stored for it, so a changed course can be dropped quickly
+        self._fingerprints_by_course: dict[str, set[str]] = {}
+        self._lock = threading.Lock()
+
+    def matches(self, compiled_filter: CompiledFilter, course: dict) -> bool:
+        """The outcome of compiled_filter.matches(course), computed at most once per course and filter"""
+        course_id = course.get("_id")
+        if course_id is None:
+            return compiled_filter.matches(course)
+        key = (str(course_id), compiled_filter.fingerprint)
+
+        with self._lock:
+            outcome = self._outcomes.get(key)
+            if outcome is not None:
+                self._outcomes.move_to_end(key)
+                self.hits += 1
+                return outcome
+            self.misses += 1
+
+        # the filter itself runs outside the lock, two threads may compute the same outcome once each
+        outcome = compiled_filter.matches(course)
+        with self._lock:
+            self._outcomes[key] = outcome
+            self._fingerprints_by_course.setdefault(key[0], set()).add(key[1])
+            while len(self._outcomes) > self.max_size:
+                (evicted_course, evicted_fingerprint), _ = self._outcomes.popitem(last=False)
+                self._discard_fingerprint(evicted_course, evicted_fingerprint)
+                self.evictions += 1
+        return outcome
+
+    def _discard_fingerprint(self, course_id: str, fingerprint: str):
+        fingerprints = self._fingerprints_by_course.get(course_id)
+        if fingerprints is not None:
+            fingerprints.discard(fingerprint)
+            if not fingerprints:
+                del self._fingerprints_by_course[course_id]
+
+    def invalidate_course(self, course_id: str) -> int:
+        """Drops every outcome of a course, e.g. after its document changed. Returns how many were dropped"""
+        with self._lock:
+            fingerprints = self._fingerprints_by_course.pop(str(course_id), set())
+            for fingerprint in fingerprints:
+                self._outcomes.pop((str(course_id), fingerprint), None)
+            return len(fingerprints)
+
+    def invalidate_filters(self, fingerprints) -> int:
+        """Drops every outcome of the given filter fingerprints, e.g. the filters of a changed major file"""
+        fingerprints = set(fingerprints)
+        with self._lock:
+            stale = [key for key in self._outcomes if key[1] in fingerprints]
+            for course_id, fingerprint in stale:
+                del self._outcomes[(course_id, fingerprint)]
+                self._discard_fingerprint(course_id, fingerprint)
+            return len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._outcomes.clear()
+            self._fingerprints_by_course.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": True,
+                "size": len(self._outcomes),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
+
+
+# the process-wide cache, None while caching is disabled
+_filter_cache: FilterOutcomeCache | None = None
+
+
+def enable_filter_cache(max_size: int) -> FilterOutcomeCache:
+    """Turns on caching for the whole process (replacing an existing cache)"""
+    global _filter_cache
+    _filter_cache = FilterOutcomeCache(max_size)
+    return _filter_cache
+
+
+def disable_filter_cache():
+    global _filter_cache
+    _filter_cache = None
+
+
+def get_filter_cache() -> FilterOutcomeCache | None:
+    return _filter_cache
+
+
+def filter_matches(compiled_filter: CompiledFilter, course: dict) -> bool:
+    if _filter_cache is None:
+        return compiled_filter.matches(course)
+    return _filter_cache.matches(compiled_filter, course)
+
+
+def filters_first_match(compiled_filters: CompiledFilters, course: dict) -> CompiledFilter | None:
+    if _filter_cache is None:
+        return compiled_filters.first_match(course)
+    for compiled_filter in compiled_filters.filters:
+        if _filter_cache.matches(compiled_filter, course):
+            return compiled_filter
+    return None
+
+
+def matcher_matches(matcher: CompiledFilter | CompiledFilters, course: dict) -> bool:
+    """For the "matcher" of a requirement node, which is a single filter or a list of filters"""
+    if _filter_cache is None:
+        return matcher.matches(course)
+    if isinstance(matcher, CompiledFilter):
+        return _filter_cache.matches(matcher, course)
+    return filters_first_match(matcher, course) is not None
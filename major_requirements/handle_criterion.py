@@ -1,12 +1,15 @@
-from utils.parse_course_code import parse_course_code
+from utils.parse_course_code import course_number_value, parse_course_code
 
 # ALL CRITERIA BESIDES COURSE NUMBER RANGE CAN BE PASSED AS A SINGLE STRING OR A LIST OF STRINGS
 # THE SUB-CRITERIA IN THE LIST OF STRINGS PASSED IN TO THESE FUNCTIONS HAVE AN OR RELATIONSHIP
 # e.g. if the "criterion" argument is a list of strings, the course should pass at least one of the sub-criteria
 
+# NONE OF THESE CHECKS AWAIT ANY I/O, SO THE REAL WORK IS DONE IN THE PLAIN "_sync" FUNCTIONS
+# the async versions are thin wrappers kept for the callers (and tests) that already await them
 
 
-async def course_passes_course_code_criterion(course: dict, criterion: str | list[str]) -> bool:
+
+def course_passes_course_code_criterion_sync(course: dict, criterion: str | list[str]) -> bool:
     """Handle course code criterion with in-memory course data"""
     if isinstance(criterion, str):
         criterion = [criterion]
@@ -32,7 +35,11 @@ async def course_passes_course_code_criterion(course: dict, criterion: str | lis
     # that means the course is not in the list, so return False
     return False
 
-async def course_passes_category_criterion(course: dict, criterion: str | list[str]) -> bool:
+async def course_passes_course_code_criterion(course: dict, criterion: str | list[str]) -> bool:
+    """Async wrapper around course_passes_course_code_criterion_sync, kept for backward compatibility"""
+    return course_passes_course_code_criterion_sync(course, criterion)
+
+def course_passes_category_criterion_sync(course: dict, criterion: str | list[str]) -> bool:
     """Handle category criterion with in-memory course data"""
     if isinstance(criterion, str):
         criterion = [criterion]
@@ -43,9 +50,13 @@ async def course_passes_category_criterion(course: dict, criterion: str | list[s
     # Therefore, we're checking it the criterion belongs to any of the substrings in formatted designations
     return any(cat in designation for designation in formatted_designations for cat in criterion)
 
+async def course_passes_category_criterion(course: dict, criterion: str | list[str]) -> bool:
+    """Async wrapper around course_passes_category_criterion_sync, kept for backward compatibility"""
+    return course_passes_category_criterion_sync(course, criterion)
+
 # A LEVEL criterion could have multiple levels (e.g. Intermediate AND Advanced)
 # Therefore, the criterion value/parameter is a list of strings
-async def course_passes_level_criterion(course: dict, criterion: str | list[str]) -> bool:
+def course_passes_level_criterion_sync(course: dict, criterion: str | list[str]) -> bool:
     """Handle level criterion with in-memory course data"""
     if isinstance(criterion, str):
         criterion = [criterion]
@@ -59,7 +70,11 @@ async def course_passes_level_criterion(course: dict, criterion: str | list[str]
                 return True
     return False
 
-async def course_passes_department_criterion(course: dict, criterion: str | list[str]) -> bool:
+async def course_passes_level_criterion(course: dict, criterion: str | list[str]) -> bool:
+    """Async wrapper around course_passes_level_criterion_sync, kept for backward compatibility"""
+    return course_passes_level_criterion_sync(course, criterion)
+
+def course_passes_department_criterion_sync(course: dict, criterion: str | list[str]) -> bool:
     """Handle department criterion with in-memory course data"""
     if isinstance(criterion, str):
         criterion = [criterion]
@@ -68,11 +83,15 @@ async def course_passes_department_criterion(course: dict, criterion: str | list
     # Check if any department from criterion exists in the course's departments
     return any(dept in departments for dept in criterion)
 
+async def course_passes_department_criterion(course: dict, criterion: str | list[str]) -> bool:
+    """Async wrapper around course_passes_department_criterion_sync, kept for backward compatibility"""
+    return course_passes_department_criterion_sync(course, criterion)
+
 # The "course_number" type criterion has a value of a dictionary
 # Each key/value pair within the dictionary: Key is the comparative, value is a number
 # e.g. {'$gte': 300, '$lte': 699}
 # This means that the course numnber should be greater or equal to 300, less than or equal to 699
-async def course_passes_course_number_range_criterion(course: dict, criterion: dict) -> bool:
+def course_passes_course_number_range_criterion_sync(course: dict, criterion: dict) -> bool:
     """
     Handle course number range criterion with in-memory course data
     Supports MongoDB-style comparison operators for course numbers:
@@ -82,9 +101,13 @@ async def course_passes_course_number_range_criterion(course: dict, criterion: d
     - $lte (less than or equal)
     - $eq (equal)
     - $ne (not equal)
+    Suffixed course numbers are compared by their leading digits ("101A" -> 101),
+    a course number without any never passes (see course_number_value)
     """
     course_number_str = course.get("course_number", "")
-    course_number = int(course_number_str)
+    course_number = course_number_value(course_number_str)
+    if course_number is None:
+        return False
     
     # for 'course_number' criterion, usually there's an operator and a value to compare the course_number to
     # it could be a list, who knows...
@@ -105,14 +128,21 @@ async def course_passes_course_number_range_criterion(course: dict, criterion: d
     # If we passed all the operator checks, return True
     return True
 
+async def course_passes_course_number_range_criterion(course: dict, criterion: dict) -> bool:
+    """Async wrapper around course_passes_course_number_range_criterion_sync, kept for backward compatibility"""
+    return course_passes_course_number_range_criterion_sync(course, criterion)
+
 # TODO: We'll need to create a new field in the database that assigns each course to its college/school
 # @file:departments.json
-async def course_passes_school_or_college_criterion(course: dict, criterion: str | list[str]) -> bool:
+def course_passes_school_or_college_criterion_sync(course: dict, criterion: str | list[str]) -> bool:
     """Handle school/college criterion with in-memory course data"""
     if isinstance(criterion, str):
         criterion = [criterion]
         
     course_school_or_college = course["school-or-college"]
     return any(school in course_school_or_college for school in criterion)
-    
+
+async def course_passes_school_or_college_criterion(course: dict, criterion: str | list[str]) -> bool:
+    """Async wrapper around course_passes_school_or_college_criterion_sync, kept for backward compatibility"""
+    return course_passes_school_or_college_criterion_sync(course, criterion)
 
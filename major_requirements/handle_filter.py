@@ -11,6 +11,9 @@ from major_requirements.handle_criterion import (
     course_passes_course_number_range_criterion,
     course_passes_school_or_college_criterion # a dictionary matching the criterion type to the handle_creiterion function
 )
+from major_requirements.compile_filter import CompiledFilter, compile_filter
+from major_requirements.filter_cache import filter_matches
+from major_requirements.profiler import get_profiler
 
 # we map the keys of different criteria to a function name
 # we'll be deciding which function to use based on the key of the filter dictionary
@@ -28,35 +31,31 @@ criterion_handlers = {
     'school_or_college': course_passes_school_or_college_criterion
 }
 
-async def course_passes_filter(course: dict, filter: dict) -> bool:
+def course_passes_filter_sync(course: dict, filter: dict | CompiledFilter) -> bool:
     """_summary_
 
     Args:
         course (dict): A course object containing many different fields
-        filter (dict): A filter is a dictionary of criteria, the course must passes all criteria.
+        filter (dict | CompiledFilter): A filter is a dictionary of criteria, the course must passes all criteria.
                      For each key/value pair, the key that is the type of criterium,
                      and the value is the actual criterium for filtering.
                      If the key starts with 'not_', the result will be inverted.
+                     Pass in a filter from compile_filter to skip re-interpreting the dictionary.
 
     Returns:
         bool: returns True if the course passes filter, and False if not
     """
-    course_passes_filter = True
-    for criterium_type, criterium in filter.items():
-        # Check if this is a NOT criterion
-        is_not = criterium_type.startswith('not_')
-        # Remove 'not_' prefix if present to get the actual criterion type
-        actual_type = criterium_type[4:] if is_not else criterium_type
-        
-        course_passes_criterium = await criterion_handlers[actual_type](course, criterium)
-        # Invert the result if this is a NOT criterion
-        if is_not:
-            course_passes_criterium = not course_passes_criterium
-            
-        if not course_passes_criterium:
-            course_passes_filter = False
-            break
-    return course_passes_filter
+    # compile_filter returns already compiled filters as they are,
+    # so callers that compile their filters once at load time pay nothing extra here
+    # (the outcome comes from the filter cache when it is enabled)
+    profiler = get_profiler()
+    if profiler is not None:
+        return profiler.filter_matches(compile_filter(filter), course)
+    return filter_matches(compile_filter(filter), course)
+
+async def course_passes_filter(course: dict, filter: dict | CompiledFilter) -> bool:
+    """Async wrapper around course_passes_filter_sync, kept for backward compatibility"""
+    return course_passes_filter_sync(course, filter)
 
 import pytest
 
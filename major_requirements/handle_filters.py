@@ -1,23 +1,33 @@
-from major_requirements.handle_filter import course_passes_filter
+from major_requirements.compile_filter import CompiledFilters, compile_filters
+from major_requirements.filter_cache import filters_first_match
+from major_requirements.profiler import get_profiler
 import asyncio
 
-async def course_passes_filters(course: dict, filters: list[dict]) -> dict | None:
+def course_passes_filters_sync(course: dict, filters: list[dict] | CompiledFilters) -> dict | None:
     """_summary_
 
     Args:
         course (dict): A course object containing many different fields
-        filters (list[dict]): A list of filters, each filter is a dictionary of different types ofcriteria
+        filters (list[dict] | CompiledFilters): A list of filters, each filter is a dictionary of different types ofcriteria
+                                                Pass in filters from compile_filters to skip re-interpreting the dictionaries.
 
     Returns:
         dict | None: Returns the first filter that the course passes, or None if no filter passes
     """
-    for filter in filters:
-        passes = await course_passes_filter(course, filter)
-        if passes:
-            return filter  # Return the first passing filter
+    profiler = get_profiler()
+    if profiler is not None:
+        passing_filter = profiler.filters_first_match(compile_filters(filters), course)
+    else:
+        passing_filter = filters_first_match(compile_filters(filters), course)
+    if passing_filter is not None:
+        return passing_filter.source  # Return the first passing filter
             
     return None  # Return None if no filter passes
 
+async def course_passes_filters(course: dict, filters: list[dict] | CompiledFilters) -> dict | None:
+    """Async wrapper around course_passes_filters_sync, kept for backward compatibility"""
+    return course_passes_filters_sync(course, filters)
+
 
 async def test_course_passes_filters():
     example_filters = [
@@ -1,8 +1,6 @@
-from major_requirements.handle_filter import course_passes_filter
+from major_requirements.handle_requirement import course_updates_requirement_sync, requirement_passed_sync
 
-from major_requirements.handle_requirement import course_updates_requirement, requirement_passed
-
-async def process_nested_requirement_with_course(course: dict, requirement: dict) -> dict:
+def process_nested_requirement_with_course_sync(course: dict, requirement: dict) -> dict:
     """
     Process a single course against a nested requirement structure.
     Aggregates course information and credits from sub-requirements to parent.
@@ -16,7 +14,7 @@ async def process_nested_requirement_with_course(course: dict, requirement: dict
     """
     # Step 1: Process this requirement's direct filters using existing function
     # This already handles both "filter" and "filters" cases
-    requirement = await course_updates_requirement(course, requirement)
+    requirement = course_updates_requirement_sync(course, requirement)
     
     # Step 2: If this requirement has sub-requirements, process them recursively
     if "requirements" in requirement:
@@ -29,7 +27,7 @@ async def process_nested_requirement_with_course(course: dict, requirement: dict
         
         for i, sub_req in enumerate(requirement["requirements"]):
             # Process the same course against each sub-requirement
-            updated_sub_req = await process_nested_requirement_with_course(course, sub_req)
+            updated_sub_req = process_nested_requirement_with_course_sync(course, sub_req)
             requirement["requirements"][i] = updated_sub_req
             
             # Collect courses passed by sub-requirements
@@ -49,7 +47,7 @@ async def process_nested_requirement_with_course(course: dict, requirement: dict
             requirement["validation"]["current_credits"] = total_credits
     
     # Step 3: Check if this requirement passes based on its validation criteria
-    requirement = await requirement_passed(requirement)
+    requirement = requirement_passed_sync(requirement)
     
     # Step 4: For requirements with sub-requirements, determine if it passes
     # based on both its own validation and its sub-requirements
@@ -65,6 +63,10 @@ async def process_nested_requirement_with_course(course: dict, requirement: dict
     
     return requirement
 
+async def process_nested_requirement_with_course(course: dict, requirement: dict) -> dict:
+    """Async wrapper around process_nested_requirement_with_course_sync, kept for backward compatibility"""
+    return process_nested_requirement_with_course_sync(course, requirement)
+
 async def test_nested_requirement_single_course():
     """Test processing of a nested requirement structure with a single course"""
     
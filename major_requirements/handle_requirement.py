@@ -1,7 +1,11 @@
-from major_requirements.handle_filters import course_passes_filters
-from major_requirements.handle_filter import course_passes_filter
+from major_requirements.handle_filters import course_passes_filters_sync
+from major_requirements.handle_filter import course_passes_filter_sync
+from major_requirements.compile_filter import compile_filter
 
-async def course_updates_requirement(course: dict, requirement: dict):
+# THE "_sync" FUNCTIONS ARE THE EVALUATION ENGINE, NOTHING IN HERE WAITS ON I/O
+# the async functions with the original names only wrap them for backward compatibility
+
+def course_updates_requirement_sync(course: dict, requirement: dict):
     """
     Updates a requirement based on a single course.
     Handles both single filter (requirement["filter"]) and multiple filters (requirement["filters"]).
@@ -16,10 +20,10 @@ async def course_updates_requirement(course: dict, requirement: dict):
     # Check if we have a single filter or multiple filters
     if "filter" in requirement:
         # Single filter case
-        course_meets_requirement = await course_passes_filter(course, requirement["filter"])
+        course_meets_requirement = course_passes_filter_sync(course, requirement["filter"])
     elif "filters" in requirement:
         # Multiple filters case
-        course_meets_requirement = await course_passes_filters(course, requirement["filters"])
+        course_meets_requirement = course_passes_filters_sync(course, requirement["filters"])
     else:
         # No filter defined, can't evaluate
         return requirement
@@ -42,12 +46,16 @@ async def course_updates_requirement(course: dict, requirement: dict):
     
     return requirement
 
+async def course_updates_requirement(course: dict, requirement: dict):
+    """Async wrapper around course_updates_requirement_sync, kept for backward compatibility"""
+    return course_updates_requirement_sync(course, requirement)
+
 
 # NOTE: For the final processing, we'll pass in each course one by one
 #       to the validation function with the entire nested dictionary.
 #       Therefore, we probably won't be using this function in the
 #       final requirements processing. 
-async def courses_update_requirement(courses: list[dict], requirement: dict) -> dict:
+def courses_update_requirement_sync(courses: list[dict], requirement: dict) -> dict:
     """
     Updates a requirement by processing a list of courses sequentially.
     Each course updates the requirement, and the updated requirement is used for the next course.
@@ -61,11 +69,15 @@ async def courses_update_requirement(courses: list[dict], requirement: dict) ->
     """
     current_requirement = requirement
     for course in courses:
-        current_requirement = await course_updates_requirement(course, current_requirement)
+        current_requirement = course_updates_requirement_sync(course, current_requirement)
     return current_requirement
 
+async def courses_update_requirement(courses: list[dict], requirement: dict) -> dict:
+    """Async wrapper around courses_update_requirement_sync, kept for backward compatibility"""
+    return courses_update_requirement_sync(courses, requirement)
 
-async def credit_constraints_update_requirement(requirement: dict) -> dict:
+
+def credit_constraints_update_requirement_sync(requirement: dict) -> dict:
     """
     Applies credit constraints to the requirement's current_credits.
     Uses filters to identify courses and applies maximum credit limits.
@@ -85,10 +97,12 @@ async def credit_constraints_update_requirement(requirement: dict) -> dict:
         return requirement
         
     for constraint in requirement["credits_constraints"]:
+        # Compile the constraint's filter once for all the courses passed
+        constraint_filter = compile_filter(constraint["filter"])
         # Calculate total credits for courses matching this constraint's filter
         matching_credits = 0
         for course in requirement["courses_passed"]:
-            if await course_passes_filter(course, constraint["filter"]):
+            if course_passes_filter_sync(course, constraint_filter):
                 matching_credits += course["credits"]
         
         # If we're over the limit, subtract the excess from current_credits
@@ -100,8 +114,12 @@ async def credit_constraints_update_requirement(requirement: dict) -> dict:
             
     return requirement
 
+async def credit_constraints_update_requirement(requirement: dict) -> dict:
+    """Async wrapper around credit_constraints_update_requirement_sync, kept for backward compatibility"""
+    return credit_constraints_update_requirement_sync(requirement)
 
-async def requirement_passed(requirement):
+
+def requirement_passed_sync(requirement):
     """
     Check if a requirement passes based on its validation criteria.
     Ensures counters are initialized even if no courses matched.
@@ -132,3 +150,7 @@ async def requirement_passed(requirement):
             requirement["validation"]["passed"] = False
             
     return requirement
+
+async def requirement_passed(requirement):
+    """Async wrapper around requirement_passed_sync, kept for backward compatibility"""
+    return requirement_passed_sync(requirement)
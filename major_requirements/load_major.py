@@ -0,0 +1,183 @@
+# LOADING A MAJOR FILE: VALIDATE ONCE, COMPILE ONCE
+# A mistake in a major file used to show up as a KeyError deep inside course_passes_filter, on every
+# request that reached the broken requirement. Here we check the whole file against the schema when it
+# is loaded, report every problem at once, and compile it into an immutable MajorPlan.
+# Evaluation only ever sees the plan: the validation type, targets and compiled filters are already
+# worked out, so there is no dict introspection left in the per-course hot path.
+#
+# The schema of a requirement (every key is optional, other keys such as "name" or "notes" are kept as info):
+#   "filter": {criterion: value, ...}            a single filter
+#   "filters": [{criterion: value, ...}, ...]    a non-empty list of filters (OR), not together with "filter"
+#   "validation": {"min_credits": n} or {"min_courses": n}
+#   "credits_constraints": [{"max_credits": n, "filter": {...}}, ...]
+#   "requirements": [requirement, ...]
+
+from dataclasses import dataclass
+from types import MappingProxyType
+
+from major_requirements.compile_filter import CRITERION_TYPES, FILTER_METADATA_KEYS, RANGE_OPERATORS, compile_filter
+from major_requirements.major_files import load_major_file, major_code_for
+from major_requirements.requirement_tree import RequirementTree, build_requirement_tree
+from utils.fingerprint import fingerprint
+
+VALIDATION_TYPES = {"min_credits", "min_courses"}
+
+
+class MajorRequirementsError(ValueError):
+    """A major file doesn't match the schema. errors lists every problem with its requirement path"""
+
+    def __init__(self, source: str, errors: list[str]):
+        self.source = source
+        self.errors = errors
+        super().__init__(f"Invalid major requirements in {source}: " + "; ".join(errors))
+
+
+@dataclass(frozen=True, slots=True)
+class MajorPlan:
+    """A validated and compiled major, shared by every request"""
+
+    code: str
+    name: str
+    # a hash of the file contents, changes whenever the requirements change
+    version: str
+    tree: RequirementTree
+    # the requirements as they are in the file (read-only at the top level, don't modify the nested values)
+    source: MappingProxyType
+    file: str | None = None
+
+
+def is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def validate_filter(filter, where: str) -> list[str]:
+    """Checks one filter dictionary: known criterion types and well-formed values"""
+    if not isinstance(filter, dict):
+        return [f"{where}: a filter must be an object, not {type(filter).__name__}"]
+    if not any(key not in FILTER_METADATA_KEYS for key in filter):
+        return [f"{where}: the filter has no criteria"]
+
+    errors = []
+    for criterion_key, criterion in filter.items():
+        if criterion_key in FILTER_METADATA_KEYS:
+            continue
+        actual_key = criterion_key[4:] if criterion_key.startswith("not_") else criterion_key
+        criterion_type = CRITERION_TYPES.get(actual_key)
+        if criterion_type is None:
+            errors.append(f"{where}: unknown criterion type '{criterion_key}'")
+        elif criterion_type == "course_number_range":
+            if not isinstance(criterion, dict) or not criterion:
+                errors.append(f"{where}: '{criterion_key}' must be an object like {{\"$gte\": 300}}")
+                continue
+            for op, value in criterion.items():
+                if op not in RANGE_OPERATORS:
+                    errors.append(f"{where}: unknown operator '{op}' in '{criterion_key}'")
+                elif not is_number(value):
+                    errors.append(f"{where}: '{criterion_key}' {op} must be a number")
+        elif not (isinstance(criterion, str)
+                  or (isinstance(criterion, list) and criterion and all(isinstance(value, str) for value in criterion))):
+            errors.append(f"{where}: '{criterion_key}' must be a string or a non-empty list of strings")
+
+    if not errors:
+        # e.g. a course code that can't be parsed
+        try:
+            compile_filter(filter)
+        except ValueError as e:
+            errors.append(f"{where}: {e}")
+    return errors
+
+
+def validate_requirement(requirement, path: str = "") -> list[str]:
+    """Checks a requirement and all of its sub-requirements, returns every problem found"""
+    where = f"requirement '{path}'" if path else "the major"
+    if not isinstance(requirement, dict):
+        return [f"{where}: a requirement must be an object, not {type(requirement).__name__}"]
+
+    errors = []
+    if "filter" in requirement and "filters" in requirement:
+        errors.append(f"{where}: use either 'filter' or 'filters', not both")
+    if "filter" in requirement:
+        errors += validate_filter(requirement["filter"], f"{where} filter")
+    if "filters" in requirement:
+        filters = requirement["filters"]
+        if not isinstance(filters, list) or not filters:
+            errors.append(f"{where}: 'filters' must be a non-empty list")
+        else:
+            for position, filter in enumerate(filters):
+                errors += validate_filter(filter, f"{where} filters[{position}]")
+
+    if "validation" in requirement:
+        validation = requirement["validation"]
+        if not isinstance(validation, dict) or len(validation) != 1:
+            errors.append(f"{where}: 'validation' must have exactly one of {sorted(VALIDATION_TYPES)}")
+        else:
+            validation_type, target = next(iter(validation.items()))
+            if validation_type not in VALIDATION_TYPES:
+                errors.append(f"{where}: unknown validation type '{validation_type}'")
+            elif not is_number(target) or target < 0:
+                errors.append(f"{where}: '{validation_type}' must be a non-negative number")
+
+    if "credits_constraints" in requirement:
+        constraints = requirement["credits_constraints"]
+        if not isinstance(constraints, list):
+            errors.append(f"{where}: 'credits_constraints' must be a list")
+        else:
+            for position, constraint in enumerate(constraints):
+                constraint_where = f"{where} credits_constraints[{position}]"
+                if not isinstance(constraint, dict) or "filter" not in constraint or "max_credits" not in constraint:
+                    errors.append(f"{constraint_where}: needs 'max_credits' and 'filter'")
+                    continue
+                if not is_number(constraint["max_credits"]) or constraint["max_credits"] < 0:
+                    errors.append(f"{constraint_where}: 'max_credits' must be a non-negative number")
+                errors += validate_filter(constraint["filter"], f"{constraint_where} filter")
+
+    if "requirements" in requirement:
+        sub_requirements = requirement["requirements"]
+        if not isinstance(sub_requirements, list):
+            errors.append(f"{where}: 'requirements' must be a list")
+        else:
+            for position, sub_requirement in enumerate(sub_requirements):
+                sub_path = f"{path}.{position}" if path else str(position)
+                errors += validate_requirement(sub_requirement, sub_path)
+    return errors
+
+
+def compile_major(data: dict, code: str, file: str | None = None) -> MajorPlan:
+    """Validates a major's requirements and compiles them into a MajorPlan
+
+    Args:
+        data (dict): the contents of a major file
+        code (str): the major code, also the node id of the root requirement
+        file (str | None): where the data came from, for error messages
+
+    Raises:
+        MajorRequirementsError: with every schema problem of the file
+    """
+    errors = validate_requirement(data)
+    if errors:
+        raise MajorRequirementsError(file or code, errors)
+    return MajorPlan(
+        code=code,
+        name=data.get("major_name", "Unknown Major"),
+        version=fingerprint(data),
+        tree=build_requirement_tree(data, root_id=code),
+        source=MappingProxyType(data),
+        file=file
+    )
+
+
+def load_major(path: str) -> MajorPlan:
+    """Reads, validates and compiles a major file
+
+    Raises:
+        MajorRequirementsError: if the file doesn't match the schema (or isn't valid JSON)
+        FileNotFoundError: if the file doesn't exist
+    """
+    try:
+        data = load_major_file(path)
+    except ValueError as e:
+        # json.JSONDecodeError is a ValueError too, but it should read like any other broken file
+        raise MajorRequirementsError(path, [f"invalid JSON: {e}"]) from e
+    if not isinstance(data, dict):
+        raise MajorRequirementsError(path, ["the file must contain a JSON object"])
+    return compile_major(data, major_code_for(path, data), file=path)
@@ -0,0 +1,37 @@
+import json
+import os
+
+from config import Settings
+
+# every major is stored in its own JSON file, e.g. "ee_major_requirements.json"
+MAJOR_FILE_SUFFIX = "_major_requirements.json"
+
+
+def discover_major_files(directory: str | None = None) -> list[str]:
+    """Lists the paths of all major requirement files in a directory
+
+    Args:
+        directory (str | None): where to look, Settings.MAJOR_REQUIREMENTS_DIR by default
+
+    Returns:
+        list[str]: sorted file paths ending with "_major_requirements.json"
+    """
+    directory = directory if directory is not None else Settings.MAJOR_REQUIREMENTS_DIR
+    return sorted(
+        os.path.join(directory, file) for file in os.listdir(directory) if file.endswith(MAJOR_FILE_SUFFIX)
+    )
+
+
+def major_code_for(path: str, data: dict) -> str:
+    """The "major_code" of a major file, or the file name without the suffix if it isn't set"""
+    return data.get("major_code", os.path.basename(path).replace(MAJOR_FILE_SUFFIX, ""))
+
+
+def load_major_file(path: str) -> dict:
+    """Reads a major requirement file
+
+    Raises:
+        FileNotFoundError, json.JSONDecodeError: if the file is missing or isn't valid JSON
+    """
+    with open(path, "r") as f:
+        return json.load(f)
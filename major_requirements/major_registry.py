@@ -0,0 +1,133 @@
+# ALL MAJORS, LOADED ONCE AND KEPT IN MEMORY
+# The registry discovers every "*_major_requirements.json" file, compiles it with load_major and
+# serves the MajorPlans from memory. refresh() only reloads the files whose modification time changed.
+#
+# The loaded majors live in one read-only mapping that is REPLACED, never modified: a refresh builds a
+# new mapping and swaps the reference in a single assignment. A request that grabbed a plan (or the whole
+# snapshot) keeps using it until it's done, even if the file is reloaded in the meantime.
+
+import asyncio
+import logging
+import os
+import threading
+from types import MappingProxyType
+
+from major_requirements.filter_cache import get_filter_cache
+from major_requirements.load_major import MajorPlan, MajorRequirementsError, load_major
+from major_requirements.major_files import discover_major_files
+
+logger = logging.getLogger(__name__)
+
+
+class MajorRegistry:
+    """The compiled majors of a directory, by major code"""
+
+    def __init__(self, directory: str | None = None):
+        self.directory = directory
+        self._plans: MappingProxyType = MappingProxyType({})
+        # file path -> (modification time, the major code it was loaded as, or None if it failed)
+        self._files: dict[str, tuple[int, str | None]] = {}
+        # file path -> the error of its last load, a broken file keeps serving its previous plan
+        self.errors: dict[str, str] = {}
+        # only one refresh at a time, reads never take the lock
+        self._refresh_lock = threading.Lock()
+
+    def snapshot(self) -> MappingProxyType:
+        """All loaded majors at this moment, unaffected by later reloads"""
+        return self._plans
+
+    def get(self, major_code: str) -> MajorPlan | None:
+        return self._plans.get(major_code)
+
+    def majors(self) -> list[dict]:
+        return [{"code": plan.code, "name": plan.name, "file": os.path.basename(plan.file or ""), "version": plan.version}
+                for plan in sorted(self._plans.values(), key=lambda plan: plan.code)]
+
+    def refresh(self) -> dict:
+        """Reloads new and changed major files, drops the majors whose file was removed
+
+        Returns:
+            dict: {"loaded": [codes], "removed": [codes], "failed": {path: error}}
+        """
+        with self._refresh_lock:
+            current = {}
+            for path in discover_major_files(self.directory):
+                try:
+                    current[path] = os.stat(path).st_mtime_ns
+                except FileNotFoundError:
+                    # removed between listing the directory and looking at it
+                    continue
+
+            plans = dict(self._plans)
+            loaded, removed, failed = [], [], {}
+            # the plans that were replaced or removed by this refresh
+            retired: list[MajorPlan] = []
+            for path in set(self._files) - set(current):
+                _, code = self._files.pop(path)
+                self.errors.pop(path, None)
+                if code is not None and code in plans and plans[code].file == path:
+                    removed.append(code)
+                    retired.append(plans.pop(code))
+
+            for path, mtime in sorted(current.items()):
+                previous = self._files.get(path)
+                if previous is not None and previous[0] == mtime:
+                    continue
+                try:
+                    plan = load_major(path)
+                except (MajorRequirementsError, OSError) as e:
+                    # keep serving the previous version of a major while its file is broken
+                    failed[path] = str(e)
+                    self.errors[path] = str(e)
+                    self._files[path] = (mtime, previous[1] if previous else None)
+                    logger.warning("Could not load major file %s: %s", path, e)
+                    continue
+
+                old_plan = plans.get(plan.code)
+                if old_plan is not None and old_plan.file != path:
+                    logger.warning("Major code %s is defined by both %s and %s, using %s",
+                                   plan.code, old_plan.file, path, path)
+                if previous is not None and previous[1] not in (None, plan.code) and previous[1] in plans:
+                    # the file now defines a different major code
+                    removed.append(previous[1])
+                    retired.append(plans.pop(previous[1]))
+                if old_plan is not None:
+                    retired.append(old_plan)
+                plans[plan.code] = plan
+                self._files[path] = (mtime, plan.code)
+                self.errors.pop(path, None)
+                loaded.append(plan.code)
+
+            if loaded or removed:
+                # the atomic swap: readers see either the old or the new mapping, never a mix
+                self._plans = MappingProxyType(plans)
+                self._drop_unused_filters(retired, plans.values())
+            return {"loaded": loaded, "removed": removed, "failed": failed}
+
+    @staticmethod
+    def _drop_unused_filters(retired: list[MajorPlan], current) -> int:
+        """Drops the cached filter outcomes of the filters that no loaded major uses any more
+
+        A fingerprint is a hash of what the filter checks, so the cached outcomes of a filter stay correct
+        across reloads (a changed filter gets a new fingerprint). Only the outcomes that nothing can ask
+        for again are dropped, to make room for the others. Filters shared with other majors are kept.
+        """
+        cache = get_filter_cache()
+        if cache is None or not retired:
+            return 0
+        unused = set().union(*(plan.tree.filter_fingerprints() for plan in retired))
+        for plan in current:
+            unused -= plan.tree.filter_fingerprints()
+        return cache.invalidate_filters(unused) if unused else 0
+
+    async def watch(self, interval: float):
+        """Checks the major files for changes every interval seconds, until the task is cancelled"""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                summary = await asyncio.to_thread(self.refresh)
+            except Exception:
+                logger.exception("Refreshing the major registry failed")
+                continue
+            if summary["loaded"] or summary["removed"]:
+                logger.info("Reloaded majors: %s", summary)
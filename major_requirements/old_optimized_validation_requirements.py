@@ -1,4 +1,3 @@
-from motor.motor_asyncio import AsyncIOMotorClient
 import sys
 from pathlib import Path
 import asyncio
@@ -10,11 +9,7 @@ import copy
 # Add the parent directory to sys.path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 from config import Settings
-
-# Initialize the async MongoDB client
-client = AsyncIOMotorClient(Settings.MONGODB_URI)
-db = client.uwmatch  # Database name
-course_collection = db.courses
+from utils.get_mongodb_collection import get_mongodb_collection
 
 # ============================
 # Strategy Pattern Handlers for In-Memory Data
@@ -66,6 +61,8 @@ async def bulk_strategy_check_courses_condition(condition: dict, courses: List[s
     ]
     
     # course_data is a list of dictionaries, wht key/value pairs being the field names and values we extracted
+    # the courses collection of the shared async MongoDB client, looked up when the query runs
+    course_collection = get_mongodb_collection("courses")
     course_data = await course_collection.aggregate(base_pipeline).to_list(length=None)
     
     # convert the list of dictionaries into a dictionary of dictionaries, with each sub-dictionary's key being the course_id
@@ -0,0 +1,284 @@
+# WHAT DOES A STUDENT STILL HAVE TO TAKE?
+# Given an evaluation of a transcript, the planner looks for a small set of additional catalog courses
+# that makes every requirement pass, with as few total credits as possible.
+#
+# This is a weighted set cover: every requirement node that isn't passed yet has a "shortfall"
+# (missing credits or missing courses), and every catalog course covers some of it.
+#
+# STEP 1 (once per major and catalog): PlannerIndex evaluates the filter(s) of every requirement node
+#        over the whole catalog as bitmaps (catalog_bitmap.py), so every node knows its eligible courses
+#        and every catalog course knows the nodes it counts toward
+# STEP 2 (greedy): keep adding the course that removes the most shortfall per credit
+# STEP 3 (branch and bound): search for cheaper plans until the time budget is used up,
+#        pruning every branch that can't beat the cheapest plan found so far
+#
+# Both steps add courses to one working state and undo them again (apply_course_delta), a state is only
+# copied when it becomes part of a plan. The deadline is also checked while courses are scored,
+# a catalog has thousands of candidates and scoring all of them can take longer than the budget itself.
+
+import heapq
+import time
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from major_requirements.catalog_bitmap import CourseCatalogColumns
+from major_requirements.compile_filter import CompiledFilter
+from major_requirements.evaluation_state import EvaluationState, apply_course_delta
+from major_requirements.requirement_tree import RequirementTree
+
+# how many courses are scored between two looks at the clock
+DEADLINE_CHECK_INTERVAL = 256
+
+
+class PlannerIndex:
+    """The eligibility sets of one requirement tree over one catalog. Build it once and reuse it for every student"""
+
+    def __init__(self, tree: RequirementTree, catalog: CourseCatalogColumns):
+        self.tree = tree
+        self.catalog = catalog
+        nodes = tree.nodes
+
+        # node index -> catalog indices of the courses its own filter(s) accept
+        self.eligible: dict[int, np.ndarray] = {}
+        for index in tree.matcher_indices:
+            matcher = nodes[index].matcher
+            if isinstance(matcher, CompiledFilter):
+                mask = catalog.filter_mask(matcher)
+            else:
+                mask = catalog.filters_mask(matcher)
+            self.eligible[index] = np.flatnonzero(mask)
+
+        # catalog index -> the nodes the course counts toward: the matching nodes and all their ancestors
+        matching_nodes: dict[int, list[int]] = {}
+        for index, course_indices in self.eligible.items():
+            for course_index in course_indices.tolist():
+                matching_nodes.setdefault(course_index, []).append(index)
+        self.counted_nodes: dict[int, tuple[int, ...]] = {}
+        for course_index, indices in matching_nodes.items():
+            counted = set()
+            for index in indices:
+                while index is not None and index not in counted:
+                    counted.add(index)
+                    index = nodes[index].parent
+            self.counted_nodes[course_index] = tuple(sorted(counted))
+
+        # the fewest credits a single course that counts toward the node has (its own eligible courses and
+        # the ones of its sub-requirements), for the lower bound of a "min_courses" node
+        self.min_course_credits: dict[int, float] = {}
+        counted_masks = [None] * len(nodes)
+        for node in reversed(nodes):
+            mask = np.zeros(catalog.course_count, dtype=bool)
+            if node.index in self.eligible:
+                mask[self.eligible[node.index]] = True
+            for child in node.children:
+                mask |= counted_masks[child]
+            counted_masks[node.index] = mask
+            credits = catalog.credits[mask]
+            positive = credits[credits > 0]
+            self.min_course_credits[node.index] = float(positive.min()) if positive.size else 0.0
+
+
+@dataclass
+class Plan:
+    """A set of additional courses, ranked by total_credits"""
+
+    course_ids: list[str]
+    total_credits: float
+    # the state with the planned courses added
+    state: EvaluationState = field(repr=False)
+
+    @property
+    def complete(self) -> bool:
+        return self.state.passed[0]
+
+    def to_dict(self, catalog: CourseCatalogColumns) -> dict:
+        nodes = self.state.tree.nodes
+        return {
+            "courses": [catalog.courses[catalog.index_by_id[course_id]] for course_id in self.course_ids],
+            "total_credits": self.total_credits,
+            "complete": self.complete,
+            "unmet_requirements": [node.path for node in nodes if not self.state.passed[node.index]]
+        }
+
+
+def node_shortfall(state: EvaluationState, index: int) -> float:
+    """How much the node's own validation is missing, in credits or courses (0 if it passes)"""
+    node = state.tree.nodes[index]
+    if node.validation_type == "min_credits":
+        return max(node.validation_target - state.current_credits[index], 0)
+    if node.validation_type == "min_courses":
+        return max(node.validation_target - len(state.courses_passed[index]), 0)
+    return 0
+
+
+def course_gain(state: EvaluationState, index: PlannerIndex, course_index: int) -> float:
+    """How much shortfall a course would remove, every node counted as a fraction of its target"""
+    nodes = state.tree.nodes
+    credits = float(index.catalog.credits[course_index])
+    course = None
+    gain = 0.0
+    for node_index in index.counted_nodes.get(course_index, ()):
+        shortfall = node_shortfall(state, node_index)
+        if shortfall <= 0:
+            continue
+        node = nodes[node_index]
+        if node.validation_type == "min_courses":
+            gain += 1 / node.validation_target
+            continue
+        added = credits
+        if node.credits_constraints:
+            # credits over a credits constraint don't count toward the node
+            course = course if course is not None else index.catalog.courses[course_index]
+            for position, (constraint_filter, max_credits) in enumerate(node.credits_constraints):
+                if constraint_filter.matches(course):
+                    room = max(max_credits - state.constraint_credits[node_index][position], 0)
+                    added = min(added, room)
+        gain += min(added, shortfall) / node.validation_target
+    return gain
+
+
+def credits_lower_bound(state: EvaluationState, index: PlannerIndex) -> float:
+    """The fewest credits any completion of the state still needs: the largest single-node shortfall"""
+    bound = 0.0
+    for node in state.tree.nodes:
+        shortfall = node_shortfall(state, node.index)
+        if node.validation_type == "min_courses":
+            shortfall *= index.min_course_credits[node.index]
+        bound = max(bound, shortfall)
+    return bound
+
+
+def candidate_courses(state: EvaluationState, index: PlannerIndex, excluded: set[int]) -> list[int]:
+    """The catalog courses that count toward at least one node with a shortfall, without the excluded ones"""
+    candidates = set()
+    for node_index, course_indices in index.eligible.items():
+        # a course counts toward the node and its ancestors, so it helps if any of them is short
+        ancestor = node_index
+        while ancestor is not None and node_shortfall(state, ancestor) <= 0:
+            ancestor = state.tree.nodes[ancestor].parent
+        if ancestor is not None:
+            candidates.update(course_indices.tolist())
+    return [course_index for course_index in candidates if course_index not in excluded]
+
+
+def plan_remaining_courses(state: EvaluationState, index: PlannerIndex, time_budget: float = 0.5,
+                           max_plans: int = 3, branch_width: int = 6, max_courses: int = 30) -> list[Plan]:
+    """Finds small sets of additional catalog courses that make every requirement pass
+
+    Args:
+        state (EvaluationState): the evaluation of the student's transcript
+        index (PlannerIndex): the eligibility sets of the same tree over the catalog
+        time_budget (float): seconds the whole planning may take, when they run out during the greedy step
+                             the partial greedy plan is returned (complete == False)
+        max_plans (int): how many plans to return
+        branch_width (int): how many courses the search tries for each requirement it branches on
+        max_courses (int): the most courses a plan may add
+
+    Returns:
+        list[Plan]: plans ranked by total credits, the cheapest first. If the requirements can't be
+        completed from the catalog, the single (greedy) plan has complete == False
+    """
+    deadline = time.perf_counter() + time_budget
+    catalog = index.catalog
+    credits = catalog.credits
+    # courses already on the transcript are never planned again
+    on_transcript = {
+        catalog.index_by_id[course_key]
+        for course_key, course_id in state.course_ids.items()
+        if course_id in state.transcript and course_key in catalog.index_by_id
+    }
+
+    def ratio(current: EvaluationState, course_index: int) -> float:
+        return course_gain(current, index, course_index) / max(float(credits[course_index]), 1.0)
+
+    def scored_courses(current: EvaluationState, course_indices: list[int]) -> list[tuple[float, int]]:
+        """(-ratio, course index) of every course with a gain, cut short when the deadline passes"""
+        scored = []
+        for position, course_index in enumerate(course_indices):
+            if position % DEADLINE_CHECK_INTERVAL == 0 and time.perf_counter() > deadline:
+                break
+            course_ratio = ratio(current, course_index)
+            if course_ratio > 0:
+                scored.append((-course_ratio, course_index))
+        return scored
+
+    # STEP 2: greedy, the course with the most gain per credit first
+    # gains only shrink while courses are added (shortfalls and the room under credits constraints only go down),
+    # so the ratio a course was last scored with is an upper bound of its current one. Only the course on top
+    # of the heap is rescored, if it still leads with its current ratio it is the best course of this step
+    greedy_state = state.copy()
+    greedy_courses: list[int] = []
+    heap = scored_courses(greedy_state, candidate_courses(greedy_state, index, on_transcript))
+    heapq.heapify(heap)
+    while heap and not greedy_state.passed[0] and len(greedy_courses) < max_courses:
+        if time.perf_counter() > deadline:
+            break
+        _, course_index = heapq.heappop(heap)
+        course_ratio = ratio(greedy_state, course_index)
+        if course_ratio <= 0:
+            continue
+        if heap and -course_ratio > heap[0][0]:
+            heapq.heappush(heap, (-course_ratio, course_index))
+            continue
+        greedy_courses.append(course_index)
+        apply_course_delta(greedy_state, catalog.courses[course_index], added=True)
+
+    def make_plan(course_indices: list[int], planned_state: EvaluationState) -> Plan:
+        ordered = sorted(course_indices)
+        return Plan(course_ids=[catalog.course_ids[course_index] for course_index in ordered],
+                    total_credits=float(credits[ordered].sum()) if ordered else 0.0,
+                    state=planned_state)
+
+    greedy_plan = make_plan(greedy_courses, greedy_state)
+    if not greedy_plan.complete:
+        return [greedy_plan]
+
+    # STEP 3: branch and bound, always branching on the requirement with the fewest candidates
+    plans = {frozenset(greedy_courses): greedy_plan}
+
+    def worst_kept_credits() -> float:
+        ranked = sorted(plan.total_credits for plan in plans.values())
+        return ranked[max_plans - 1] if len(ranked) >= max_plans else float("inf")
+
+    # the search adds a course to the working state before it goes deeper and removes it again afterwards
+    working = state.copy()
+
+    def search(chosen: list[int], chosen_credits: float):
+        if time.perf_counter() > deadline:
+            return
+        if working.passed[0]:
+            key = frozenset(chosen)
+            if key not in plans:
+                plans[key] = make_plan(chosen, working.copy())
+            return
+        if len(chosen) >= max_courses or chosen_credits + credits_lower_bound(working, index) >= worst_kept_credits():
+            return
+
+        excluded = on_transcript.union(chosen)
+        short_nodes = [node.index for node in working.tree.nodes if node_shortfall(working, node.index) > 0]
+        options = []
+        for node_index in short_nodes:
+            node_candidates = [course_index for course_index in index.eligible.get(node_index, np.asarray([], dtype=np.int64)).tolist()
+                               if course_index not in excluded]
+            if not node_candidates:
+                # a node without (remaining) candidates of its own can still be completed through its
+                # sub-requirements, whether that is possible at all is left to the lower bound and the deeper search
+                continue
+            options.append((len(node_candidates), node_index, node_candidates))
+        if not options:
+            # only nodes without candidates of their own are short, branch on every course that counts toward them
+            options = [(0, 0, candidate_courses(working, index, excluded))]
+
+        _, _, node_candidates = min(options)
+        for _, course_index in heapq.nsmallest(branch_width, scored_courses(working, node_candidates)):
+            # adding and removing a course isn't free either, so no more branches are tried once the time is up
+            if time.perf_counter() > deadline:
+                return
+            course = catalog.courses[course_index]
+            apply_course_delta(working, course, added=True)
+            search(chosen + [course_index], chosen_credits + float(credits[course_index]))
+            apply_course_delta(working, course, added=False)
+
+    search([], 0.0)
+    return sorted(plans.values(), key=lambda plan: (plan.total_credits, len(plan.course_ids)))[:max_plans]
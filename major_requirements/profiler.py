@@ -0,0 +1,175 @@
+# WHICH REQUIREMENT OR FILTER MAKES A MAJOR SLOW?
+# An opt-in profiler for the evaluation: while it is enabled, every filter check is timed and counted
+# per requirement node (by node id), per filter (by fingerprint) and per criterion type.
+# report() sorts them by cumulative time, so the "hot" filters of a major are at the top.
+#
+# While the profiler is disabled, the evaluation only pays one "is None" branch per check (the profiler is
+# looked up once per evaluation). While it is enabled, the filter cache is bypassed so that every criterion
+# is really checked and timed, and the numbers include the profiler's own bookkeeping.
+#
+# From the command line, the hot filters of a major for a transcript (a JSON list of course documents):
+#   python -m major_requirements.profiler ee_major_requirements.json transcript.json --by filters --limit 20
+
+import argparse
+import json
+import threading
+import time
+
+from major_requirements.compile_filter import CompiledFilter, CompiledFilters
+
+PROFILE_DIMENSIONS = ("nodes", "filters", "criteria")
+
+
+class ProfileStats:
+    """Call count, match count and cumulative nanoseconds of one node, filter or criterion type"""
+
+    __slots__ = ("calls", "matches", "nanoseconds")
+
+    def __init__(self):
+        self.calls = 0
+        self.matches = 0
+        self.nanoseconds = 0
+
+    def to_dict(self) -> dict:
+        return {
+            "calls": self.calls,
+            "matches": self.matches,
+            "match_rate": round(self.matches / self.calls, 4) if self.calls else 0.0,
+            "total_ms": round(self.nanoseconds / 1e6, 3),
+            "mean_us": round(self.nanoseconds / self.calls / 1e3, 3) if self.calls else 0.0
+        }
+
+
+class EvaluationProfiler:
+    """Collects ProfileStats per node id, per filter fingerprint and per criterion type"""
+
+    def __init__(self):
+        self.started_at = time.time()
+        self._stats: dict[str, dict[str, ProfileStats]] = {dimension: {} for dimension in PROFILE_DIMENSIONS}
+        # filter fingerprint -> the filter as it is written in the major file, for the report
+        self._filter_sources: dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def _record(self, dimension: str, key: str, matched: bool, nanoseconds: int, source: dict | None = None):
+        with self._lock:
+            if source is not None and key not in self._filter_sources:
+                self._filter_sources[key] = source
+            stats = self._stats[dimension].get(key)
+            if stats is None:
+                stats = self._stats[dimension][key] = ProfileStats()
+            stats.calls += 1
+            stats.matches += matched
+            stats.nanoseconds += nanoseconds
+
+    def filter_matches(self, compiled_filter: CompiledFilter, course: dict) -> bool:
+        """compiled_filter.matches(course), timing the filter and each criterion it checks"""
+        filter_started = time.perf_counter_ns()
+        passed = True
+        for criterion in compiled_filter.criteria:
+            started = time.perf_counter_ns()
+            criterion_passed = criterion.check(course) != criterion.negate
+            self._record("criteria", ("not_" if criterion.negate else "") + criterion.criterion_type,
+                         criterion_passed, time.perf_counter_ns() - started)
+            if not criterion_passed:
+                passed = False
+                break
+        self._record("filters", compiled_filter.fingerprint, passed, time.perf_counter_ns() - filter_started,
+                     compiled_filter.source)
+        return passed
+
+    def filters_first_match(self, compiled_filters: CompiledFilters, course: dict) -> CompiledFilter | None:
+        for compiled_filter in compiled_filters.filters:
+            if self.filter_matches(compiled_filter, course):
+                return compiled_filter
+        return None
+
+    def matcher_matches(self, matcher: CompiledFilter | CompiledFilters, course: dict) -> bool:
+        if isinstance(matcher, CompiledFilter):
+            return self.filter_matches(matcher, course)
+        return self.filters_first_match(matcher, course) is not None
+
+    def node_matches(self, node, course: dict) -> bool:
+        """Whether a course matches a requirement node's own filter(s), timed under the node id"""
+        started = time.perf_counter_ns()
+        matched = self.matcher_matches(node.matcher, course)
+        self._record("nodes", node.node_id, matched, time.perf_counter_ns() - started)
+        return matched
+
+    def report(self, by: str = "filters", limit: int | None = None) -> list[dict]:
+        """The profiled nodes, filters or criterion types, the most time-consuming first"""
+        if by not in PROFILE_DIMENSIONS:
+            raise ValueError(f"Unknown profile dimension '{by}', use one of {PROFILE_DIMENSIONS}")
+        with self._lock:
+            rows = [{"key": key, **stats.to_dict()} for key, stats in self._stats[by].items()]
+            if by == "filters":
+                for row in rows:
+                    row["filter"] = self._filter_sources.get(row["key"])
+        rows.sort(key=lambda row: row["total_ms"], reverse=True)
+        return rows[:limit] if limit is not None else rows
+
+    def reset(self):
+        with self._lock:
+            for stats in self._stats.values():
+                stats.clear()
+            self._filter_sources.clear()
+            self.started_at = time.time()
+
+
+_profiler: EvaluationProfiler | None = None
+
+
+def enable_profiler() -> EvaluationProfiler:
+    """Starts profiling every evaluation of this process (keeps the current profile if already enabled)"""
+    global _profiler
+    if _profiler is None:
+        _profiler = EvaluationProfiler()
+    return _profiler
+
+
+def disable_profiler():
+    global _profiler
+    _profiler = None
+
+
+def get_profiler() -> EvaluationProfiler | None:
+    return _profiler
+
+
+def format_report(rows: list[dict]) -> str:
+    """A fixed-width table of report rows for the terminal"""
+    lines = [f"{'total ms':>10} {'calls':>9} {'mean us':>9} {'match':>7}  key"]
+    for row in rows:
+        label = row["key"] if row.get("filter") is None else f"{row['key']} {json.dumps(row['filter'])}"
+        lines.append(f"{row['total_ms']:>10.3f} {row['calls']:>9} {row['mean_us']:>9.3f} {row['match_rate']:>7.1%}  {label}")
+    return "\n".join(lines)
+
+
+def main():
+    # imported here, so importing the profiler into the evaluation modules doesn't create an import cycle
+    from major_requirements.evaluation_state import evaluate_transcript
+    from major_requirements.load_major import load_major
+    # with "python -m" this file runs as __main__, the evaluation looks at the profiler of the imported module
+    from major_requirements.profiler import disable_profiler, enable_profiler
+
+    parser = argparse.ArgumentParser(description="Profile the evaluation of a transcript against a major file")
+    parser.add_argument("major_file")
+    parser.add_argument("transcript_file", help="a JSON list of course documents")
+    parser.add_argument("--by", choices=PROFILE_DIMENSIONS, default="filters")
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=100, help="evaluate the transcript this many times")
+    args = parser.parse_args()
+
+    plan = load_major(args.major_file)
+    with open(args.transcript_file, "r") as file:
+        courses = json.load(file)
+
+    profiler = enable_profiler()
+    for _ in range(args.repeat):
+        evaluate_transcript(plan.tree, courses)
+    disable_profiler()
+    print(f"{plan.code}: {len(courses)} courses x {args.repeat} evaluations")
+    print(format_report(profiler.report(args.by, args.limit)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+# AN IMMUTABLE, PRECOMPILED REQUIREMENT TREE
+# The requirement dictionaries in the major files are never written to during evaluation anymore.
+# We build this tree once when a major is loaded: every requirement becomes a RequirementNode with
+# its filters compiled, and all the per-student numbers (courses_passed, current_credits, passed)
+# live in an EvaluationState instead (see evaluation_state.py).
+# One loaded tree can therefore be shared by every request at the same time.
+
+import copy
+import hashlib
+from dataclasses import dataclass
+from types import MappingProxyType
+
+from major_requirements.compile_filter import CompiledFilter, CompiledFilters, compile_filter, compile_filters
+from major_requirements.filter_cache import matcher_matches
+
+# the keys that describe the structure of a requirement, everything else is kept as read-only "info"
+STRUCTURE_KEYS = {"requirements"}
+
+
+@dataclass(frozen=True, slots=True)
+class RequirementNode:
+    """One requirement of the tree. Nodes are identified by their index in RequirementTree.nodes"""
+
+    index: int
+    # the positions in the nested "requirements" lists, e.g. "2.1" (the root is "")
+    path: str
+    # an id that survives reordering and edits of the requirement: its "id" key if the file sets one,
+    # otherwise the parent's id plus a hash of the requirement's name (or description)
+    node_id: str
+    parent: int | None
+    children: tuple[int, ...]
+    # CompiledFilter for "filter", CompiledFilters for "filters", None if the requirement has neither
+    matcher: CompiledFilter | CompiledFilters | None
+    # "min_credits", "min_courses", or None if there is no validation block
+    validation_type: str | None
+    validation_target: float
+    # (compiled filter, max_credits) for every entry of "credits_constraints"
+    credits_constraints: tuple[tuple[CompiledFilter, float], ...]
+    # a read-only copy of the requirement's own fields (name, description, validation, filters, ...)
+    info: MappingProxyType
+
+    def matches(self, course: dict) -> bool:
+        return self.matcher is not None and matcher_matches(self.matcher, course)
+
+
+@dataclass(frozen=True, slots=True)
+class RequirementTree:
+    """All nodes of a requirement tree in pre-order, the root is nodes[0].
+    In pre-order every parent comes before its children, so walking the nodes backwards
+    visits the children before their parents (a post-order walk, without recursion).
+    """
+
+    nodes: tuple[RequirementNode, ...]
+    # the indices of the nodes that have their own filter(s), the only nodes a course is matched against
+    matcher_indices: tuple[int, ...] = ()
+
+    @property
+    def root(self) -> RequirementNode:
+        return self.nodes[0]
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def filter_fingerprints(self) -> set[str]:
+        """The fingerprints of every compiled filter in the tree, to invalidate cached outcomes when a major changes"""
+        fingerprints = set()
+        for node in self.nodes:
+            if isinstance(node.matcher, CompiledFilter):
+                fingerprints.add(node.matcher.fingerprint)
+            elif isinstance(node.matcher, CompiledFilters):
+                fingerprints.update(compiled_filter.fingerprint for compiled_filter in node.matcher.filters)
+            fingerprints.update(constraint_filter.fingerprint for constraint_filter, _ in node.credits_constraints)
+        return fingerprints
+
+    def requirement_dict(self, index: int = 0) -> dict:
+        """A new requirement dictionary of a node and its sub-requirements, for the dictionary-walking engine
+        (process_nested_requirement_with_course modifies the dictionary it is given).
+        Its "filter", "filters" and credits_constraints filters are the tree's compiled filters,
+        so the engine never compiles a filter dictionary
+        """
+        node = self.nodes[index]
+        requirement = {key: copy.deepcopy(value) for key, value in node.info.items()
+                       if key not in ("filter", "filters", "credits_constraints")}
+        if "filter" in node.info:
+            requirement["filter"] = node.matcher
+        elif "filters" in node.info:
+            requirement["filters"] = node.matcher
+        if "credits_constraints" in node.info:
+            requirement["credits_constraints"] = [
+                {**copy.deepcopy(constraint), "filter": constraint_filter}
+                for constraint, (constraint_filter, _) in zip(node.info["credits_constraints"], node.credits_constraints)
+            ]
+        if node.children:
+            requirement["requirements"] = [self.requirement_dict(child) for child in node.children]
+        return requirement
+
+
+def requirement_node_id(requirement: dict, parent_id: str, position: int) -> str:
+    """The node id of a requirement, see RequirementNode.node_id"""
+    if "id" in requirement:
+        return str(requirement["id"])
+    label = requirement.get("name") or requirement.get("description")
+    if label is None:
+        # nothing to recognize the requirement by, so its position is the best we have
+        return f"{parent_id}/{position}"
+    return f"{parent_id}/{hashlib.sha1(label.encode()).hexdigest()[:8]}"
+
+
+def build_requirement_tree(requirement: dict, root_id: str = "root") -> RequirementTree:
+    """Builds the immutable tree for a requirement dictionary (usually the whole major)
+
+    Args:
+        requirement (dict): the root requirement, with nested "requirements" lists
+        root_id (str): the node id of the root, e.g. the major code
+
+    Returns:
+        RequirementTree: the tree, with every filter compiled once
+    """
+    # (index, path, node_id, parent, children list, requirement) while building, frozen at the end
+    building = []
+
+    def add(requirement: dict, path: str, node_id: str, parent: int | None) -> int:
+        index = len(building)
+        children = []
+        building.append((index, path, node_id, parent, children, requirement))
+        used_ids = set()
+        for position, sub_requirement in enumerate(requirement.get("requirements", [])):
+            sub_path = f"{path}.{position}" if path else str(position)
+            sub_id = requirement_node_id(sub_requirement, node_id, position)
+            # siblings with the same name get a numbered suffix
+            unique_id = sub_id
+            suffix = 2
+            while unique_id in used_ids:
+                unique_id = f"{sub_id}~{suffix}"
+                suffix += 1
+            used_ids.add(unique_id)
+            children.append(add(sub_requirement, sub_path, unique_id, index))
+        return index
+
+    add(requirement, "", str(requirement.get("id", root_id)), None)
+
+    nodes = []
+    for index, path, node_id, parent, children, requirement in building:
+        # the node keeps its own deep copy, so later changes to the dictionary can't leak into the tree
+        info = copy.deepcopy({key: value for key, value in requirement.items() if key not in STRUCTURE_KEYS})
+
+        if "filter" in info:
+            matcher = compile_filter(info["filter"])
+        elif "filters" in info:
+            matcher = compile_filters(info["filters"])
+        else:
+            matcher = None
+
+        validation = info.get("validation") or {}
+        validation_type = next(iter(validation), None)
+        validation_target = validation.get(validation_type, 0) if validation_type else 0
+
+        credits_constraints = tuple(
+            (compile_filter(constraint["filter"]), constraint["max_credits"])
+            for constraint in info.get("credits_constraints", [])
+        )
+
+        nodes.append(RequirementNode(
+            index=index,
+            path=path,
+            node_id=node_id,
+            parent=parent,
+            children=tuple(children),
+            matcher=matcher,
+            validation_type=validation_type,
+            validation_target=validation_target,
+            credits_constraints=credits_constraints,
+            info=MappingProxyType(info)
+        ))
+
+    return RequirementTree(
+        nodes=tuple(nodes),
+        matcher_indices=tuple(node.index for node in nodes if node.matcher is not None)
+    )
@@ -0,0 +1,82 @@
+# SERIALIZED RESPONSES, KEYED BY EVERYTHING THEY DEPEND ON
+# A /validate response only depends on the major version, the catalog epoch (the course documents)
+# and the SET of course ids: the order of the ids and duplicates don't change the evaluation.
+# So the response of an unchanged transcript can be answered from memory with a hash and a dict lookup,
+# and a client that already has it (If-None-Match) gets an empty 304.
+#
+# The ETag of a cached response also contains its state_id: if the state was pushed out of the
+# EvaluationStore, the transcript is evaluated again and the new response gets a new ETag.
+
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Iterable
+
+
+def response_key(*parts) -> str:
+    """A hash of the parts a response depends on, unordered parts should be sorted by the caller"""
+    return hashlib.sha1(repr(parts).encode()).hexdigest()
+
+
+def validation_key(major_code: str, major_version: str, catalog_epoch: int,
+                   course_ids: Iterable[str], variant: str = "") -> str:
+    """The cache key of a /validate response, the same for any order of the same course ids"""
+    return response_key("validate", major_code, major_version, catalog_epoch, tuple(sorted(set(course_ids))), variant)
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Whether an If-None-Match header lists the ETag (weak comparison, as RFC 9110 asks for If-None-Match)"""
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+
+@dataclass(frozen=True, slots=True)
+class CachedResponse:
+    etag: str
+    body: bytes
+    # the EvaluationStore id in the body, if it has one
+    state_id: str | None = None
+
+
+class ResponseCache:
+    """A bounded LRU of serialized responses with hit/miss counters, safe to use from several threads"""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._responses: OrderedDict[str, CachedResponse] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> CachedResponse | None:
+        with self._lock:
+            response = self._responses.get(key)
+            if response is None:
+                self.misses += 1
+                return None
+            self._responses.move_to_end(key)
+            self.hits += 1
+            return response
+
+    def put(self, key: str, response: CachedResponse):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._responses[key] = response
+            self._responses.move_to_end(key)
+            while len(self._responses) > self.max_size:
+                self._responses.popitem(last=False)
+
+    def discard(self, key: str):
+        with self._lock:
+            self._responses.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._responses.clear()
+
+    def stats(self) -> dict:
+        return {"size": len(self._responses), "max_size": self.max_size, "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,199 @@
+"""
+Precomputed reverse index: course _id -> the (major, requirement, filter) entries it satisfies.
+
+Instead of running a course through process_nested_requirement_with_course for every major to find out
+what it counts toward, this job walks every major requirement tree and every course once and stores the
+answer in its own MongoDB collection. The job is incremental: it keeps a fingerprint of every major file
+and of every course document, and only recomputes what changed since the last run.
+
+Run from the repository root:
+
+    python -m major_requirements.reverse_index          # incremental rebuild
+    python -m major_requirements.reverse_index --full   # rebuild everything
+"""
+
+import asyncio
+import sys
+
+from pymongo import DeleteOne, ReplaceOne, UpdateOne
+
+from major_requirements.catalog_bitmap import CourseCatalogColumns
+from major_requirements.compile_filter import compile_filter
+from major_requirements.major_files import discover_major_files, load_major_file, major_code_for
+from utils.fingerprint import fingerprint
+
+# one document per course: {"_id": <course id>, "course_fingerprint": str, "entries": [...]}
+INDEX_COLLECTION = "course_requirement_index"
+# one document per major: {"_id": <major code>, "fingerprint": str, "file": str}
+INDEXED_MAJORS_COLLECTION = "course_requirement_index_majors"
+COURSES_COLLECTION = "courses"
+
+
+def requirement_leaves(requirement: dict, path: str = ""):
+    """Yields (requirement_path, requirement) for every requirement that has its own filter(s).
+    The path lists the positions in the nested "requirements" lists, e.g. "2.1" is the second
+    sub-requirement of the third top-level requirement. The major itself has the path "".
+    """
+    if "filter" in requirement or "filters" in requirement:
+        yield path, requirement
+    for index, sub_requirement in enumerate(requirement.get("requirements", [])):
+        sub_path = f"{path}.{index}" if path else str(index)
+        yield from requirement_leaves(sub_requirement, sub_path)
+
+
+def compile_major_leaves(major: dict) -> list[tuple[str, dict, list]]:
+    """Compiles the filters of every requirement leaf of a major once
+
+    Returns:
+        list[tuple[str, dict, list]]: (requirement_path, requirement, [CompiledFilter, ...])
+    """
+    leaves = []
+    for path, requirement in requirement_leaves(major):
+        filters = [requirement["filter"]] if "filter" in requirement else requirement["filters"]
+        leaves.append((path, requirement, [compile_filter(filter) for filter in filters]))
+    return leaves
+
+
+def major_entries_by_course(major_code: str, leaves: list, catalog: CourseCatalogColumns) -> dict[str, list[dict]]:
+    """Evaluates every filter of a major over a catalog with vectorized masks
+
+    Returns:
+        dict[str, list[dict]]: course id -> the index entries of this major that the course satisfies
+    """
+    entries_by_course: dict[str, list[dict]] = {}
+    for path, requirement, compiled_filters in leaves:
+        for filter_index, compiled_filter in enumerate(compiled_filters):
+            entry = {
+                "major_code": major_code,
+                "requirement_path": path,
+                "requirement_name": requirement.get("name", requirement.get("description", "")),
+                "filter_index": filter_index
+            }
+            for course_id in catalog.eligible_course_ids(catalog.filter_mask(compiled_filter)):
+                entries_by_course.setdefault(course_id, []).append(entry)
+    return entries_by_course
+
+
+def load_majors(major_directory: str | None = None) -> dict[str, dict]:
+    """Reads and compiles every major file
+
+    Returns:
+        dict[str, dict]: major code -> {"file", "fingerprint", "leaves"}
+    """
+    majors = {}
+    for path in discover_major_files(major_directory):
+        data = load_major_file(path)
+        majors[major_code_for(path, data)] = {
+            "file": path,
+            "fingerprint": fingerprint(data),
+            "leaves": compile_major_leaves(data)
+        }
+    return majors
+
+
+async def rebuild_reverse_index(db, major_directory: str | None = None, full: bool = False) -> dict:
+    """Brings the reverse index up to date with the major files and the courses collection
+
+    Args:
+        db: the MongoDB database
+        major_directory (str | None): where the major files are, Settings.MAJOR_REQUIREMENTS_DIR by default
+        full (bool): ignore the stored fingerprints and recompute everything
+
+    Returns:
+        dict: a summary of what was recomputed and written
+    """
+    # imported here, so importing this module doesn't create a database client
+    from utils.id_retrieve_course_info import COURSE_FIELDS
+
+    majors = load_majors(major_directory)
+    courses = await db[COURSES_COLLECTION].find({}, {field: 1 for field in COURSE_FIELDS}).to_list(length=None)
+    for course in courses:
+        course["_id"] = str(course["_id"])
+    course_fingerprints = {course["_id"]: fingerprint(course) for course in courses}
+
+    stored_majors = {doc["_id"]: doc["fingerprint"]
+                     async for doc in db[INDEXED_MAJORS_COLLECTION].find({})}
+    stored_index = {doc["_id"]: doc
+                    async for doc in db[INDEX_COLLECTION].find({})}
+
+    # STEP 1: find out what changed since the last run
+    changed_majors = {code for code, major in majors.items()
+                      if full or stored_majors.get(code) != major["fingerprint"]}
+    removed_majors = set(stored_majors) - set(majors)
+    changed_courses = [course for course in courses
+                       if full or stored_index.get(course["_id"], {}).get("course_fingerprint") != course_fingerprints[course["_id"]]]
+    removed_courses = set(stored_index) - set(course_fingerprints)
+
+    # STEP 2: changed majors are evaluated over the whole catalog,
+    # changed courses are evaluated against every major (the unchanged ones too)
+    new_entries: dict[str, list[dict]] = {}
+    if changed_majors:
+        catalog = CourseCatalogColumns(courses)
+        for code in sorted(changed_majors):
+            for course_id, entries in major_entries_by_course(code, majors[code]["leaves"], catalog).items():
+                new_entries.setdefault(course_id, []).extend(entries)
+    changed_course_ids = {course["_id"] for course in changed_courses}
+    if changed_courses:
+        changed_catalog = CourseCatalogColumns(changed_courses)
+        for code in sorted(set(majors) - changed_majors):
+            for course_id, entries in major_entries_by_course(code, majors[code]["leaves"], changed_catalog).items():
+                new_entries.setdefault(course_id, []).extend(entries)
+
+    # STEP 3: merge with the stored entries and only write the documents that actually change
+    stale_majors = changed_majors | removed_majors
+    operations = []
+    for course in courses:
+        course_id = course["_id"]
+        stored = stored_index.get(course_id)
+        if course_id in changed_course_ids:
+            # new_entries already holds this course's entries for every major
+            entries = list(new_entries.get(course_id, []))
+        else:
+            entries = [entry for entry in stored.get("entries", []) if entry["major_code"] not in stale_majors]
+            entries += new_entries.get(course_id, [])
+        entries.sort(key=lambda entry: (entry["major_code"], entry["requirement_path"], entry["filter_index"]))
+
+        if stored is None or stored.get("entries") != entries or stored.get("course_fingerprint") != course_fingerprints[course_id]:
+            operations.append(UpdateOne(
+                {"_id": course_id},
+                {"$set": {"entries": entries, "course_fingerprint": course_fingerprints[course_id]}},
+                upsert=True
+            ))
+    operations += [DeleteOne({"_id": course_id}) for course_id in removed_courses]
+    if operations:
+        await db[INDEX_COLLECTION].bulk_write(operations, ordered=False)
+
+    major_operations = [
+        ReplaceOne({"_id": code}, {"_id": code, "fingerprint": majors[code]["fingerprint"], "file": majors[code]["file"]}, upsert=True)
+        for code in changed_majors
+    ] + [DeleteOne({"_id": code}) for code in removed_majors]
+    if major_operations:
+        await db[INDEXED_MAJORS_COLLECTION].bulk_write(major_operations, ordered=False)
+
+    return {
+        "changed_majors": sorted(changed_majors),
+        "removed_majors": sorted(removed_majors),
+        "changed_courses": len(changed_courses),
+        "removed_courses": len(removed_courses),
+        "written_documents": len(operations)
+    }
+
+
+async def get_requirements_for_course(db, course_id: str) -> list[dict] | None:
+    """Reads the reverse index entries of a single course
+
+    Returns:
+        list[dict] | None: the entries, or None if the course hasn't been indexed
+    """
+    doc = await db[INDEX_COLLECTION].find_one({"_id": course_id}, {"entries": 1})
+    return doc["entries"] if doc is not None else None
+
+
+async def main():
+    from utils.get_mongodb_collection import get_database
+    summary = await rebuild_reverse_index(get_database(), full="--full" in sys.argv)
+    print(summary)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
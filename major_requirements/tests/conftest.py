@@ -0,0 +1,10 @@
+# SHARED TEST HELPERS
+# pytest loads this file before the test modules of this directory and puts the directory on sys.path,
+# so the test modules import the helpers with "from conftest import ...".
+
+
+def make_course(course_code: str, credits: int, **fields) -> dict:
+    """A minimal course document: the course code is also the _id, extra fields override the defaults"""
+    department, number = course_code.rsplit(" ", 1)
+    return {"_id": course_code, "course_code": course_code, "credits": credits,
+            "departments": [department], "course_number": number, "school-or-college": ["engineering"], **fields}
@@ -0,0 +1,141 @@
+import pytest
+
+from major_requirements.allocation import allocate_courses
+from major_requirements.evaluation_state import evaluate_transcript
+from major_requirements.requirement_tree import build_requirement_tree
+
+from conftest import make_course
+
+
+ece_453 = make_course("E C E 453", 3)
+ece_552 = make_course("E C E 552", 3)
+math_319 = make_course("MATH 319", 3)
+
+example_major = {
+    "requirements": [
+        {
+            "name": "Advanced Electives",
+            "validation": {"min_credits": 6},
+            "filter": {"department": "E C E", "course_number_range": {"$gte": 399}}
+        },
+        {
+            "name": "Professional Electives",
+            "validation": {"min_credits": 3},
+            "filter": {"course_codes": ["E C E 453", "MATH 319"]}
+        }
+    ]
+}
+
+
+def test_every_course_is_assigned_once_and_both_requirements_complete():
+    tree = build_requirement_tree(example_major)
+    state = evaluate_transcript(tree, [ece_453, ece_552, math_319])
+    # without allocation E C E 453 counts toward both requirements
+    assert ece_453["_id"] in state_course_keys(state, 1) and ece_453["_id"] in state_course_keys(state, 2)
+
+    allocation = allocate_courses(state)
+    assignments = allocation.course_assignments()
+    assert assignments == {"E C E 453": "0", "E C E 552": "0", "MATH 319": "1"}
+    assert allocation.completed_units == [1, 2]
+
+    result = allocation.to_dict()
+    assert result["completed_count"] == 2
+    assert result["unassigned_courses"] == []
+    assert [unit["current_credits"] for unit in result["units"]] == [6, 3]
+
+
+def test_credit_caps_limit_what_a_unit_can_take():
+    business_1 = make_course("GEN BUS 301", 3, **{"school-or-college": ["business"]})
+    business_2 = make_course("GEN BUS 302", 3, **{"school-or-college": ["business"]})
+    tree = build_requirement_tree({
+        "requirements": [
+            {
+                "name": "Electives",
+                "validation": {"min_credits": 9},
+                "filter": {"course_codes": ["GEN BUS 301", "GEN BUS 302", "E C E 552"]},
+                "credits_constraints": [{"max_credits": 3, "filter": {"schools_or_colleges": "business"}}]
+            },
+            {
+                "name": "Business",
+                "validation": {"min_courses": 1},
+                "filter": {"department": "GEN BUS"}
+            }
+        ]
+    })
+    state = evaluate_transcript(tree, [business_1, business_2, ece_552])
+    allocation = allocate_courses(state)
+
+    # "Electives" can't reach 9 credits with at most 3 business credits, so it doesn't keep both business courses
+    assert allocation.completed_units == [2]
+    assert len(allocation.assigned[1] & allocation.assigned[2]) == 0
+    assert allocation.state.current_credits[1] <= 6
+
+
+def test_a_course_over_overlapping_credit_caps_is_given_back():
+    gen_bus_510 = make_course("GEN BUS 510", 3, **{"school-or-college": ["business"]})
+    ece_354 = make_course("E C E 354", 3)
+    tree = build_requirement_tree({
+        "requirements": [
+            {
+                "name": "Electives",
+                "validation": {"min_credits": 6},
+                "filter": {"department": ["E C E", "GEN BUS"]},
+                "credits_constraints": [{"max_credits": 3, "filter": {"schools_or_colleges": "business"}},
+                                        {"max_credits": 3, "filter": {"course_number_range": {"$gte": 500}}}]
+            },
+            {
+                "name": "Systems",
+                "validation": {"min_courses": 1},
+                "filter": {"course_codes": ["E C E 354"]}
+            }
+        ]
+    })
+    allocation = allocate_courses(evaluate_transcript(tree, [gen_bus_510, ece_552, ece_354]))
+
+    # GEN BUS 510 only goes through the business cap in the network, but E C E 552 already fills the 500+ cap
+    assert allocation.course_assignments() == {"E C E 552": "0", "E C E 354": "1"}
+    assert allocation.to_dict()["unassigned_courses"] == ["GEN BUS 510"]
+    assert allocation.state.current_credits[1] == allocation.state.raw_credits[1] == 3
+
+
+def test_credit_caps_are_counted_in_credits_with_mixed_course_sizes():
+    business = {"school-or-college": ["business"]}
+    courses = [make_course("MATH 100", 3, **business), make_course("MATH 137", 1, **business),
+               make_course("E C E 174", 4), make_course("GEN BUS 211", 3), make_course("E C E 248", 2, **business),
+               make_course("GEN BUS 285", 3)]
+    tree = build_requirement_tree({
+        "requirements": [
+            {
+                "name": "Electives",
+                "validation": {"min_credits": 9},
+                "filter": {"department": ["GEN BUS", "MATH", "E C E"]},
+                "credits_constraints": [{"max_credits": 3, "filter": {"department": "MATH"}}]
+            },
+            {
+                "name": "Math and E C E",
+                "validation": {"min_credits": 5},
+                "filter": {"department": ["MATH", "E C E"]},
+                "credits_constraints": [{"max_credits": 3, "filter": {"schools_or_colleges": "business"}}]
+            }
+        ]
+    })
+    allocation = allocate_courses(evaluate_transcript(tree, courses))
+
+    # the business cap of "Math and E C E" holds two courses, but MATH 100 alone already fills its 3 credits,
+    # so MATH 137 goes to "Electives" instead of being counted for nothing
+    assert allocation.course_assignments()["MATH 137"] == "0"
+    assert allocation.completed_units == [1, 2]
+    assert [allocation.state.current_credits[unit] for unit in (1, 2)] == [9, 7]
+    assert [allocation.state.raw_credits[unit] for unit in (1, 2)] == [9, 7]
+
+
+def test_nested_units_are_rejected():
+    tree = build_requirement_tree({"requirements": [example_major]})
+    state = evaluate_transcript(tree, [ece_453])
+    with pytest.raises(ValueError):
+        allocate_courses(state, units=[1, 2])
+
+
+def state_course_keys(state, index):
+    course_keys = list(state.course_ids)
+    return {course_keys[course_id] for course_id in state.courses_passed[index]}
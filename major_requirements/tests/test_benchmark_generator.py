@@ -0,0 +1,19 @@
+from benchmarks.synthetic import generate_catalog, generate_major, generate_transcript
+from major_requirements.evaluation_state import evaluate_transcript
+from major_requirements.load_major import compile_major
+
+
+def test_generated_data_is_deterministic_and_compiles():
+    catalog = generate_catalog(500, seed=3)
+    assert catalog == generate_catalog(500, seed=3)
+    assert len({course["_id"] for course in catalog}) == 500
+    assert any("/" in course["course_code"] for course in generate_catalog(2000, seed=3))
+
+    major = generate_major(catalog, depth=2, width=3)
+    assert major == generate_major(catalog, depth=2, width=3)
+    plan = compile_major(major, "SYN")
+    assert len(plan.tree.nodes) == 1 + 3 + 9
+
+    transcript = generate_transcript(catalog, 30)
+    assert len({course["_id"] for course in transcript}) == 30
+    evaluate_transcript(plan.tree, transcript)
@@ -0,0 +1,107 @@
+import numpy as np
+
+from major_requirements.catalog_bitmap import CourseCatalogColumns
+from major_requirements.compile_filter import compile_filter
+from major_requirements.handle_criterion import course_passes_course_number_range_criterion_sync
+from utils.designation_flags import designation_flags
+
+example_catalog = [
+    {'_id': '67577f7e7fd66ec727393650', 'credits': 3, 'course_number': '449', 'departments': ['PHYSICS'],
+     'course_code': 'PHYSICS 449',
+     'formatted_designations': ['Level - Advanced', 'Breadth - Physical Science',
+                                'L&S Credit - Counts as Liberal Arts and Science credit in L&S'],
+     'school-or-college': ['letters-science']},
+    {'_id': '67577f797fd66ec72739352a', 'credits': 3, 'course_number': '241', 'departments': ['PHYSICS'],
+     'course_code': 'PHYSICS 241',
+     'formatted_designations': ['L&S Credit - Counts as Liberal Arts and Science credit in L&S',
+                                'Breadth - Physical Science', 'Level - Intermediate'],
+     'school-or-college': ['letters-science']},
+    {'_id': '67577f9d7fd66ec727393d36', 'credits': 3, 'course_number': '570', 'departments': ['ZOOLOGY'],
+     'course_code': 'ZOOLOGY 570',
+     'formatted_designations': ['Breadth - Biological Science',
+                                'L&S Credit - Counts as Liberal Arts and Science credit in L&S',
+                                'Level - Intermediate'],
+     'school-or-college': ['letters-science']},
+    {'_id': '67577f1c7fd66ec727392091', 'credits': 3, 'course_number': '439', 'departments': ['E C E', 'M E'],
+     'course_code': 'E C E/M E 439', 'school-or-college': ['engineering']},
+    {'_id': '67577f1d7fd66ec7273920d1', 'credits': 4, 'course_number': '453', 'departments': ['E C E'],
+     'course_code': 'E C E 453', 'school-or-college': ['engineering']},
+    {'_id': '67577f587fd66ec727392de3', 'credits': 3, 'course_number': '320', 'departments': ['MATH'],
+     'course_code': 'MATH 320',
+     'formatted_designations': ['Level - Advanced', 'Breadth - Natural Science',
+                                'L&S Credit - Counts as Liberal Arts and Science credit in L&S'],
+     'school-or-college': ['letters-science']},
+    {'_id': '67577efb7fd66ec727391979', 'credits': 3, 'course_number': '427', 'departments': ['CSCS', 'CURRIC'],
+     'course_code': 'CSCS/CURRIC 427', 'school-or-college': ['education', 'human-ecology']},
+    {'_id': '67577f1c7fd66ec7273920a0', 'credits': 3, 'course_number': '439', 'departments': ['M E'],
+     'course_code': 'M E 439', 'school-or-college': ['engineering']},
+]
+
+professional_elective_filters = [
+    {'course_codes': ['MATH/COMP SCI  240', 'E C E 204', 'E C E 320', 'E C E 356', 'E C E 356']},
+    {'departments': 'E C E', 'course_number_range': {'$gte': 399}},
+    {'course_codes': ['MATH 319', 'MATH 320', 'MATH 321', 'MATH 322', 'MATH 340']},
+    {'categories': 'Biological Science', 'levels': ['Intermediate', 'Advanced']},
+    {'categories': 'Physical Science', 'levels': ['Intermediate', 'Advanced'], 'not_course_codes': 'PHYSICS 241'},
+    {'categories': 'Natural Science', 'levels': 'Advanced', 'not_departments': ['MATH', 'STAT', 'COMP SCI']},
+    {'schools_or_colleges': 'engineering', 'course_number_range': {'$gte': 300}, 'not_departments': 'E C E'},
+    {'course_codes': ['CSCS/CURRIC 427']}
+]
+
+
+def test_filter_mask_matches_per_course_evaluation():
+    catalog = CourseCatalogColumns(example_catalog)
+    for filter in professional_elective_filters:
+        compiled = compile_filter(filter)
+        expected = [compiled.matches(course) for course in example_catalog]
+        assert catalog.filter_mask(filter).tolist() == expected
+
+
+def test_requirement_mask_and_transcript_totals():
+    catalog = CourseCatalogColumns(example_catalog)
+    requirement = {
+        "validation": {"min_credits": 9},
+        "filters": professional_elective_filters[:2],
+        "requirements": [{"validation": {"min_courses": 1}, "filter": professional_elective_filters[3]}]
+    }
+    mask = catalog.requirement_mask(requirement)
+    assert catalog.eligible_course_ids(mask) == ['67577f9d7fd66ec727393d36',
+                                                 '67577f1c7fd66ec727392091',
+                                                 '67577f1d7fd66ec7273920d1']
+
+    totals = catalog.transcript_totals(mask, ['67577f1d7fd66ec7273920d1', '67577f587fd66ec727392de3',
+                                              '67577f9d7fd66ec727393d36', 'not-in-catalog'])
+    assert totals["courses_count"] == 2
+    assert totals["credits"] == 7
+    assert isinstance(mask, np.ndarray)
+
+
+def test_designation_outside_the_flagged_vocabulary_agrees_with_the_mask():
+    designations = ['Breadth - Either Humanities or Social Science', 'Level - Elementary']
+    course = {'_id': 'either', 'course_number': '201', 'departments': ['HISTORY'],
+              'formatted_designations': designations, 'designation_flags': designation_flags(designations)}
+    catalog = CourseCatalogColumns([course])
+    for filter in ({'categories': 'Humanities'}, {'categories': 'Social Science'}, {'levels': 'Advanced'}):
+        assert catalog.filter_mask(filter).tolist() == [compile_filter(filter).matches(course)]
+    assert compile_filter({'categories': 'Humanities'}).matches(course)
+
+
+def test_suffixed_course_numbers_are_compared_by_their_leading_digits():
+    courses = [{'_id': str(index), 'course_number': number, 'departments': ['E C E']}
+               for index, number in enumerate(['101A', '453B', 'X01', '453'])]
+    catalog = CourseCatalogColumns(courses)
+    for filter in ({'department': 'E C E', 'course_number_range': {'$gte': 300}},
+                   {'course_number_range': {'$ne': 101}},
+                   {'not_course_number_range': {'$lt': 300}}):
+        expected = [compile_filter(filter).matches(course) for course in courses]
+        assert catalog.filter_mask(filter).tolist() == expected
+    assert [compile_filter({'course_number_range': {'$gte': 300}}).matches(course) for course in courses] == [
+        False, True, False, True
+    ]
+    # a number without leading digits passes no range criterion, so it passes every negated one
+    assert [compile_filter({'not_course_number_range': {'$lt': 300}}).matches(course) for course in courses] == [
+        False, True, True, True
+    ]
+    assert [course_passes_course_number_range_criterion_sync(course, {'$lt': 300}) for course in courses] == [
+        True, False, False, False
+    ]
@@ -0,0 +1,124 @@
+import pytest
+
+from major_requirements.compile_filter import compile_filter, compile_filters
+from major_requirements.handle_filter import course_passes_filter
+from major_requirements.handle_filters import course_passes_filters
+
+professional_elective_filters = [
+    {'course_codes': ['MATH/COMP SCI  240', 'E C E 204', 'E C E 320', 'E C E 331', 'E C E 332', 'E C E 334', 'E C E 335', 'E C E 342', 'E C E 353', 'E C E/COMP SCI  354', 'E C E 355', 'E C E 356', 'E C E 356']},
+    {'departments': 'E C E', 'course_number_range': {'$gte': 399}},
+    {'departments': ['COMP SCI', 'MATH', 'STAT'], 'course_number_range': {'$gte': 400}},
+    {'course_codes': ['MATH 319', 'MATH 320', 'MATH 321', 'MATH 322', 'MATH 340']},
+    {'categories': 'Biological Science', 'levels': ['Intermediate', 'Advanced']},
+    {'categories': 'Physical Science', 'levels': ['Intermediate', 'Advanced'], 'not_course_codes': 'PHYSICS 241'},
+    {'categories': 'Natural Science', 'levels': 'Advanced', 'not_departments': ['MATH', 'STAT', 'COMP SCI']},
+    {'schools_or_colleges': 'engineering', 'course_number_range': {'$gte': 300}, 'not_departments': 'E C E'},
+    {'course_codes': ['DS 501', 'DANCE 560']}
+]
+
+physics_241 = {'_id': '67577f797fd66ec72739352a',
+               'credits': 3,
+               'course_number': '241',
+               'departments': ['PHYSICS'],
+               'course_code': 'PHYSICS 241',
+               'formatted_designations':
+                   ['L&S Credit - Counts as Liberal Arts and Science credit in L&S',
+                    'Breadth - Physical Science',
+                    'Level - Intermediate'],
+               'school-or-college': ['letters-science']}
+
+zoology_570 = {'_id': '67577f9d7fd66ec727393d36',
+               'credits': 3,
+               'course_number': '570',
+               'departments': ['ZOOLOGY'],
+               'course_code': 'ZOOLOGY 570',
+               'formatted_designations':
+                   ['Breadth - Biological Science',
+                    'L&S Credit - Counts as Liberal Arts and Science credit in L&S',
+                    'Level - Intermediate'],
+               'school-or-college': ['letters-science']}
+
+ece_m_e_439 = {'_id': '67577f1c7fd66ec727392091',
+               'credits': 3,
+               'course_number': '439',
+               'departments': ['E C E', 'M E'],
+               'course_code': 'E C E/M E 439',
+               'school-or-college': ['engineering']}
+
+
+def test_compile_filter_normalizes_and_deduplicates_criteria():
+    compiled = compile_filter(professional_elective_filters[0])
+    assert len(compiled.criteria) == 1
+    criterion = compiled.criteria[0]
+    assert criterion.criterion_type == 'course_code'
+    assert criterion.criterion.count('E C E 356') == 1
+
+    compiled = compile_filter({'department': 'E C E', 'course_number_range': {'$gte': 399}})
+    assert {criterion.criterion_type for criterion in compiled.criteria} == {'department', 'course_number_range'}
+    assert compiled.matches({'course_number': '453', 'departments': ['E C E']})
+    assert not compiled.matches({'course_number': '353', 'departments': ['E C E']})
+
+
+def test_compile_filter_negation():
+    # Any physical science course that is designated as intermediate or advanced (except PHYSICS 241)
+    compiled = compile_filter(professional_elective_filters[5])
+    assert not compiled.matches(physics_241)
+
+    # Engineering courses numbered 300 and higher that are not E C E or cross-listed with E C E
+    compiled = compile_filter(professional_elective_filters[7])
+    assert not compiled.matches(ece_m_e_439)
+    assert compiled.matches({**ece_m_e_439, 'departments': ['M E']})
+
+
+def test_compile_filter_skips_description_and_rejects_unknown_criteria():
+    compiled = compile_filter({"description": "Special topics", "course_codes": ["E C E 379", "E C E 601"]})
+    assert compiled.matches({'course_number': '601', 'departments': ['E C E']})
+
+    with pytest.raises(KeyError):
+        compile_filter({'schools-or-colleges': ['engineering']})
+
+
+def test_compile_filters_first_match_returns_source_filter():
+    compiled = compile_filters(professional_elective_filters + [professional_elective_filters[1]])
+    # the repeated filter is only compiled once
+    assert len(compiled.filters) == len(professional_elective_filters)
+    assert compiled.first_match(zoology_570).source is professional_elective_filters[4]
+    assert compiled.first_match(physics_241) is None
+
+
+@pytest.mark.asyncio
+async def test_wrappers_accept_compiled_filters():
+    compiled_filter = compile_filter(professional_elective_filters[4])
+    assert await course_passes_filter(zoology_570, compiled_filter) == True
+    assert await course_passes_filter(zoology_570, professional_elective_filters[4]) == True
+
+    compiled_filters = compile_filters(professional_elective_filters)
+    assert await course_passes_filters(zoology_570, compiled_filters) is professional_elective_filters[4]
+    assert await course_passes_filters(physics_241, professional_elective_filters) is None
+
+
+def test_course_code_criterion_fans_out_cross_listings():
+    compiled = compile_filter({'course_codes': ['KINES 250', 'KINES/NURSING  523']})
+    assert compiled.matches({'course_number': '523', 'departments': ['NURSING']})
+    assert compiled.matches({'course_number': '523', 'departments': ['KINES', 'NURSING']})
+    assert not compiled.matches({'course_number': '250', 'departments': ['NURSING']})
+
+    with pytest.raises(ValueError):
+        compile_filter({'course_codes': ['NOT A COURSE CODE']})
+
+
+def test_designation_criteria_use_flags_with_substring_fallback():
+    from utils.designation_flags import designation_flags
+
+    migrated_zoology_570 = {**zoology_570, 'designation_flags': designation_flags(zoology_570['formatted_designations'])}
+    biological_science = compile_filter(professional_elective_filters[4])
+    assert biological_science.matches(migrated_zoology_570)
+    assert biological_science.matches(zoology_570)
+
+    # the flags are trusted once they exist, even if formatted_designations would disagree
+    assert not biological_science.matches({**zoology_570, 'designation_flags': 0})
+
+    # values without a flag always use the substring match
+    communication_b = compile_filter({'categories': 'Communication Part B'})
+    assert communication_b.matches({'formatted_designations': ['Gen Ed - Communication Part B'], 'designation_flags': 0})
+
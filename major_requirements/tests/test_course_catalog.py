@@ -0,0 +1,116 @@
+import re
+import time
+
+import pytest
+from bson import ObjectId
+
+from utils.course_catalog import CourseCatalog
+from utils.course_repository import CourseRepository, InMemoryCourseRepository, MotorCourseRepository
+
+
+ece_453 = {"_id": ObjectId("67577f1d7fd66ec7273920d1"), "course_code": "E C E 453", "credits": 4}
+cross_listed = {"_id": ObjectId("67577f1c7fd66ec727392090"), "course_code": "E C E/COMP SCI 354", "credits": 3}
+math_320 = {"_id": ObjectId("67577f587fd66ec727392de3"), "course_code": "MATH 320", "credits": 3}
+
+
+async def test_catalog_answers_from_the_snapshot_and_reads_through_for_new_courses():
+    repository = InMemoryCourseRepository([ece_453, cross_listed])
+    catalog = CourseCatalog(repository, fields=["course_code", "credits"])
+    summary = await catalog.refresh()
+    assert (summary["epoch"], summary["courses"]) == (1, 2)
+
+    courses = await catalog.get_by_codes(["COMP SCI 354", "E C E 354", "E C E 453"])
+    assert [course["course_code"] for course in courses] == ["E C E/COMP SCI 354", "E C E 453"]
+    assert courses[1]["_id"] == "67577f1d7fd66ec7273920d1"
+    # everything came from memory
+    assert len(repository.calls) == 1
+
+    # a course added after the refresh is read from MongoDB once and then remembered
+    repository.put_many([math_320])
+    assert [course["credits"] for course in await catalog.get_by_codes(["MATH 320"])] == [3]
+    assert [course["course_code"] for course in await catalog.get_many(["67577f587fd66ec727392de3"])] == ["MATH 320"]
+    # and so is a course that doesn't exist at all
+    assert await catalog.get_by_codes(["HIST 101"]) == []
+    assert await catalog.get_by_codes(["HIST 101", "MATH 320"]) != []
+    assert len(repository.calls) == 3
+
+
+async def test_refresh_swaps_in_a_new_epoch_and_reports_changed_courses():
+    repository = InMemoryCourseRepository([ece_453, cross_listed])
+    catalog = CourseCatalog(repository, fields=["course_code", "credits"])
+    await catalog.refresh()
+    old_snapshot = catalog.snapshot
+
+    repository.put_many([{**ece_453, "credits": 3}, math_320])
+    summary = await catalog.refresh()
+    assert summary["epoch"] == 2
+    assert sorted(summary["changed_course_ids"]) == ["67577f1d7fd66ec7273920d1", "67577f587fd66ec727392de3"]
+
+    # a lookup that started before the refresh keeps its consistent snapshot
+    assert old_snapshot.by_id["67577f1d7fd66ec7273920d1"]["credits"] == 4
+    assert catalog.snapshot.by_id["67577f1d7fd66ec7273920d1"]["credits"] == 3
+
+
+async def test_in_memory_repository_projects_and_simulates_the_round_trip():
+    repository = InMemoryCourseRepository([ece_453, cross_listed, math_320], latency=0.02, jitter=0.01, seed=1)
+    started = time.perf_counter()
+    courses = await repository.get_many(["67577f587fd66ec727392de3", "not an id"], ["credits"])
+    assert 0.02 <= time.perf_counter() - started
+    assert courses == [{"_id": "67577f587fd66ec727392de3", "credits": 3}]
+    # course codes match by department and number, like the catalog snapshot
+    assert [course["credits"] for course in await repository.get_by_codes(["COMP SCI 354"])] == [3]
+    assert await repository.get_by_codes(["COMP SCI 453"]) == []
+    assert len(await repository.scan()) == 3
+    assert repository.calls == [("get_many", 2), ("get_by_codes", 1), ("get_by_codes", 1), ("scan", 0)]
+
+
+def test_a_repository_without_every_read_cannot_be_created():
+    class ScanlessRepository(CourseRepository):
+        async def get_many(self, course_ids, projection=None):
+            return []
+
+        async def get_by_codes(self, course_codes, projection=None):
+            return []
+
+    with pytest.raises(TypeError):
+        ScanlessRepository()
+
+
+class FakeCursor:
+    def __init__(self, courses):
+        self.courses = courses
+
+    async def to_list(self, length=None):
+        return self.courses
+
+
+class FakeCourseCollection:
+    """The course_code $regex queries of MotorCourseRepository.get_by_codes"""
+
+    def __init__(self, courses):
+        self.courses = courses
+
+    def find(self, query, projection=None):
+        pattern = re.compile(query["course_code"]["$regex"])
+        return FakeCursor([
+            {field: value for field, value in course.items() if projection is None or field == "_id" or field in projection}
+            for course in self.courses if pattern.search(course["course_code"])
+        ])
+
+
+async def test_snapshot_and_read_through_find_the_same_courses_for_a_course_code():
+    course_codes = ["COMP SCI  354", "E C E 453", "HIST 101"]
+    expected = ["67577f1c7fd66ec727392090", "67577f1d7fd66ec7273920d1"]
+
+    snapshot_catalog = CourseCatalog(InMemoryCourseRepository([ece_453, cross_listed]), fields=["course_code", "credits"])
+    await snapshot_catalog.refresh()
+    # without a refresh, every course is a late read-through
+    read_through_catalog = CourseCatalog(InMemoryCourseRepository([ece_453, cross_listed]), fields=["course_code", "credits"])
+    motor = MotorCourseRepository(lambda: FakeCourseCollection([ece_453, cross_listed, math_320]))
+
+    assert sorted(course["_id"] for course in await snapshot_catalog.get_by_codes(course_codes)) == expected
+    assert sorted(course["_id"] for course in await read_through_catalog.get_by_codes(course_codes)) == expected
+    courses = await motor.get_by_codes(course_codes, ["credits"])
+    assert sorted(course["_id"] for course in courses) == expected
+    # course_code is only read to compare the keys
+    assert all(set(course) == {"_id", "credits"} for course in courses)
@@ -0,0 +1,73 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from major_requirements.evaluation_executor import (
+    EvaluationExecutor, evaluate_job, evaluate_response_job, get_planner_index, plan_job, set_catalog
+)
+from major_requirements.evaluation_state import state_to_response
+from major_requirements.load_major import compile_major
+
+from conftest import make_course
+
+
+catalog_courses = [make_course("E C E 552", 4), make_course("E C E 553", 3), make_course("MATH 320", 3)]
+
+example_major = {
+    "major_code": "EE",
+    "requirements": [
+        {"name": "Advanced Electives", "validation": {"min_credits": 6},
+         "filter": {"department": "E C E", "course_number_range": {"$gte": 500}}},
+        {"name": "Math", "validation": {"min_courses": 1}, "filter": {"department": "MATH"}}
+    ]
+}
+
+
+async def test_thread_mode_runs_jobs_and_counts_them():
+    plan = compile_major(example_major, "EE")
+    executor = EvaluationExecutor("thread", workers=2)
+    executor.start()
+    executor.set_catalog(catalog_courses, epoch=1)
+    try:
+        response, state = await executor.run(evaluate_job, plan, catalog_courses[:2])
+        assert response["requirements"]["requirements"][0]["validation"]["passed"]
+        assert not state.passed[0]
+
+        result = await executor.run(plan_job, plan, catalog_courses[:2], 0.1, 1)
+        assert [course["course_code"] for course in result["plans"][0]["courses"]] == ["MATH 320"]
+    finally:
+        executor.shutdown()
+    stats = executor.stats()
+    assert (stats["completed"], stats["failed"], stats["in_flight"], stats["queue_depth"]) == (2, 0, 0, 0)
+
+
+async def test_process_mode_workers_load_the_majors_themselves(tmp_path):
+    (tmp_path / "ee_major_requirements.json").write_text(json.dumps(example_major))
+    plan = compile_major(example_major, "EE")
+    executor = EvaluationExecutor("process", workers=1, major_directory=str(tmp_path))
+    executor.start()
+    try:
+        await executor.warm_up()
+        response, state = await executor.run(evaluate_job, plan, catalog_courses)
+        # a batch item only gets its response back
+        summary = await executor.run(evaluate_response_job, plan, catalog_courses, False, "summary")
+    finally:
+        executor.shutdown()
+
+    assert response["requirements"]["passed"]
+    # the state comes back without the (large) tree, the API process puts its own tree back
+    assert state.tree is None
+    state.tree = plan.tree
+    assert state_to_response(state) == response
+    assert summary["passed"]
+
+
+def test_planner_indices_survive_concurrent_catalog_epochs():
+    plans = [compile_major({**example_major, "major_code": code}, code) for code in ("EE", "CS", "ME")]
+
+    def plan_and_refresh(position: int):
+        if position % 10 == 0:
+            set_catalog(catalog_courses, epoch=position)
+        return get_planner_index(plans[position % len(plans)]).tree is plans[position % len(plans)].tree
+
+    with ThreadPoolExecutor(8) as pool:
+        assert all(pool.map(plan_and_refresh, range(200)))
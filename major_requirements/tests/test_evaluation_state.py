@@ -0,0 +1,181 @@
+import copy
+
+import pytest
+
+from major_requirements.evaluation_state import (EvaluationState, apply_course_delta, evaluate_transcript, process_course,
+                                                  process_courses, state_to_node_results, state_to_requirement_dict,
+                                                  state_to_response)
+from major_requirements.evaluation_store import EvaluationStore
+from major_requirements.compile_filter import CompiledFilter
+from major_requirements.handle_nested_requirement import process_nested_requirement_with_course_sync
+from major_requirements.requirement_tree import build_requirement_tree
+
+example_nested_requirement = {
+    "description": "Laboratory courses requirement",
+    "validation": {"min_credits": 2},
+    "requirements": [
+        {
+            "description": "Select at least one course from E C E 301 to E C E 317",
+            "validation": {"min_courses": 1},
+            "filter": {"department": "E C E", "course_number_range": {"$gte": 301, "$lte": 317}}
+        },
+        {
+            "description": "An additional laboratory course",
+            "validation": {"min_courses": 1},
+            "filter": {"course_codes": ["E C E 453", "E C E 554"]}
+        }
+    ]
+}
+
+ece_305 = {'_id': '67577f1c7fd66ec727392090',
+           'credits': 2,
+           'course_number': '305',
+           'departments': ['E C E'],
+           'course_code': 'E C E 305'}
+
+ece_453 = {'_id': '67577f1d7fd66ec7273920d1',
+           'credits': 4,
+           'course_number': '453',
+           'departments': ['E C E'],
+           'course_code': 'E C E 453'}
+
+
+def test_tree_is_immutable_and_shared_between_states():
+    original = copy.deepcopy(example_nested_requirement)
+    tree = build_requirement_tree(example_nested_requirement)
+    assert [node.path for node in tree.nodes] == ["", "0", "1"]
+    assert tree.root.children == (1, 2)
+
+    with pytest.raises(Exception):
+        tree.root.validation_target = 0
+    with pytest.raises(TypeError):
+        tree.root.info["validation"] = {}
+
+    first_student = process_courses(EvaluationState(tree), [ece_305, ece_453])
+    second_student = process_course(EvaluationState(tree), ece_305)
+
+    assert first_student.passed[0] == True
+    assert second_student.passed[0] == False
+    assert second_student.current_credits[0] == 2
+    # the requirement dictionary the tree was built from is untouched
+    assert example_nested_requirement == original
+
+
+def test_state_matches_nested_processing():
+    tree = build_requirement_tree(example_nested_requirement)
+    state = process_courses(EvaluationState(tree), [ece_305, ece_453])
+
+    expected = copy.deepcopy(example_nested_requirement)
+    for course in [ece_305, ece_453]:
+        expected = process_nested_requirement_with_course_sync(course, expected)
+
+    result = state_to_requirement_dict(state)
+    assert result["courses_passed"] == expected["courses_passed"]
+    assert result["validation"] == expected["validation"]
+    for sub_result, sub_expected in zip(result["requirements"], expected["requirements"]):
+        assert sub_result["courses_passed"] == sub_expected["courses_passed"]
+        assert sub_result["validation"] == sub_expected["validation"]
+
+
+def test_tree_hands_its_compiled_filters_to_nested_processing():
+    major = {**example_nested_requirement,
+             "credits_constraints": [{"max_credits": 2, "filter": {"course_codes": ["E C E 453"]}}]}
+    tree = build_requirement_tree(major)
+    requirement = tree.requirement_dict()
+    assert requirement["requirements"][0]["filter"] is tree.nodes[1].matcher
+    assert isinstance(requirement["credits_constraints"][0]["filter"], CompiledFilter)
+
+    expected = copy.deepcopy(major)
+    for course in [ece_305, ece_453]:
+        requirement = process_nested_requirement_with_course_sync(course, requirement)
+        expected = process_nested_requirement_with_course_sync(course, expected)
+    assert requirement["validation"] == expected["validation"]
+    assert requirement["requirements"][1]["courses_passed"] == expected["requirements"][1]["courses_passed"]
+    # every call gets its own dictionary to modify
+    assert "current_credits" not in tree.requirement_dict()["validation"]
+
+
+def test_credit_constraints_are_applied():
+    tree = build_requirement_tree({
+        "validation": {"min_credits": 6},
+        "filter": {"department": "E C E"},
+        "credits_constraints": [{"max_credits": 3, "filter": {"course_codes": ["E C E 453"]}}]
+    })
+    state = process_courses(EvaluationState(tree), [ece_305, ece_453])
+    assert state.current_credits[0] == 5
+    assert state.passed[0] == False
+
+
+def test_courses_are_pooled_once_and_referenced_by_id():
+    tree = build_requirement_tree(example_nested_requirement)
+    # the same course twice on a transcript is only counted once
+    state = process_courses(EvaluationState(tree), [ece_305, ece_453, ece_305])
+    assert state.courses == [ece_305, ece_453]
+    assert state.courses_passed == [{0, 1}, {0}, {1}]
+    assert state.current_credits[0] == 6
+    assert state.current_courses_count == [2, 1, 1]
+
+    response = state_to_response(state)
+    assert response["courses"] == {ece_305["_id"]: ece_305, ece_453["_id"]: ece_453}
+    requirements = response["requirements"]
+    assert requirements["courses_passed"] == [ece_305["_id"], ece_453["_id"]]
+    assert requirements["requirements"][1]["courses_passed"] == [ece_453["_id"]]
+    assert requirements["validation"] == state_to_requirement_dict(state)["validation"]
+
+
+def test_single_pass_evaluation_matches_course_by_course():
+    tree = build_requirement_tree({
+        "validation": {"min_credits": 8},
+        "credits_constraints": [{"max_credits": 3, "filter": {"course_codes": ["E C E 453"]}}],
+        "requirements": [example_nested_requirement, {"validation": {"min_courses": 2}, "filter": {"department": "E C E"}}]
+    })
+    courses = [ece_305, ece_453, ece_305]
+    single_pass = evaluate_transcript(tree, courses)
+    course_by_course = process_courses(EvaluationState(tree), courses)
+
+    assert tree.matcher_indices == (2, 3, 4)
+    assert single_pass.courses_passed == course_by_course.courses_passed
+    assert single_pass.current_credits == course_by_course.current_credits
+    assert single_pass.passed == course_by_course.passed
+    assert single_pass.current_credits[0] == 5
+    assert state_to_requirement_dict(single_pass) == state_to_requirement_dict(course_by_course)
+
+
+def test_course_delta_only_reports_changed_nodes():
+    tree = build_requirement_tree(example_nested_requirement)
+    before = evaluate_transcript(tree, [ece_305])
+    after = before.copy()
+
+    assert apply_course_delta(after, ece_453, added=True) == [0, 2]
+    assert state_to_requirement_dict(after) == state_to_requirement_dict(evaluate_transcript(tree, [ece_305, ece_453]))
+    # the copy was changed, the previous state wasn't
+    assert before.passed[0] == False and after.passed[0] == True
+
+    assert apply_course_delta(after, ece_305, added=False) == [0, 1]
+    assert state_to_response(after) == state_to_response(evaluate_transcript(tree, [ece_453]))
+    # dropping a course that isn't on the transcript changes nothing
+    assert apply_course_delta(after, ece_305, added=False) == []
+
+
+def test_node_results_have_totals_but_no_courses():
+    state = evaluate_transcript(build_requirement_tree(example_nested_requirement), [ece_305])
+    results = state_to_node_results(state)
+    assert results["passed"] is False
+    assert [(result["parent"], result["passed"], result["current_courses_count"]) for result in results["requirements"]] == [
+        (None, False, 1), ("root", True, 1), ("root", False, 0)
+    ]
+    assert results["requirements"][0]["min_credits"] == 2
+    assert not any("courses_passed" in result for result in results["requirements"])
+    assert len(state_to_node_results(state, max_depth=0)["requirements"]) == 1
+
+
+def test_evaluation_store_evicts_least_recently_used_states():
+    tree = build_requirement_tree(example_nested_requirement)
+    store = EvaluationStore(max_size=2)
+    first = store.put(EvaluationState(tree))
+    second = store.put(EvaluationState(tree))
+    assert store.get(first) is not None
+    store.put(EvaluationState(tree))
+    assert store.get(second) is None
+    assert store.get(first) is not None
+    assert len(store) == 2
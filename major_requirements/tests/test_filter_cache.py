@@ -0,0 +1,61 @@
+import pytest
+
+from major_requirements.compile_filter import compile_filter, compile_filters
+from major_requirements.filter_cache import FilterOutcomeCache, disable_filter_cache, enable_filter_cache
+from major_requirements.handle_filter import course_passes_filter_sync
+from major_requirements.handle_filters import course_passes_filters_sync
+from major_requirements.requirement_tree import build_requirement_tree
+
+ece_453 = {'_id': '67577f1d7fd66ec7273920d1',
+           'credits': 4,
+           'course_number': '453',
+           'departments': ['E C E'],
+           'course_code': 'E C E 453'}
+
+math_319 = {'_id': '67577f1d7fd66ec7273920e5',
+            'credits': 3,
+            'course_number': '319',
+            'departments': ['MATH'],
+            'course_code': 'MATH 319'}
+
+
+@pytest.fixture
+def cache():
+    cache = enable_filter_cache(max_size=3)
+    yield cache
+    disable_filter_cache()
+
+
+def test_same_filter_in_different_spellings_shares_outcomes(cache):
+    assert course_passes_filter_sync(ece_453, {"departments": ["E C E"], "course_number_range": {"$gte": 400}})
+    assert course_passes_filter_sync(ece_453, {"course_number_range": {"$gte": 400}, "department": "E C E"})
+    assert cache.stats()["misses"] == 1
+    assert cache.stats()["hits"] == 1
+
+    filters = [{"department": "MATH"}, {"department": "E C E"}]
+    assert course_passes_filters_sync(ece_453, filters) == {"department": "E C E"}
+    assert course_passes_filters_sync(ece_453, compile_filters(filters)) == {"department": "E C E"}
+    assert cache.stats()["hits"] == 3
+
+
+def test_lru_eviction_and_invalidation(cache):
+    filters = [compile_filter({"department": department}) for department in ["E C E", "MATH", "STAT"]]
+    for compiled_filter in filters:
+        cache.matches(compiled_filter, ece_453)
+    cache.matches(filters[0], ece_453)
+    cache.matches(filters[0], math_319)
+    # the least recently used outcome (E C E 453 x MATH) was evicted
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["size"] == 3
+
+    assert cache.invalidate_course(ece_453["_id"]) == 2
+    tree = build_requirement_tree({"filter": {"department": "E C E"}})
+    assert cache.invalidate_filters(tree.filter_fingerprints()) == 1
+    assert cache.stats()["size"] == 0
+
+
+def test_courses_without_id_are_not_cached():
+    cache = FilterOutcomeCache(max_size=10)
+    course = {key: value for key, value in ece_453.items() if key != "_id"}
+    assert cache.matches(compile_filter({"department": "E C E"}), course)
+    assert cache.stats()["size"] == 0
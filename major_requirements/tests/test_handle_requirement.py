@@ -6,7 +6,10 @@ from major_requirements.handle_requirement import (
     course_updates_requirement, 
     courses_update_requirement,
     credit_constraints_update_requirement,
-    requirement_passed
+    requirement_passed,
+    courses_update_requirement_sync,
+    credit_constraints_update_requirement_sync,
+    requirement_passed_sync
 )
 
 async def test_course_updates_requirement():
@@ -310,6 +313,38 @@ async def test_single_filter_requirement():
     result = await course_updates_requirement(example_course, example_requirement)
     print(result)
     
+def test_sync_core_matches_async_wrappers():
+    def make_requirement():
+        return {
+            "description": "At least 9 credits must be in E C E courses numbered 400 and above.",
+            "validation": {"min_credits": 9},
+            "filter": {"department": "E C E", "course_number_range": {"$gte": 400}},
+            "credits_constraints": [{"max_credits": 3, "filter": {"course_codes": ["E C E 453", "E C E 551"]}}]
+        }
+    example_courses = [{'_id': '67577f1d7fd66ec7273920d1',
+                        'credits': 4,
+                        'course_number': '453',
+                        'departments': ['E C E'],
+                        'course_code': 'E C E 453'},
+                       {'_id': '67577f1e7fd66ec72739212f',
+                        'credits': 3,
+                        'course_number': '551',
+                        'departments': ['E C E'],
+                        'course_code': 'E C E 551'}]
+
+    sync_requirement = requirement_passed_sync(credit_constraints_update_requirement_sync(
+        courses_update_requirement_sync(example_courses, make_requirement())))
+
+    async def run_async():
+        requirement = await courses_update_requirement(example_courses, make_requirement())
+        requirement = await credit_constraints_update_requirement(requirement)
+        return await requirement_passed(requirement)
+    async_requirement = asyncio.run(run_async())
+
+    assert sync_requirement == async_requirement
+    assert sync_requirement["validation"]["current_credits"] == 3
+    assert sync_requirement["validation"]["passed"] == False
+
 if __name__ == "__main__":
     import asyncio
     import time
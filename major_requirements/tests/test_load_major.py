@@ -0,0 +1,78 @@
+import json
+
+import pytest
+
+from major_requirements.load_major import MajorRequirementsError, compile_major, load_major
+
+example_major = {
+    "major_code": "EE",
+    "major_name": "Electrical Engineering",
+    "requirements": [
+        {
+            "name": "Laboratory courses requirement",
+            "validation": {"min_credits": 2},
+            "requirements": [
+                {
+                    "name": "Select at least one course from E C E 301 to E C E 317",
+                    "validation": {"min_courses": 1},
+                    "filter": {"department": "E C E", "course_number_range": {"$gte": 301, "$lte": 317}}
+                }
+            ]
+        },
+        {
+            "name": "Professional Electives",
+            "validation": {"min_credits": 9},
+            "filters": [{"course_codes": ["MATH/COMP SCI  240", "E C E 204"]}, {"departments": "E C E", "course_number_range": {"$gte": 399}}],
+            "credits_constraints": [{"max_credits": 6, "filter": {"schools_or_colleges": "business"}}]
+        }
+    ]
+}
+
+
+def test_load_major_compiles_a_valid_file(tmp_path):
+    path = tmp_path / "ee_major_requirements.json"
+    path.write_text(json.dumps(example_major))
+    plan = load_major(str(path))
+
+    assert plan.code == "EE"
+    assert plan.name == "Electrical Engineering"
+    assert len(plan.tree) == 4
+    assert plan.tree.root.node_id == "EE"
+    assert all(node.node_id.startswith("EE/") for node in plan.tree.nodes[1:])
+
+    # node ids don't depend on the position of a requirement, the version does
+    reordered = dict(example_major, requirements=list(reversed(example_major["requirements"])))
+    reordered_plan = compile_major(reordered, "EE")
+    assert {node.node_id for node in reordered_plan.tree.nodes} == {node.node_id for node in plan.tree.nodes}
+    assert reordered_plan.version != plan.version
+    assert compile_major(example_major, "EE").version == plan.version
+
+
+def test_schema_errors_are_all_reported_at_load_time():
+    broken = {
+        "requirements": [
+            {"validation": {"min_credit": 3}, "filter": {"schools-or-colleges": "engineering"}},
+            {"validation": {"min_courses": 1, "min_credits": 3}, "filters": []},
+            {"filter": {"course_number_range": {"$between": 300}}, "credits_constraints": [{"max_credits": 3}]},
+            {"filter": {"course_codes": ["not a course code"]}}
+        ]
+    }
+    with pytest.raises(MajorRequirementsError) as error:
+        compile_major(broken, "BROKEN")
+
+    errors = error.value.errors
+    assert "requirement '0': unknown validation type 'min_credit'" in errors
+    assert "requirement '0' filter: unknown criterion type 'schools-or-colleges'" in errors
+    assert any(message.startswith("requirement '1': 'validation' must have exactly one") for message in errors)
+    assert "requirement '1': 'filters' must be a non-empty list" in errors
+    assert "requirement '2' filter: unknown operator '$between' in 'course_number_range'" in errors
+    assert "requirement '2' credits_constraints[0]: needs 'max_credits' and 'filter'" in errors
+    assert any(message.startswith("requirement '3' filter: Invalid course code") for message in errors)
+    assert isinstance(error.value, ValueError)
+
+
+def test_invalid_json_is_a_major_requirements_error(tmp_path):
+    path = tmp_path / "broken_major_requirements.json"
+    path.write_text("{")
+    with pytest.raises(MajorRequirementsError):
+        load_major(str(path))
@@ -0,0 +1,83 @@
+import json
+import os
+
+from major_requirements.filter_cache import disable_filter_cache, enable_filter_cache, filter_matches
+from major_requirements.major_registry import MajorRegistry
+
+
+def write_major(directory, file_name: str, data: dict, mtime: int):
+    path = directory / file_name
+    path.write_text(json.dumps(data))
+    # mtimes can be too coarse to tell quick writes apart, so every test write gets its own
+    os.utime(path, ns=(mtime, mtime))
+    return path
+
+
+def test_registry_reloads_changed_files_with_an_atomic_swap(tmp_path):
+    ee = {"major_code": "EE", "major_name": "Electrical Engineering",
+          "requirements": [{"name": "Math", "validation": {"min_courses": 1}, "filter": {"department": "MATH"}}]}
+    write_major(tmp_path, "ee_major_requirements.json", ee, 1_000_000_000)
+    write_major(tmp_path, "cs_major_requirements.json", {"major_name": "Computer Science"}, 1_000_000_000)
+
+    registry = MajorRegistry(str(tmp_path))
+    assert sorted(registry.refresh()["loaded"]) == ["EE", "cs"]
+    assert [major["code"] for major in registry.majors()] == ["EE", "cs"]
+    # nothing changed, nothing is reloaded
+    assert registry.refresh() == {"loaded": [], "removed": [], "failed": {}}
+
+    before = registry.snapshot()
+    old_plan = registry.get("EE")
+    ee["requirements"][0]["validation"] = {"min_courses": 2}
+    write_major(tmp_path, "ee_major_requirements.json", ee, 2_000_000_000)
+    assert registry.refresh()["loaded"] == ["EE"]
+
+    assert registry.get("EE").version != old_plan.version
+    assert registry.get("EE").tree.nodes[1].validation_target == 2
+    # a request that took the snapshot before the reload still sees the old major
+    assert before["EE"] is old_plan
+
+
+def test_broken_files_keep_the_previous_plan_and_removed_files_are_dropped(tmp_path):
+    ee = {"major_code": "EE", "requirements": [{"filter": {"department": "E C E"}}]}
+    path = write_major(tmp_path, "ee_major_requirements.json", ee, 1_000_000_000)
+    registry = MajorRegistry(str(tmp_path))
+    registry.refresh()
+    plan = registry.get("EE")
+
+    write_major(tmp_path, "ee_major_requirements.json", {"major_code": "EE", "filter": {"schools-or-colleges": "x"}}, 2_000_000_000)
+    summary = registry.refresh()
+    assert list(summary["failed"]) == [str(path)]
+    assert registry.get("EE") is plan
+    assert str(path) in registry.errors
+
+    os.remove(path)
+    assert registry.refresh()["removed"] == ["EE"]
+    assert registry.get("EE") is None
+    assert registry.errors == {}
+
+
+def test_reload_keeps_the_cached_outcomes_of_filters_still_in_use(tmp_path):
+    math = {"name": "Math", "validation": {"min_courses": 1}, "filter": {"department": "MATH"}}
+    physics = {"name": "Physics", "validation": {"min_courses": 1}, "filter": {"department": "PHYSICS"}}
+    ee = {"major_code": "EE", "requirements": [math, physics]}
+    write_major(tmp_path, "ee_major_requirements.json", ee, 1_000_000_000)
+    registry = MajorRegistry(str(tmp_path))
+    registry.refresh()
+
+    cache = enable_filter_cache(100)
+    try:
+        course = {"_id": "67577f587fd66ec727392de3", "departments": ["MATH"], "course_number": "320"}
+        for node in registry.get("EE").tree.nodes:
+            if node.matcher is not None:
+                filter_matches(node.matcher, course)
+        assert cache.stats()["size"] == 2
+
+        # Physics is replaced, the Math filter is unchanged and keeps its outcome
+        ee["requirements"] = [math, {**physics, "filter": {"department": "CHEM"}}]
+        write_major(tmp_path, "ee_major_requirements.json", ee, 2_000_000_000)
+        registry.refresh()
+        assert cache.stats()["size"] == 1
+        assert filter_matches(registry.get("EE").tree.nodes[1].matcher, course)
+        assert cache.hits == 1
+    finally:
+        disable_filter_cache()
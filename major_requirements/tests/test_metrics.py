@@ -0,0 +1,23 @@
+from utils.metrics import Counter, Histogram, MetricsRegistry
+
+
+def test_registry_renders_the_prometheus_text_format():
+    registry = MetricsRegistry()
+    seconds = Histogram("test_seconds", "Seconds", ("stage",), buckets=(0.1, 1.0), registry=registry)
+    checks = Counter("test_checks", "Checks", ("major",), registry=registry)
+    registry.register_collector(lambda: [("test_queue_depth", "gauge", "Queue depth", [({"mode": "thread"}, 3)])])
+
+    seconds.labels(stage="evaluation").observe(0.05)
+    seconds.labels("evaluation").observe(0.5)
+    seconds.labels("evaluation").observe(5)
+    checks.labels(major='E"E').inc(2)
+    checks.labels(major='E"E').inc()
+
+    lines = registry.render().splitlines()
+    assert 'test_seconds_bucket{stage="evaluation",le="0.1"} 1' in lines
+    assert 'test_seconds_bucket{stage="evaluation",le="1.0"} 2' in lines
+    assert 'test_seconds_bucket{stage="evaluation",le="+Inf"} 3' in lines
+    assert 'test_seconds_count{stage="evaluation"} 3' in lines
+    assert "# TYPE test_checks_total counter" in lines
+    assert 'test_checks_total{major="E\\"E"} 3' in lines
+    assert 'test_queue_depth{mode="thread"} 3' in lines
@@ -0,0 +1,106 @@
+import time
+
+from benchmarks.synthetic import generate_catalog, generate_major, generate_transcript
+from major_requirements.catalog_bitmap import CourseCatalogColumns
+from major_requirements.evaluation_state import evaluate_transcript
+from major_requirements.planner import PlannerIndex, plan_remaining_courses
+from major_requirements.requirement_tree import build_requirement_tree
+
+from conftest import make_course
+
+
+catalog_courses = [
+    make_course("E C E 552", 4),
+    make_course("E C E 553", 3),
+    make_course("E C E 554", 3),
+    make_course("MATH 319", 3),
+    make_course("MATH 320", 1),
+    make_course("STAT 240", 4)
+]
+
+example_major = {
+    "requirements": [
+        {
+            "name": "Advanced Electives",
+            "validation": {"min_credits": 6},
+            "filter": {"department": "E C E", "course_number_range": {"$gte": 500}}
+        },
+        {
+            "name": "Math",
+            "validation": {"min_courses": 2},
+            "filter": {"department": "MATH"}
+        }
+    ]
+}
+
+
+def test_cheapest_plan_completes_every_requirement():
+    catalog = CourseCatalogColumns(catalog_courses)
+    index = PlannerIndex(build_requirement_tree(example_major), catalog)
+    # MATH 319 is already on the transcript, so only MATH 320 is left for "Math"
+    state = evaluate_transcript(index.tree, [catalog_courses[3]])
+
+    plans = plan_remaining_courses(state, index, time_budget=1.0)
+    best = plans[0]
+    assert best.complete
+    # 4 + 3 would also reach 6 credits, but 3 + 3 is cheaper
+    assert sorted(best.course_ids) == ["E C E 553", "E C E 554", "MATH 320"]
+    assert best.total_credits == 7
+    assert [plan.total_credits for plan in plans] == sorted(plan.total_credits for plan in plans)
+    assert best.to_dict(catalog)["unmet_requirements"] == []
+
+
+def test_plan_reports_requirements_the_catalog_cannot_complete():
+    catalog = CourseCatalogColumns(catalog_courses)
+    major = {"requirements": example_major["requirements"] + [
+        {"name": "Physics", "validation": {"min_courses": 1}, "filter": {"department": "PHYSICS"}}
+    ]}
+    index = PlannerIndex(build_requirement_tree(major), catalog)
+    plans = plan_remaining_courses(evaluate_transcript(index.tree, []), index, time_budget=0.1)
+
+    assert len(plans) == 1
+    result = plans[0].to_dict(catalog)
+    assert result["complete"] == False
+    assert result["unmet_requirements"] == ["", "2"]
+
+
+def test_a_node_without_own_candidates_is_completed_through_its_sub_requirements():
+    catalog = CourseCatalogColumns(catalog_courses)
+    major = {"requirements": [
+        {"name": "Math and Electives", "validation": {"min_credits": 9}, "filter": {"department": "MATH"},
+         "requirements": [example_major["requirements"][0]]}
+    ]}
+    index = PlannerIndex(build_requirement_tree(major), catalog)
+    # both MATH courses are on the transcript, the remaining 5 credits can only come from E C E courses
+    state = evaluate_transcript(index.tree, [catalog_courses[3], catalog_courses[4]])
+
+    plans = plan_remaining_courses(state, index, time_budget=1.0)
+    assert len(plans) > 1
+    assert all(plan.complete for plan in plans)
+
+
+def test_planning_stops_at_the_time_budget():
+    catalog = CourseCatalogColumns(catalog_courses)
+    index = PlannerIndex(build_requirement_tree(example_major), catalog)
+    plans = plan_remaining_courses(evaluate_transcript(index.tree, []), index, time_budget=0)
+
+    assert len(plans) == 1
+    assert not plans[0].complete
+
+
+def test_planning_a_large_catalog_stays_within_the_time_budget():
+    catalog_documents = generate_catalog(10000)
+    catalog = CourseCatalogColumns(catalog_documents)
+    index = PlannerIndex(build_requirement_tree(generate_major(catalog_documents, depth=3, width=4)), catalog)
+    state = evaluate_transcript(index.tree, generate_transcript(catalog_documents, 20))
+    passed = list(state.passed)
+
+    start = time.perf_counter()
+    # enough courses for the greedy plan to complete, so the search runs until the budget is used up
+    plans = plan_remaining_courses(state, index, time_budget=0.5, max_courses=100)
+    elapsed = time.perf_counter() - start
+
+    assert plans[0].complete
+    assert elapsed < 0.75
+    # the planner works on copies, the student's state is left as it was
+    assert state.passed == passed
@@ -0,0 +1,37 @@
+from major_requirements.evaluation_state import evaluate_transcript
+from major_requirements.profiler import disable_profiler, enable_profiler
+from major_requirements.requirement_tree import build_requirement_tree
+
+from conftest import make_course
+
+
+example_major = {
+    "requirements": [
+        {"id": "electives", "validation": {"min_credits": 6},
+         "filter": {"department": "E C E", "course_number_range": {"$gte": 500}}},
+        {"id": "math", "validation": {"min_courses": 1}, "filters": [{"department": "MATH"}, {"course_code": "STAT 240"}]}
+    ]
+}
+
+
+def test_profiler_counts_checks_per_node_filter_and_criterion():
+    tree = build_requirement_tree(example_major)
+    courses = [make_course("E C E 552", 4), make_course("E C E 352", 3), make_course("MATH 320", 3)]
+    profiler = enable_profiler()
+    try:
+        profiled = evaluate_transcript(tree, courses)
+    finally:
+        disable_profiler()
+    assert profiled.passed == evaluate_transcript(tree, courses).passed
+
+    nodes = {row["key"]: row for row in profiler.report("nodes")}
+    assert (nodes["electives"]["calls"], nodes["electives"]["matches"]) == (3, 1)
+    assert (nodes["math"]["calls"], nodes["math"]["matches"]) == (3, 1)
+
+    criteria = {row["key"]: row for row in profiler.report("criteria")}
+    # the course number is only checked for the E C E courses, the AND stops at the first failing criterion
+    assert (criteria["department"]["calls"], criteria["course_number_range"]["calls"]) == (6, 2)
+    assert criteria["course_number_range"]["match_rate"] == 0.5
+
+    filters = profiler.report("filters", limit=1)
+    assert len(filters) == 1 and filters[0]["filter"] is not None
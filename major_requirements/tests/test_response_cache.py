@@ -0,0 +1,29 @@
+from major_requirements.response_cache import CachedResponse, ResponseCache, etag_matches, validation_key
+
+
+def test_validation_key_ignores_course_order_and_duplicates():
+    key = validation_key("EE", "v1", 3, ["MATH 320", "E C E 453"])
+    assert validation_key("EE", "v1", 3, ["E C E 453", "MATH 320", "MATH 320"]) == key
+    # anything the response depends on changes the key
+    assert validation_key("EE", "v2", 3, ["MATH 320", "E C E 453"]) != key
+    assert validation_key("EE", "v1", 4, ["MATH 320", "E C E 453"]) != key
+    assert validation_key("EE", "v1", 3, ["MATH 320"]) != key
+    assert validation_key("EE", "v1", 3, ["MATH 320", "E C E 453"], "allocate") != key
+
+
+def test_etag_matches_if_none_match_lists():
+    assert etag_matches('"a", W/"b"', '"b"')
+    assert etag_matches("*", '"b"')
+    assert not etag_matches('"a"', '"b"')
+    assert not etag_matches(None, '"b"')
+
+
+def test_response_cache_evicts_the_least_recently_used_response():
+    cache = ResponseCache(max_size=2)
+    for key in "abc":
+        if key == "c":
+            cache.get("a")
+        cache.put(key, CachedResponse(f'"{key}"', key.encode()))
+    assert cache.get("b") is None
+    assert cache.get("a").body == b"a"
+    assert cache.stats() == {"size": 2, "max_size": 2, "hits": 2, "misses": 1}
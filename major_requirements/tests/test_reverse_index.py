@@ -0,0 +1,39 @@
+from major_requirements.catalog_bitmap import CourseCatalogColumns
+from major_requirements.reverse_index import compile_major_leaves, major_entries_by_course, requirement_leaves
+
+example_major = {
+    "major_code": "EE",
+    "requirements": [
+        {"name": "E C E Advanced Elective",
+         "validation": {"min_credits": 9},
+         "filter": {"department": "E C E", "course_number_range": {"$gte": 400}}},
+        {"name": "Laboratory",
+         "validation": {"min_credits": 2},
+         "requirements": [
+             {"validation": {"min_courses": 1},
+              "filter": {"department": "E C E", "course_number_range": {"$gte": 301, "$lte": 317}}},
+             {"validation": {"min_courses": 1},
+              "filters": [{"course_codes": ["E C E 303"]}, {"course_codes": ["E C E 453", "E C E 554"]}]}
+         ]}
+    ]
+}
+
+example_courses = [
+    {'_id': '67577f1d7fd66ec7273920d1', 'credits': 4, 'course_number': '453',
+     'departments': ['E C E'], 'course_code': 'E C E 453'},
+    {'_id': '67577f1c7fd66ec727392090', 'credits': 2, 'course_number': '305',
+     'departments': ['E C E'], 'course_code': 'E C E 305'},
+    {'_id': '67577f587fd66ec727392de3', 'credits': 3, 'course_number': '320',
+     'departments': ['MATH'], 'course_code': 'MATH 320'}
+]
+
+
+def test_requirement_leaves_paths():
+    assert [path for path, _ in requirement_leaves(example_major)] == ["0", "1.0", "1.1"]
+
+
+def test_major_entries_by_course():
+    entries = major_entries_by_course("EE", compile_major_leaves(example_major), CourseCatalogColumns(example_courses))
+    assert [(entry["requirement_path"], entry["filter_index"]) for entry in entries['67577f1d7fd66ec7273920d1']] == [("0", 0), ("1.1", 1)]
+    assert [entry["requirement_path"] for entry in entries['67577f1c7fd66ec727392090']] == ["1.0"]
+    assert '67577f587fd66ec727392de3' not in entries
@@ -1,11 +1,14 @@
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
 from config import Settings
+from utils.designation_flags import designation_flags
 import asyncio
 
 async def format_course_designations(course_collection):
     """
     Process all course documents and add a 'formatted_designations' field
-    with the structured representation of course_designation data
+    with the structured representation of course_designation data,
+    and a 'designation_flags' field with the bit flags of the normalized designations
     """
     # Count documents to process
     total_docs = await course_collection.count_documents({})
@@ -18,12 +21,12 @@ async def format_course_designations(course_collection):
     async for course in course_collection.find({}):
         if 'course_designation' in course and course['course_designation']:
             # Format the designations
-            formatted = format_designation_text(course['course_designation'])
+            formatted, flags = format_designation_text(course['course_designation'], with_flags=True)
             
-            # Update the document with the new field
+            # Update the document with the new fields
             await course_collection.update_one(
                 {'_id': course['_id']},
-                {'$set': {'formatted_designations': formatted}}
+                {'$set': {'formatted_designations': formatted, 'designation_flags': flags}}
             )
             
             # Update counter
@@ -34,12 +37,40 @@ async def format_course_designations(course_collection):
     print(f"Completed. Added formatted_designations to {processed} documents.")
 
 
-def format_designation_text(designation_text):
+async def add_designation_flags(course_collection, batch_size: int = 1000):
+    """
+    (Re)compute 'designation_flags' from 'formatted_designations', without re-parsing the original
+    course_designation text. Documents flagged before UNFLAGGED_DESIGNATION existed are updated too,
+    only the documents whose flags change are written
+    """
+    query = {'formatted_designations': {'$exists': True}}
+    total_docs = await course_collection.count_documents(query)
+    print(f"Checking designation_flags of {total_docs} course documents...")
+    
+    bulk_operations = []
+    async for course in course_collection.find(query, {'formatted_designations': 1, 'designation_flags': 1}):
+        flags = designation_flags(course['formatted_designations'])
+        if course.get('designation_flags') == flags:
+            continue
+        bulk_operations.append(UpdateOne({'_id': course['_id']}, {'$set': {'designation_flags': flags}}))
+        if len(bulk_operations) >= batch_size:
+            await course_collection.bulk_write(bulk_operations, ordered=False)
+            bulk_operations = []
+    
+    if bulk_operations:
+        await course_collection.bulk_write(bulk_operations, ordered=False)
+    print(f"Completed. Checked designation_flags of {total_docs} documents.")
+
+
+def format_designation_text(designation_text, with_flags=False):
     """
     Convert course_designation text to a structured array format
+    
+    If with_flags is True, returns a tuple (formatted_designations, designation_flags)
+    where designation_flags is the integer bit mask of the normalized breadth, level and L&S designations
     """
     if not designation_text:
-        return []
+        return ([], 0) if with_flags else []
         
     # Split the text by newlines and strip whitespace
     designations = [d.strip() for d in designation_text.split('\n') if d.strip()]
@@ -81,6 +112,8 @@ def format_designation_text(designation_text):
     # Remove any duplicates
     result = list(set(result))
     
+    if with_flags:
+        return result, designation_flags(result)
     return result
 
 
@@ -92,6 +125,8 @@ async def main():
     
     # Format course designations
     await format_course_designations(course_collection)
+    # Flag documents that were formatted before designation_flags (or UNFLAGGED_DESIGNATION) existed
+    await add_designation_flags(course_collection)
     
     # Close the connection
     client.close()
@@ -7,5 +7,10 @@ setup(
     install_requires=[
         "motor",
         "python-dotenv",
+        "numpy",
     ],
+    extras_require={
+        # faster response encoding and MessagePack responses for the API (see utils/serialization.py)
+        "fast": ["orjson", "msgpack"],
+    },
 ) 
\ No newline at end of file
@@ -0,0 +1,177 @@
+# AN IN-MEMORY SNAPSHOT OF THE COURSES COLLECTION
+# The courses only change when the post-processing scripts run, so the validation path doesn't have to
+# ask MongoDB for every request. The catalog loads the projected COURSE_FIELDS of every course once,
+# indexes them by _id and by normalized course code, and answers lookups from memory.
+#
+# A refresh builds a complete new CatalogSnapshot and swaps it in with one assignment (a new "epoch"),
+# so a lookup never sees half of an old and half of a new catalog.
+# Ids and course codes the snapshot doesn't know yet are read from the repository (read-through) and kept
+# until the next refresh. The courses come from a CourseRepository (see utils/course_repository.py),
+# MongoDB by default.
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Callable, Iterable
+
+from utils.course_repository import CourseRepository, MotorCourseRepository
+from utils.metrics import MONGODB_SECONDS
+from utils.parse_course_code import course_code_keys
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    """The courses of one catalog load. epoch goes up by one with every refresh"""
+
+    epoch: int
+    loaded_at: float
+    # course _id (a string) -> course
+    by_id: MappingProxyType
+    # (department, course number) -> the courses listed under it, a cross-listed course is under every department
+    by_code_key: MappingProxyType = field(repr=False)
+
+
+def build_snapshot(courses: list[dict], epoch: int) -> CatalogSnapshot:
+    by_id = {}
+    by_code_key: dict[tuple[str, str], list[dict]] = {}
+    for course in courses:
+        course["_id"] = str(course["_id"])
+        by_id[course["_id"]] = course
+        for key in course_code_keys(course.get("course_code", "")):
+            by_code_key.setdefault(key, []).append(course)
+    return CatalogSnapshot(
+        epoch=epoch,
+        loaded_at=time.time(),
+        by_id=MappingProxyType(by_id),
+        by_code_key=MappingProxyType({key: tuple(courses) for key, courses in by_code_key.items()})
+    )
+
+
+def lookup_course_code(by_code_key, course_code: str) -> list[dict]:
+    """The courses of a course code in any spelling: "E C E/COMP SCI 354", "COMP SCI 354", "COMP SCI  354"..."""
+    found = {}
+    for key in course_code_keys(course_code):
+        for course in by_code_key.get(key, ()):
+            found.setdefault(course["_id"], course)
+    return list(found.values())
+
+
+class CourseCatalog:
+    """The current catalog snapshot, with read-through lookups for courses that aren't in it yet"""
+
+    def __init__(self, repository: CourseRepository | None = None, fields: list[str] | None = None):
+        """
+        Args:
+            repository (CourseRepository | None): where the courses are read from,
+                                                  the shared client's courses collection by default
+            fields (list[str] | None): the projected fields, COURSE_FIELDS by default
+        """
+        self.repository = repository if repository is not None else MotorCourseRepository()
+        self._fields = fields
+        self.snapshot = build_snapshot([], epoch=0)
+        # courses read through since the last refresh, by _id and by code key
+        self._late_by_id: dict[str, dict] = {}
+        self._late_by_code_key: dict[tuple[str, str], list[dict]] = {}
+        # ids and codes the repository didn't have either, so they aren't asked for again until the next refresh
+        self._not_found: set[str] = set()
+        self._refresh_lock = asyncio.Lock()
+
+    def _projection(self) -> list[str]:
+        if self._fields is None:
+            from utils.id_retrieve_course_info import COURSE_FIELDS
+            self._fields = COURSE_FIELDS
+        return self._fields
+
+    @property
+    def epoch(self) -> int:
+        return self.snapshot.epoch
+
+    async def refresh(self) -> dict:
+        """Loads the whole collection into a new snapshot and swaps it in
+
+        Returns:
+            dict: {"epoch": the new epoch, "courses": count, "changed_course_ids": [...]} where changed
+                  lists the courses that were changed, added or removed since the previous snapshot
+        """
+        async with self._refresh_lock:
+            with MONGODB_SECONDS.labels("catalog_refresh").time():
+                courses = await self.repository.scan(self._projection())
+            old = self.snapshot
+            new = build_snapshot(courses, epoch=old.epoch + 1)
+            changed = [course_id for course_id, course in new.by_id.items() if old.by_id.get(course_id) != course]
+            changed += [course_id for course_id in old.by_id if course_id not in new.by_id]
+            # the atomic swap, lookups use either the old or the new snapshot
+            self.snapshot = new
+            self._late_by_id = {}
+            self._late_by_code_key = {}
+            self._not_found = set()
+            return {"epoch": new.epoch, "courses": len(new.by_id), "changed_course_ids": changed}
+
+    def _remember(self, courses: list[dict]):
+        for course in courses:
+            course["_id"] = str(course["_id"])
+            self._late_by_id[course["_id"]] = course
+            for key in course_code_keys(course.get("course_code", "")):
+                self._late_by_code_key.setdefault(key, []).append(course)
+
+    async def get_many(self, course_ids: Iterable[str]) -> list[dict]:
+        """The courses of the given _ids, in the same order. Ids that don't exist are skipped"""
+        course_ids = list(dict.fromkeys(course_ids))
+        snapshot = self.snapshot
+        missing = [course_id for course_id in course_ids
+                   if course_id not in snapshot.by_id and course_id not in self._late_by_id
+                   and course_id not in self._not_found]
+        if missing:
+            with MONGODB_SECONDS.labels("catalog_read_through").time():
+                found = await self.repository.get_many(missing, self._projection())
+            self._remember(found)
+            self._not_found.update(course_id for course_id in missing if course_id not in self._late_by_id)
+
+        courses = []
+        for course_id in course_ids:
+            course = snapshot.by_id.get(course_id) or self._late_by_id.get(course_id)
+            if course is not None:
+                courses.append(course)
+        return courses
+
+    async def get_by_codes(self, course_codes: Iterable[str]) -> list[dict]:
+        """The courses of the given course codes (each course once). Codes that don't exist are skipped"""
+        course_codes = list(dict.fromkeys(course_codes))
+        snapshot = self.snapshot
+        missing = [course_code for course_code in course_codes
+                   if course_code not in self._not_found
+                   and not lookup_course_code(snapshot.by_code_key, course_code)
+                   and not lookup_course_code(self._late_by_code_key, course_code)]
+        if missing:
+            with MONGODB_SECONDS.labels("catalog_read_through").time():
+                found = await self.repository.get_by_codes(missing, self._projection())
+            self._remember(found)
+            self._not_found.update(course_code for course_code in missing
+                                   if not lookup_course_code(self._late_by_code_key, course_code))
+
+        courses = {}
+        for course_code in course_codes:
+            for course in (lookup_course_code(snapshot.by_code_key, course_code)
+                           or lookup_course_code(self._late_by_code_key, course_code)):
+                courses.setdefault(course["_id"], course)
+        return list(courses.values())
+
+    async def run_periodic_refresh(self, interval: float, on_refresh: Callable | None = None):
+        """Refreshes the snapshot every interval seconds until the task is cancelled
+
+        Args:
+            on_refresh (Callable | None): called with the summary of every successful refresh
+        """
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                summary = await self.refresh()
+            except Exception:
+                logger.exception("Refreshing the course catalog failed, keeping epoch %s", self.epoch)
+                continue
+            if on_refresh is not None:
+                on_refresh(summary)
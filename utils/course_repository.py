@@ -0,0 +1,219 @@
+# WHERE THE COURSE DOCUMENTS COME FROM
+# The catalog, the API and the benchmarks only need three batched reads of the courses collection:
+# courses by _id, courses by course code, and every course. A CourseRepository is that interface,
+# so the code above it doesn't care whether the courses come from MongoDB or from memory.
+#
+# MotorCourseRepository reads the courses collection through the shared Motor client.
+# InMemoryCourseRepository answers from a list of course documents, and can wait a fixed latency plus
+# random jitter per call, so the catalog and the API can be tested and benchmarked offline
+# with round trips that cost about as much as the real database's.
+#
+# Every method returns plain dictionaries with the _id as a string, and takes the projected fields
+# as a list of field names (None for the repository's default fields).
+# Course codes are matched like the catalog snapshot matches them: by their (department, course number) keys
+# (see course_code_keys), so "COMP SCI 354" and "COMP SCI  354" both find "E C E/COMP SCI 354".
+
+import asyncio
+import json
+import random
+import re
+from abc import ABC, abstractmethod
+from typing import Callable, Iterable
+
+from bson import ObjectId
+from bson.errors import InvalidId
+
+from utils.parse_course_code import course_code_keys
+
+
+class CourseRepository(ABC):
+    """The batched reads of the courses collection"""
+
+    def __init__(self, fields: list[str] | None = None):
+        """
+        Args:
+            fields (list[str] | None): the fields a read returns when it isn't given a projection,
+                                       all fields if None
+        """
+        self.fields = fields
+
+    def _fields(self, projection: list[str] | None) -> list[str] | None:
+        return projection if projection is not None else self.fields
+
+    @abstractmethod
+    async def get_many(self, course_ids: Iterable[str], projection: list[str] | None = None) -> list[dict]:
+        """The courses of the given _ids (strings) in one round trip. Ids that don't exist are skipped"""
+
+    @abstractmethod
+    async def get_by_codes(self, course_codes: Iterable[str], projection: list[str] | None = None) -> list[dict]:
+        """The courses listed under any department and number of the given codes, in one round trip"""
+
+    @abstractmethod
+    async def scan(self, projection: list[str] | None = None) -> list[dict]:
+        """Every course"""
+
+    async def ping(self) -> bool:
+        """Whether the courses can be read at all"""
+        return True
+
+
+class MotorCourseRepository(CourseRepository):
+    """The courses collection of MongoDB"""
+
+    def __init__(self, collection_getter: Callable | None = None, fields: list[str] | None = None):
+        """
+        Args:
+            collection_getter (Callable | None): returns the MongoDB "courses" collection,
+                                                 the shared client's collection by default
+        """
+        super().__init__(fields)
+        self._collection_getter = collection_getter
+
+    def _collection(self):
+        if self._collection_getter is None:
+            # imported here, so the module can be imported without creating the shared client
+            from utils.get_mongodb_collection import get_mongodb_collection
+            return get_mongodb_collection("courses")
+        return self._collection_getter()
+
+    async def _find(self, query: dict, projection: list[str] | None) -> list[dict]:
+        fields = self._fields(projection)
+        courses = await self._collection().find(
+            query, {field: 1 for field in fields} if fields is not None else None
+        ).to_list(length=None)
+        for course in courses:
+            course["_id"] = str(course["_id"])
+        return courses
+
+    async def get_many(self, course_ids: Iterable[str], projection: list[str] | None = None) -> list[dict]:
+        object_ids = []
+        for course_id in dict.fromkeys(course_ids):
+            try:
+                object_ids.append(ObjectId(course_id))
+            except (InvalidId, TypeError):
+                # can't be the _id of any course
+                continue
+        if not object_ids:
+            return []
+        return await self._find({"_id": {"$in": object_ids}}, projection)
+
+    async def get_by_codes(self, course_codes: Iterable[str], projection: list[str] | None = None) -> list[dict]:
+        keys = {key for course_code in course_codes for key in course_code_keys(course_code)}
+        if not keys:
+            return []
+        # the stored course codes can be spelled differently, so MongoDB narrows them down by course number
+        # (the last word of a course code) and the keys of every candidate are compared here
+        numbers = "|".join(sorted(re.escape(number) for number in {number for _, number in keys}))
+        fields = self._fields(projection)
+        courses = await self._find({"course_code": {"$regex": rf"\s(?:{numbers})$"}},
+                                   fields if fields is None or "course_code" in fields else [*fields, "course_code"])
+        courses = [course for course in courses
+                   if any(key in keys for key in course_code_keys(course.get("course_code", "")))]
+        if fields is not None and "course_code" not in fields:
+            for course in courses:
+                del course["course_code"]
+        return courses
+
+    async def scan(self, projection: list[str] | None = None) -> list[dict]:
+        return await self._find({}, projection)
+
+    async def ping(self) -> bool:
+        if self._collection_getter is None:
+            from utils.get_mongodb_collection import ping_mongodb
+            return await ping_mongodb()
+        try:
+            await self._collection().database.command("ping")
+            return True
+        except Exception:
+            return False
+
+
+class InMemoryCourseRepository(CourseRepository):
+    """A stand-in for the courses collection, with an optional simulated round trip time"""
+
+    def __init__(self, courses: Iterable[dict] = (), fields: list[str] | None = None,
+                 latency: float = 0.0, jitter: float = 0.0, seed: int | None = None):
+        """
+        Args:
+            courses (Iterable[dict]): the course documents, copied
+            latency (float): the seconds every call waits before it answers
+            jitter (float): up to this many more seconds, drawn uniformly per call
+            seed (int | None): the seed of the jitter, for repeatable runs
+        """
+        super().__init__(fields)
+        self.latency = latency
+        self.jitter = jitter
+        self._random = random.Random(seed)
+        # (operation, number of keys asked for), one per call, for tests and benchmarks
+        self.calls: list[tuple[str, int]] = []
+        self._by_id: dict[str, dict] = {}
+        # (department, course number) -> the courses listed under it
+        self._by_code_key: dict[tuple[str, str], list[dict]] = {}
+        self.put_many(courses)
+
+    @classmethod
+    def from_json_file(cls, path: str, **kwargs) -> "InMemoryCourseRepository":
+        """A repository of a JSON list of course documents (e.g. a mongoexport --jsonArray of the collection)"""
+        with open(path, "r") as file:
+            courses = json.load(file)
+        for course in courses:
+            # mongoexport writes ObjectIds as {"$oid": "..."}
+            if isinstance(course.get("_id"), dict):
+                course["_id"] = course["_id"]["$oid"]
+        return cls(courses, **kwargs)
+
+    def put_many(self, courses: Iterable[dict]):
+        """Adds or replaces courses (by _id), like a post-processing script writing to the collection"""
+        for course in courses:
+            course = {**course, "_id": str(course["_id"])}
+            previous = self._by_id.get(course["_id"])
+            if previous is not None:
+                self._unindex(previous)
+            self._by_id[course["_id"]] = course
+            for key in course_code_keys(course.get("course_code", "")):
+                self._by_code_key.setdefault(key, []).append(course)
+
+    def _unindex(self, course: dict):
+        for key in course_code_keys(course.get("course_code", "")):
+            self._by_code_key[key].remove(course)
+
+    def delete(self, course_id: str):
+        course = self._by_id.pop(str(course_id), None)
+        if course is not None:
+            self._unindex(course)
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    async def _round_trip(self, operation: str, keys: int):
+        self.calls.append((operation, keys))
+        delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter > 0 else 0.0)
+        # even without latency, a call gives up the event loop like a real one does
+        await asyncio.sleep(delay)
+
+    def _project(self, courses: Iterable[dict], projection: list[str] | None) -> list[dict]:
+        fields = self._fields(projection)
+        if fields is None:
+            return [dict(course) for course in courses]
+        # like MongoDB, the _id is always included
+        return [{field: course[field] for field in ("_id", *fields) if field in course} for course in courses]
+
+    async def get_many(self, course_ids: Iterable[str], projection: list[str] | None = None) -> list[dict]:
+        course_ids = list(dict.fromkeys(course_ids))
+        await self._round_trip("get_many", len(course_ids))
+        return self._project((self._by_id[course_id] for course_id in course_ids if course_id in self._by_id),
+                             projection)
+
+    async def get_by_codes(self, course_codes: Iterable[str], projection: list[str] | None = None) -> list[dict]:
+        course_codes = list(dict.fromkeys(course_codes))
+        await self._round_trip("get_by_codes", len(course_codes))
+        found = {}
+        for course_code in course_codes:
+            for key in course_code_keys(course_code):
+                for course in self._by_code_key.get(key, ()):
+                    found.setdefault(course["_id"], course)
+        return self._project(found.values(), projection)
+
+    async def scan(self, projection: list[str] | None = None) -> list[dict]:
+        await self._round_trip("scan", 0)
+        return self._project(list(self._by_id.values()), projection)
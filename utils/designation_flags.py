@@ -0,0 +1,59 @@
+# COMPACT BIT FLAGS FOR THE NORMALIZED COURSE DESIGNATIONS
+# post_processing/add_course_designations.py normalizes the breadth, level and L&S designations,
+# so there are only a handful of distinct strings. Each of them gets one bit, and a course stores
+# the OR of its bits in the "designation_flags" field next to "formatted_designations".
+# NOTE: only ever append new flags at the end, the bit positions are stored in the database
+
+DESIGNATION_FLAGS = {
+    'Breadth - Humanities': 1 << 0,
+    'Breadth - Social Science': 1 << 1,
+    'Breadth - Natural Science': 1 << 2,
+    'Breadth - Biological Science': 1 << 3,
+    'Breadth - Physical Science': 1 << 4,
+    'Breadth - Literature': 1 << 5,
+    'Level - Elementary': 1 << 6,
+    'Level - Intermediate': 1 << 7,
+    'Level - Advanced': 1 << 8,
+    'L&S Credit - Counts as Liberal Arts and Science credit in L&S': 1 << 9
+}
+
+# set when a course has a designation outside DESIGNATION_FLAGS (e.g. "Breadth - Either Humanities or
+# Social Science"), whose bits can't be known. The criteria then use the substring match on
+# formatted_designations for that course, so the flags never answer differently than the substring rule
+UNFLAGGED_DESIGNATION = 1 << 10
+
+# the criterion values that can be answered from the flags alone
+# e.g. "Biological Science", "Advanced", or a full designation like "Level - Advanced"
+# any other value (e.g. "Communication Part B") needs the substring match on formatted_designations
+FLAGGED_CRITERION_VALUES = (
+    {designation.split(' - ', 1)[1] for designation in DESIGNATION_FLAGS}
+    | set(DESIGNATION_FLAGS)
+    | {'L&S Credit'}
+)
+
+
+def designation_flags(formatted_designations: list[str]) -> int:
+    """Combines the bits of all the flagged designations of a course, plus UNFLAGGED_DESIGNATION if it has any other"""
+    flags = 0
+    for designation in formatted_designations:
+        flags |= DESIGNATION_FLAGS.get(designation, UNFLAGGED_DESIGNATION)
+    return flags
+
+
+def designation_criterion_mask(values) -> int | None:
+    """Compiles category/level criterion values into a bit mask
+
+    A value selects every flag whose designation contains it, which is the same substring rule
+    that course_passes_category_criterion applies to formatted_designations.
+
+    Returns:
+        int | None: the mask, or None if some value can't be answered from the flags
+    """
+    mask = 0
+    for value in values:
+        if value not in FLAGGED_CRITERION_VALUES:
+            return None
+        for designation, flag in DESIGNATION_FLAGS.items():
+            if value in designation:
+                mask |= flag
+    return mask
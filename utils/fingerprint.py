@@ -0,0 +1,13 @@
+# A STABLE HASH OF JSON-LIKE VALUES
+# The same major file or course document always gives the same fingerprint, in every process and on
+# every run (keys are sorted, values that JSON can't encode such as ObjectIds are turned into strings).
+# The major loader uses it as the version of a major, the reverse index job to find changed majors and courses.
+
+import hashlib
+import json
+
+
+def fingerprint(value) -> str:
+    """A stable hash of a JSON-like value, used to detect changed majors and course documents"""
+    encoded = json.dumps(value, sort_keys=True, default=str, separators=(",", ":")).encode()
+    return hashlib.sha256(encoded).hexdigest()
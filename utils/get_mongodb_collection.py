@@ -6,12 +6,55 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 from config import Settings
 
-# Step 1: Initialize the async MongoDB client
-client = AsyncIOMotorClient(Settings.MONGODB_URI)
-db = client.uwmatch  # Database name
-# course_colelction = db.courses
+# ONE SHARED CLIENT FOR THE WHOLE PROCESS
+# An AsyncIOMotorClient owns a connection pool, so creating one per request (or per module) pays
+# the TCP/TLS setup and server discovery again and again. Every module gets the client from here instead.
+# Creating the client doesn't connect yet, the pool opens its connections on first use.
+_client: AsyncIOMotorClient | None = None
+
+
+def create_mongodb_client(uri: str | None = None) -> AsyncIOMotorClient:
+    """Creates a new client with the pool settings from config.Settings (prefer get_mongodb_client)"""
+    return AsyncIOMotorClient(
+        uri or Settings.MONGODB_URI,
+        maxPoolSize=Settings.MONGODB_MAX_POOL_SIZE,
+        minPoolSize=Settings.MONGODB_MIN_POOL_SIZE,
+        serverSelectionTimeoutMS=Settings.MONGODB_SERVER_SELECTION_TIMEOUT_MS,
+        connectTimeoutMS=Settings.MONGODB_CONNECT_TIMEOUT_MS,
+        socketTimeoutMS=Settings.MONGODB_SOCKET_TIMEOUT_MS
+    )
+
+
+def get_mongodb_client() -> AsyncIOMotorClient:
+    """The shared client, created on first use"""
+    global _client
+    if _client is None:
+        _client = create_mongodb_client()
+    return _client
+
+
+def get_database(name: str | None = None):
+    return get_mongodb_client()[name or Settings.MONGODB_DB_NAME]
+
+
+async def ping_mongodb() -> bool:
+    """Warms up the pool with a round trip to the server, returns False if the server can't be reached"""
+    try:
+        await get_mongodb_client().admin.command("ping")
+        return True
+    except Exception:
+        return False
+
+
+def close_mongodb_client():
+    """Closes the shared client, the next get_mongodb_client call creates a new one"""
+    global _client
+    if _client is not None:
+        _client.close()
+        _client = None
+
 
 # no need to make this function async, since it's just a reference to a collection
 # no operations is being done through solely using this function
 def get_mongodb_collection(collection_name):
-    return db[collection_name] # inside a function, we must use a bracket notation
\ No newline at end of file
+    return get_database()[collection_name] # inside a function, we must use a bracket notation.
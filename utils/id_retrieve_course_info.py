@@ -4,7 +4,6 @@ from utils.get_mongodb_collection import get_mongodb_collection
 import asyncio
 import time
 
-COURSE_COLLECTION = get_mongodb_collection("courses")
 
 async def get_single_course_by_id(course_id: str, fields: Optional[List[str]] = None) -> Optional[Dict]:
     """The function retrieves a single course document by its ID.
@@ -22,7 +21,7 @@ async def get_single_course_by_id(course_id: str, fields: Optional[List[str]] =
     """
     query = {"_id": ObjectId(course_id)}
     projection = {field: 1 for field in fields} if fields is not None else None
-    course = await COURSE_COLLECTION.find_one(query, projection)
+    course = await get_mongodb_collection("courses").find_one(query, projection)
     course["_id"] = str(course["_id"])
     
     return course
@@ -46,7 +45,7 @@ async def get_courses_by_ids_bulk(course_ids: List[str], fields: Optional[List[s
     if fields is not None:
         pipeline.append({"$project": {field: 1 for field in fields}})
     
-    found_courses = await COURSE_COLLECTION.aggregate(pipeline).to_list(length=None)
+    found_courses = await get_mongodb_collection("courses").aggregate(pipeline).to_list(length=None)
     found_courses = [{**course, "_id": str(course["_id"])} for course in found_courses]
     
     # before returning the course documents, first we check if all courses successfully retrieved
@@ -67,6 +66,7 @@ COURSE_FIELDS = [
     "departments",
     "course_number",
     "formatted_designations",
+    "designation_flags",
     "school-or-college"
 ]
 
@@ -0,0 +1,196 @@
+# LATENCY AND THROUGHPUT METRICS IN THE PROMETHEUS TEXT FORMAT
+# A slow /validate can be spent looking up courses, evaluating, or encoding the response.
+# The API times each stage into a histogram (per major), counts what it evaluated, and serves
+# everything on /metrics in the Prometheus text exposition format (version 0.0.4).
+#
+# This is a small, dependency-free take on the prometheus_client API (Counter/Histogram with .labels()),
+# built to stay on in production: an observation is a bisect and a few additions under a per-series lock,
+# and nothing is formatted until /metrics is scraped.
+# Numbers that other objects already keep (cache hit counters, executor queue depth) aren't copied into
+# metrics on every request, a collector callback reads them at scrape time.
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterable
+
+# seconds, from a filter check on a warm cache to a full catalog load
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"') for value in labels.values())
+    return "{" + ",".join(f'{name}="{value}"' for name, value in zip(labels, escaped)) + "}"
+
+
+def format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class CounterSeries:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1):
+        with self._lock:
+            self.value += amount
+
+
+class HistogramSeries:
+    __slots__ = ("buckets", "bucket_counts", "sum", "count", "_lock")
+
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        # observations per bucket (not cumulative), the last one is +Inf
+        self.bucket_counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        position = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.bucket_counts[position] += 1
+            self.sum += value
+            self.count += 1
+
+    @contextmanager
+    def time(self):
+        """Observes the seconds the with block took"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started)
+
+
+class Metric:
+    """A metric family: one series per combination of label values"""
+
+    metric_type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (), registry=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._series: dict[tuple, object] = {}
+        self._lock = threading.Lock()
+        (registry if registry is not None else REGISTRY).register(self)
+
+    def _new_series(self):
+        raise NotImplementedError
+
+    def labels(self, *values, **labels):
+        """The series of the label values (created on first use), by position or by name"""
+        key = tuple(map(str, values)) if values else tuple(str(labels[name]) for name in self.labelnames)
+        series = self._series.get(key)
+        if series is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} has the labels {self.labelnames}, got {key}")
+            with self._lock:
+                series = self._series.setdefault(key, self._new_series())
+        return series
+
+    def samples(self) -> Iterable[tuple[str, dict, float]]:
+        raise NotImplementedError
+
+    def render(self) -> list[str]:
+        # the text format wants the sample name in HELP and TYPE, so a counter is described as name_total
+        family = f"{self.name}_total" if self.metric_type == "counter" else self.name
+        lines = [f"# HELP {family} {self.documentation}", f"# TYPE {family} {self.metric_type}"]
+        lines += [f"{name}{format_labels(labels)} {format_value(value)}" for name, labels, value in self.samples()]
+        return lines
+
+
+class Counter(Metric):
+    metric_type = "counter"
+
+    def _new_series(self):
+        return CounterSeries()
+
+    def inc(self, amount: float = 1):
+        """For a counter without labels"""
+        self.labels().inc(amount)
+
+    def samples(self):
+        for key, series in list(self._series.items()):
+            yield f"{self.name}_total", dict(zip(self.labelnames, key)), series.value
+
+
+class Histogram(Metric):
+    metric_type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                 buckets: tuple = DEFAULT_BUCKETS, registry=None):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_series(self):
+        return HistogramSeries(self.buckets)
+
+    def observe(self, value: float):
+        """For a histogram without labels"""
+        self.labels().observe(value)
+
+    def samples(self):
+        for key, series in list(self._series.items()):
+            labels = dict(zip(self.labelnames, key))
+            with series._lock:
+                bucket_counts, total, count = list(series.bucket_counts), series.sum, series.count
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), bucket_counts):
+                cumulative += bucket_count
+                yield f"{self.name}_bucket", {**labels, "le": format_value(float(bound))}, cumulative
+            yield f"{self.name}_sum", labels, total
+            yield f"{self.name}_count", labels, count
+
+
+class MetricsRegistry:
+    """Every metric family, plus collectors that read numbers kept elsewhere at scrape time"""
+
+    def __init__(self):
+        self._metrics: dict[str, Metric] = {}
+        self._collectors: list[Callable] = []
+
+    def register(self, metric: Metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"A metric named {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+
+    def register_collector(self, collector: Callable):
+        """collector() returns [(name, type, documentation, [(labels dict, value), ...]), ...]"""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines += metric.render()
+        for collector in self._collectors:
+            for name, metric_type, documentation, samples in collector():
+                family = f"{name}_total" if metric_type == "counter" else name
+                lines += [f"# HELP {family} {documentation}", f"# TYPE {family} {metric_type}"]
+                lines += [f"{family}{format_labels(labels)} {format_value(value)}" for labels, value in samples]
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# the stages of the API, see api.py
+STAGE_SECONDS = Histogram("uwmatch_stage_seconds", "Seconds spent in one stage of a request, by major",
+                          ("stage", "major"))
+COURSES_EVALUATED = Counter("uwmatch_courses_evaluated", "Courses evaluated against a major", ("major",))
+FILTER_CHECKS = Counter("uwmatch_filter_checks", "Course x filtered requirement checks of the evaluations", ("major",))
+MONGODB_SECONDS = Histogram("uwmatch_mongodb_seconds", "Seconds of one MongoDB round trip, by operation",
+                            ("operation",))
+REQUEST_SECONDS = Histogram("uwmatch_request_seconds", "Seconds to answer an HTTP request, by route and status",
+                            ("method", "route", "status"))
@@ -1,3 +1,31 @@
+import re
+from functools import lru_cache
+from typing import Iterable
+
+# DEPT1/DEPT2 100 -> everything before the last run of whitespace is the departments string
+# the pattern is compiled once when the module is imported, not on every call
+COURSE_CODE_PATTERN = re.compile(r'^(.*)\s+(\d+\w*)$')
+
+# the leading digits of a course number, its value in course number range criteria
+COURSE_NUMBER_VALUE_PATTERN = re.compile(r'^\d+')
+
+# the catalog has a few thousand distinct course codes, so this comfortably holds all of them
+PARSE_CACHE_SIZE = 16384
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def _parse_course_code_cached(course_code: str) -> tuple[tuple[str, ...], str] | None:
+    match = COURSE_CODE_PATTERN.match(course_code)
+
+    if match:
+        dept_str = match.group(1)
+        course_num = match.group(2)
+
+        # Split by '/' and remove whitespace
+        parsed_departments = tuple(dept.strip() for dept in dept_str.split('/'))
+        return parsed_departments, course_num
+    else:
+        return None
+
 def parse_course_code(course_code: str) -> dict:
     """The function takes a course code as a string, and returns a dictionary 
     with a list of department names and a course number
@@ -8,29 +36,64 @@ def parse_course_code(course_code: str) -> dict:
     Returns:
         dict: {'departments': ['DEPT1', 'DEPT2'], 'course_number': 100}
         (e.g. {'departments': ['COMP SCI', 'ECE'], 'course_number': 252})
+
+    Note:
+        Results are memoized, repeated calls with the same course code skip the regex entirely.
+        A new dictionary is returned on every call, so callers can modify it safely.
     """
-    import re
-    
-    pattern = r'^(.*)\s+(\d+\w*)$'
-    match = re.match(pattern, course_code)
-    
-    if match:
-        dept_str = match.group(1)
-        course_num = match.group(2)
-        
-        # Split by '/' and remove whitespace
-        parsed_departments = []
-        for dept in dept_str.split('/'):
-            cleaned_dept = dept.strip()
-            parsed_departments.append(cleaned_dept)
-        
-        return {
-            "departments": parsed_departments,
-            "course_number": course_num
-        }
-    else:
+    parsed = _parse_course_code_cached(course_code)
+    if parsed is None:
         return None
 
+    departments, course_num = parsed
+    return {
+        "departments": list(departments),
+        "course_number": course_num
+    }
+
+def parse_course_codes(course_codes: Iterable[str]) -> dict[str, dict | None]:
+    """Bulk version of parse_course_code, for post-processing scripts that handle many courses at once
+
+    Args:
+        course_codes (Iterable[str]): course code strings, duplicates are only parsed once
+
+    Returns:
+        dict[str, dict | None]: maps each course code to its parsed dictionary (or None if it doesn't parse)
+    """
+    return {course_code: parse_course_code(course_code) for course_code in dict.fromkeys(course_codes)}
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def course_code_keys(course_code: str) -> tuple[tuple[str, str], ...]:
+    """Expands a course code into one (department, course_number) key per cross-listed department
+
+    Args:
+        course_code (str): e.g. "KINES/NURSING  523"
+
+    Returns:
+        tuple[tuple[str, str], ...]: e.g. (('KINES', '523'), ('NURSING', '523')),
+                                     or an empty tuple if the course code doesn't parse
+    """
+    parsed = _parse_course_code_cached(course_code)
+    if parsed is None:
+        return ()
+    departments, course_num = parsed
+    return tuple((dept, course_num) for dept in departments)
+
+def course_number_value(course_number) -> int | None:
+    """The value a course number is compared by in course number range criteria
+
+    Suffixed numbers count as their leading digits ("101A" -> 101), so they're in the same range as "101".
+    A number without leading digits (e.g. "" or "X01") has no value, and passes no range criterion.
+
+    Args:
+        course_number (str | int): e.g. "453" or "101A"
+
+    Returns:
+        int | None: e.g. 101, or None
+    """
+    match = COURSE_NUMBER_VALUE_PATTERN.match(str(course_number))
+    return int(match.group()) if match else None
+
 def main():
     example_course_code = "AGROECOL/AGRONOMY/C&E SOC/ENTOM/ENVIR ST 103"
     
@@ -0,0 +1,58 @@
+# ENCODING API RESPONSES TO BYTES
+# The validation responses are large nested dicts, and encoding them with the standard json module
+# (or FastAPI's jsonable_encoder walk on top of it) shows up in profiles. We encode them once, to bytes,
+# with orjson when it is installed, and hand the bytes to the response (and to the response cache) as they are.
+# A client that sends "Accept: application/msgpack" gets MessagePack instead, if msgpack is installed.
+# Both libraries are optional: without them every response is encoded with the standard json module.
+
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack", "application/vnd.msgpack")
+
+
+def encode_json(content) -> bytes:
+    """JSON bytes, anything that isn't JSON serializable (an ObjectId, a datetime) becomes a string"""
+    if orjson is not None:
+        return orjson.dumps(content, default=str)
+    return json.dumps(content, default=str, separators=(",", ":")).encode()
+
+
+def encode_msgpack(content) -> bytes:
+    return msgpack.packb(content, default=str)
+
+
+def negotiate_media_type(accept: str | None) -> str:
+    """MSGPACK_MEDIA_TYPE if the Accept header asks for MessagePack (and it can be encoded), otherwise JSON"""
+    if msgpack is None or not accept:
+        return JSON_MEDIA_TYPE
+    for media_range in accept.split(","):
+        media_type, *parameters = media_range.split(";")
+        if media_type.strip().lower() not in MSGPACK_MEDIA_TYPES:
+            continue
+        # "application/msgpack;q=0" means "not MessagePack"
+        quality = next((parameter.strip()[2:] for parameter in parameters if parameter.strip().startswith("q=")), "1")
+        try:
+            if float(quality) > 0:
+                return MSGPACK_MEDIA_TYPE
+        except ValueError:
+            continue
+    return JSON_MEDIA_TYPE
+
+
+def encode(content, media_type: str) -> bytes:
+    """Encodes a response for a media type returned by negotiate_media_type"""
+    if media_type == MSGPACK_MEDIA_TYPE:
+        return encode_msgpack(content)
+    return encode_json(content)
@@ -1,20 +1,10 @@
-from motor.motor_asyncio import AsyncIOMotorClient
-from config import Settings
+from utils.get_mongodb_collection import get_database
 import asyncio
 
-client = AsyncIOMotorClient(Settings.MONGODB_URI)
-db = client.uwmatch  # Database name
-
-from motor.motor_asyncio import AsyncIOMotorClient
-from config import Settings
-import asyncio
-
-# Connect to MongoDB
-client = AsyncIOMotorClient(Settings.MONGODB_URI)
-db = client.uwmatch  # Database name
-
 # Define an async function to handle the query
 async def fetch_course():
+    # the database of the shared client, looked up when the query runs
+    db = get_database()
     cursor = db.courses.find(
         {'clean_title': "ELEMENTARY MATRIX AND LINEAR ALGEBRA"},
         {"_id": 1, "course_code": 1, "credits": 1, "departments": 1, "course_number": 1, "formatted_designations": 1, "school-or-college": 1}
@@ -24,4 +14,5 @@ async def fetch_course():
         print(doc)
 
 # Run the async function
-asyncio.run(fetch_course())
\ No newline at end of file
+if __name__ == "__main__":
+    asyncio.run(fetch_course())